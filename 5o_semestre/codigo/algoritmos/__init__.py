@@ -1,4 +1,9 @@
-from .all_people_distances import all_people_distances
+from .all_people_distances import all_people_distances, candidatos_cercanos, candidatos_en_disco
 from .alg_voraz import algoritmo_voraz
+from .alg_voraz_multiple import algoritmo_voraz_multiple
 from .alg_voraz_q_prio import algoritmo_voraz_q_prioridades
+from .alg_optimo import algoritmo_optimo
+from .alg_subasta import algoritmo_subasta
 from .alg_genetico import algoritmo_genetico
+from .alg_genetico_islas import algoritmo_genetico_islas
+from .busqueda_local import busqueda_local
@@ -0,0 +1,150 @@
+import multiprocessing as mp
+import queue
+import numpy as np
+from algoritmos.alg_genetico import _conteo_cache, _conteo_generacion, _costos_y_grupo, _evaluar, _generacion, _generar_poblacion, _sin_repetidos
+from algoritmos.cache_fitness import CacheFitness
+from algoritmos.memoria_compartida import ArreglosCompartidos
+
+# Segundos entre revisiones de que las islas sigan vivas mientras se esperan sus resultados
+ESPERA_RESULTADOS = 1.0
+
+def _epocas(n_generaciones, intervalo_migracion):
+    # Generaciones de cada epoca; entre dos epocas hay una migracion
+    return [min(intervalo_migracion, n_generaciones - inicio) for inicio in range(0, n_generaciones, intervalo_migracion)]
+
+def _emigrantes(poblacion, fitness_poblacion, n_migrantes):
+    mejores = np.argsort(fitness_poblacion)[:n_migrantes]
+    return poblacion[mejores], fitness_poblacion[mejores]
+
+def _recibir_migrantes(poblacion, fitness_poblacion, migrantes, fitness_migrantes):
+    # Los migrantes que no estan ya en la isla reemplazan a sus peores cromosomas
+    nuevos = _sin_repetidos(migrantes, set(cromosoma.tobytes() for cromosoma in poblacion))
+    peores = np.argsort(fitness_poblacion)[len(fitness_poblacion) - len(nuevos):]
+    poblacion[peores] = migrantes[nuevos]
+    fitness_poblacion[peores] = fitness_migrantes[nuevos]
+    return poblacion, fitness_poblacion
+
+def _crear_cache(evaluacion):
+    # Cache de fitness de una isla; no se usa con fitness incremental
+    if evaluacion['tam_cache'] and not evaluacion['fitness_delta']:
+        return CacheFitness(evaluacion['tam_cache'])
+    return None
+
+def _isla(id_isla, specs, n_poblacion, epocas, p_m, n_migrantes, evaluacion, semilla, entrada, salida, resultados):
+    # Evoluciona una isla en su propio proceso. Al final de cada epoca (menos la ultima) envia
+    # sus mejores cromosomas a la siguiente isla del anillo y recibe los de la anterior.
+    _bloques, arreglos = ArreglosCompartidos.adjuntar(specs)
+    costos = arreglos['costos']
+    rng = np.random.default_rng(semilla)
+    cache = _crear_cache(evaluacion)
+    poblacion = _generar_poblacion(arreglos['grupo'], n_poblacion, rng)
+    fitness_poblacion = _evaluar(poblacion, costos, cache)
+    conteo, por_generacion = _conteo_cache(cache), []
+    for epoca, n_generaciones in enumerate(epocas):
+        for _ in range(n_generaciones):
+            poblacion, fitness_poblacion = _generacion(poblacion, fitness_poblacion, n_poblacion, costos, p_m, rng, cache,
+                                                       evaluacion['fitness_delta'], evaluacion['verificar'])
+            conteo, conteo_generacion = _conteo_generacion(cache, conteo)
+            por_generacion.append(conteo_generacion)
+        if epoca < len(epocas) - 1:
+            salida.put(_emigrantes(poblacion, fitness_poblacion, n_migrantes))
+            poblacion, fitness_poblacion = _recibir_migrantes(poblacion, fitness_poblacion, *entrada.get())
+    resultados.put((id_isla, poblacion, fitness_poblacion, dict(conteo, generaciones=por_generacion)))
+
+def _islas_secuenciales(costos, grupo, tamaños, epocas, p_m, n_migrantes, evaluacion, semillas):
+    # Mismas islas y migraciones que en paralelo, una despues de otra en el proceso principal
+    rngs = [np.random.default_rng(semilla) for semilla in semillas]
+    caches = [_crear_cache(evaluacion) for _ in semillas]
+    islas = []
+    for n_poblacion, rng, cache in zip(tamaños, rngs, caches):
+        poblacion = _generar_poblacion(grupo, n_poblacion, rng)
+        islas.append((poblacion, _evaluar(poblacion, costos, cache)))
+    conteos = [_conteo_cache(cache) for cache in caches]
+    por_generacion = [[] for _ in semillas]
+    for epoca, n_generaciones in enumerate(epocas):
+        for idx, (n_poblacion, rng, cache) in enumerate(zip(tamaños, rngs, caches)):
+            poblacion, fitness_poblacion = islas[idx]
+            for _ in range(n_generaciones):
+                poblacion, fitness_poblacion = _generacion(poblacion, fitness_poblacion, n_poblacion, costos, p_m, rng, cache,
+                                                           evaluacion['fitness_delta'], evaluacion['verificar'])
+                conteos[idx], conteo_generacion = _conteo_generacion(cache, conteos[idx])
+                por_generacion[idx].append(conteo_generacion)
+            islas[idx] = (poblacion, fitness_poblacion)
+        if epoca < len(epocas) - 1:
+            migrantes = [_emigrantes(poblacion, fitness_poblacion, n_migrantes) for poblacion, fitness_poblacion in islas]
+            islas = [_recibir_migrantes(*islas[idx], *migrantes[idx - 1]) for idx in range(len(islas))]
+    return [(poblacion, fitness_poblacion, dict(conteo, generaciones=generaciones))
+            for (poblacion, fitness_poblacion), conteo, generaciones in zip(islas, conteos, por_generacion)]
+
+def _islas_en_procesos(costos, grupo, tamaños, epocas, p_m, n_migrantes, evaluacion, semillas):
+    contexto = mp.get_context("spawn")
+    n_islas = len(tamaños)
+    # buzon de entrada de cada isla; la isla i envia al buzon de la isla i + 1
+    buzones = [contexto.Queue() for _ in range(n_islas)]
+    resultados = contexto.Queue()
+    islas = [None] * n_islas
+    with ArreglosCompartidos({'costos': costos, 'grupo': grupo}) as compartidos:
+        procesos = [contexto.Process(target=_isla, args=(idx, compartidos.specs, tamaños[idx], epocas, p_m, n_migrantes,
+                                                         evaluacion, semillas[idx], buzones[idx], buzones[(idx + 1) % n_islas],
+                                                         resultados))
+                    for idx in range(n_islas)]
+        for proceso in procesos:
+            proceso.start()
+        try:
+            recibidos = 0
+            while recibidos < n_islas:
+                try:
+                    id_isla, *isla = resultados.get(timeout=ESPERA_RESULTADOS)
+                except queue.Empty:
+                    if any(proceso.exitcode not in (None, 0) for proceso in procesos):
+                        raise RuntimeError("Una isla del algoritmo genetico termino con error.")
+                    continue
+                islas[id_isla] = tuple(isla)
+                recibidos += 1
+        finally:
+            # con error se detienen las islas que siguen esperando migrantes
+            for idx, proceso in enumerate(procesos):
+                if proceso.is_alive() and islas[idx] is None:
+                    proceso.terminate()
+                proceso.join()
+    return islas
+
+def algoritmo_genetico_islas(veh_factory, distancias, n_poblacion, n_generaciones, p_m, n_islas=None,
+                             intervalo_migracion=50, n_migrantes=2, semilla=None, paralelo=True, tam_cache=None,
+                             fitness_delta=False, verificar=False, contadores=None):
+    # Modelo de islas de algoritmo_genetico: n_poblacion se reparte en n_islas subpoblaciones que
+    # evolucionan en procesos separados y leen la matriz de costos de memoria compartida.
+    # Cada intervalo_migracion generaciones cada isla envia sus n_migrantes mejores cromosomas a
+    # la siguiente en un anillo (solo viajan esos cromosomas) y estos reemplazan a los peores.
+    # La poblacion inicial de cada isla no tiene cromosomas repetidos: los que se repiten se
+    # reemplazan por permutaciones nuevas, asi que cada isla empieza con su tamaño completo.
+    # Las semillas de las islas se derivan de semilla con numpy.random.SeedSequence; con
+    # paralelo=False las islas corren en el proceso principal con los mismos resultados.
+    # tam_cache, fitness_delta y verificar: igual que en algoritmo_genetico, en cada isla (cada
+    # una con su propio cache).
+    # contadores: dict opcional donde se guardan las consultas y aciertos del cache sumados de
+    # todas las islas, en 'generaciones' la suma de todas las islas por generacion y, en 'islas',
+    # los conteos de cada isla (cada uno con sus propias 'generaciones').
+    # Devuelve lo mismo que algoritmo_genetico: el fitness de la poblacion final (todas las islas).
+    n_islas = n_islas if n_islas else max(1, mp.cpu_count()//2)
+    if n_poblacion // n_islas < 3:
+        raise ValueError("Cada isla necesita al menos 3 cromosomas para los torneos "
+                         f"(n_poblacion // n_islas = {n_poblacion // n_islas}).")
+    tamaños = [len(parte) for parte in np.array_split(np.arange(n_poblacion), n_islas)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_islas)
+    epocas = _epocas(n_generaciones, intervalo_migracion)
+    costos, grupo = _costos_y_grupo(veh_factory, distancias)
+    evaluacion = {'tam_cache': tam_cache, 'fitness_delta': fitness_delta, 'verificar': verificar}
+    print("Ejecutando", n_islas, "islas de", tamaños[0], "cromosomas con", len(epocas) - 1, "migraciones")
+    if paralelo and n_islas > 1:
+        islas = _islas_en_procesos(costos, grupo, tamaños, epocas, p_m, n_migrantes, evaluacion, semillas)
+    else:
+        islas = _islas_secuenciales(costos, grupo, tamaños, epocas, p_m, n_migrantes, evaluacion, semillas)
+    if contadores is not None:
+        por_isla = [conteo for _, _, conteo in islas]
+        contadores.update({'consultas': sum(conteo['consultas'] for conteo in por_isla),
+                           'aciertos': sum(conteo['aciertos'] for conteo in por_isla),
+                           'generaciones': [tuple(np.sum(generacion, axis=0).tolist())
+                                            for generacion in zip(*(conteo['generaciones'] for conteo in por_isla))],
+                           'islas': por_isla})
+    return np.concatenate([fitness_poblacion for _, fitness_poblacion, _ in islas]).tolist()
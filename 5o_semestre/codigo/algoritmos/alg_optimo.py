@@ -0,0 +1,79 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from algoritmos.candidatos import DTYPE_CANDIDATO
+from algoritmos.estado_asignacion import EstadoAsignacion, resultados_asignacion
+
+# Se suma al costo de todas las aristas: el solver toma los ceros de la matriz dispersa
+# como aristas ausentes. No cambia la solucion porque cada persona usa exactamente una arista.
+DESPLAZAMIENTO_COSTO = 1.0
+
+def _parejas_utiles(q, path_len, lugares):
+    # Parejas de la lista de candidatos con vehiculo con lugares y que caminan menos que
+    # viajar solo; las demas nunca mejoran la solucion (la persona puede quedarse en su
+    # vehiculo con el mismo costo o menos)
+    utiles = []
+    for bloque in q.bloques():
+        utiles.append(bloque[(bloque['prioridad'] < path_len[bloque['pasajero']]) & (lugares[bloque['conductor']] > 0)])
+    if not utiles:
+        return np.empty(0, dtype=DTYPE_CANDIDATO)
+    return np.concatenate(utiles)
+
+def _grafo_asientos(parejas, path_len, lugares):
+    # Matriz dispersa personas x (asientos + columnas 'viaja solo'). Cada vehiculo se expande
+    # en sus lugares libres (a lo mas tantos como personas candidatas tiene); la persona i
+    # tiene ademas su propia columna n_asientos + i con costo path_len.
+    n_pasajeros = len(path_len)
+    pasajeros = parejas['pasajero'].astype(np.int64)
+    conductores = parejas['conductor'].astype(np.int64)
+    asientos = np.minimum(lugares, np.bincount(conductores, minlength=len(lugares))).astype(np.int64)
+    inicio_asiento = np.concatenate(([0], np.cumsum(asientos)))
+    n_asientos = int(inicio_asiento[-1])
+
+    repeticiones = asientos[conductores]
+    fin_pareja = np.cumsum(repeticiones)
+    desfase = np.arange(int(fin_pareja[-1]) if len(fin_pareja) else 0) - np.repeat(fin_pareja - repeticiones, repeticiones)
+    filas = np.concatenate((np.repeat(pasajeros, repeticiones), np.arange(n_pasajeros)))
+    columnas = np.concatenate((np.repeat(inicio_asiento[conductores], repeticiones) + desfase,
+                               n_asientos + np.arange(n_pasajeros)))
+    costos = np.concatenate((np.repeat(parejas['prioridad'], repeticiones), path_len)) + DESPLAZAMIENTO_COSTO
+    grafo = csr_matrix((costos, (filas, columnas)), shape=(n_pasajeros, n_asientos + n_pasajeros))
+    conductor_asiento = np.repeat(np.arange(len(lugares)), asientos)
+    return grafo, conductor_asiento
+
+def _asignar_parejas(estado, parejas, pasajeros, conductores):
+    # Asigna en el estado a cada persona su vehiculo con los datos de la pareja (distancia y nodos)
+    n_conductores = len(estado.lugares)
+    llave_parejas = parejas['pasajero'].astype(np.int64) * n_conductores + parejas['conductor']
+    orden = np.argsort(llave_parejas, kind='stable')
+    pos = orden[np.searchsorted(llave_parejas, pasajeros * n_conductores + conductores, sorter=orden)]
+    for idx_not, idx_sh, prioridad, nodo_s, nodo_t in zip(pasajeros.tolist(), conductores.tolist(),
+                                                          parejas['prioridad'][pos].tolist(),
+                                                          parejas['nodo_s'][pos].tolist(),
+                                                          parejas['nodo_t'][pos].tolist()):
+        estado.asignar(idx_not, idx_sh, prioridad, nodo_s, nodo_t)
+
+def algoritmo_optimo(veh_factory, q):
+    # Asignacion exacta personas -> asientos que minimiza la distancia total (caminata de las
+    # personas asignadas mas path_len de las que viajan solas), como problema de asignacion
+    # dispersa resuelto con min_weight_full_bipartite_matching.
+    # Recibe la lista de candidatos de all_people_distances (solo se usan sus parejas) y
+    # devuelve lo mismo que algoritmo_voraz_q_prioridades: (estado, total_people_walk, vehicles_final)
+    estado = EstadoAsignacion(veh_factory)
+    path_len = estado.path_len
+    lugares = estado.lugares
+    parejas = _parejas_utiles(q, path_len, lugares)
+    print("Parejas candidatas utiles: ", len(parejas))
+    if len(parejas):
+        grafo, conductor_asiento = _grafo_asientos(parejas, path_len, lugares)
+        print("Aristas del problema de asignacion: ", grafo.nnz)
+        pasajeros, columnas = min_weight_full_bipartite_matching(grafo)
+        en_asiento = columnas < len(conductor_asiento)
+        pasajeros = pasajeros[en_asiento]
+        conductores = conductor_asiento[columnas[en_asiento]]
+
+        _asignar_parejas(estado, parejas, pasajeros, conductores)
+
+    estado.marcar_sin_asignar()
+    total_people_walk, vehicles_final = resultados_asignacion(estado, q.ids_pasajeros, q.ids_conductores)
+    return estado, total_people_walk, vehicles_final
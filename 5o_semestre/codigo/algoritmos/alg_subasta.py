@@ -0,0 +1,184 @@
+import multiprocessing as mp
+import numpy as np
+from algoritmos.alg_optimo import _asignar_parejas, _grafo_asientos, _parejas_utiles
+from algoritmos.distances import min_por_segmento
+from algoritmos.estado_asignacion import EstadoAsignacion, resultados_asignacion
+from algoritmos.memoria_compartida import ArreglosCompartidos
+
+# Factor con el que se reduce epsilon en cada fase del escalamiento
+FACTOR_EPSILON = 10.0
+
+# Con menos personas sin asignar que esto una ronda de pujas se calcula en el proceso principal
+PUJAS_POR_PROCESO = 20_000
+
+# Con a lo mas estas personas sin asignar las pujas se hacen de una en una
+PUJAS_SECUENCIALES = 32
+
+# Arreglos del problema (CSR), precios y personas libres que cada proceso abre una sola vez
+# en _inicializar_proceso; el proceso principal actualiza precios y libres antes de cada ronda
+_BLOQUES = []
+_ARREGLOS = {}
+
+def _inicializar_proceso(specs):
+    global _BLOQUES, _ARREGLOS
+    _BLOQUES, _ARREGLOS = ArreglosCompartidos.adjuntar(specs)
+
+def _problema_simetrico(grafo, n_asientos):
+    # Problema cuadrado (personas = objetos) a partir del grafo personas x (asientos + solo).
+    # Se agrega una persona de relleno por asiento, con costo 0 a su asiento y a la columna
+    # 'viaja solo' de cada persona que puede ocupar ese asiento: si la persona i se sienta,
+    # el relleno de su asiento toma la columna de i. El optimo no cambia y con objetos y
+    # personas en igual numero la subasta con escalamiento de epsilon termina en el optimo.
+    n_pasajeros = grafo.shape[0]
+    pasajeros = np.repeat(np.arange(n_pasajeros), np.diff(grafo.indptr))
+    en_asiento = grafo.indices < n_asientos
+    asientos = np.arange(n_asientos)
+    filas = np.concatenate((pasajeros, n_pasajeros + grafo.indices[en_asiento], n_pasajeros + asientos))
+    columnas = np.concatenate((grafo.indices, n_asientos + pasajeros[en_asiento], asientos))
+    costos = np.concatenate((grafo.data, np.zeros(int(en_asiento.sum()) + n_asientos)))
+    orden = np.argsort(filas, kind='stable')
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(filas, minlength=n_pasajeros + n_asientos))))
+    return {'indptr': indptr, 'columnas': columnas[orden].astype(np.int64), 'costos': costos[orden]}
+
+def _valores(personas, precios, arreglos):
+    # Aristas de las personas indicadas con su valor costo + precio, en formato CSR
+    indptr = arreglos['indptr']
+    longitudes = indptr[personas + 1] - indptr[personas]
+    inicios = np.cumsum(longitudes) - longitudes
+    aristas = np.repeat(indptr[personas] - inicios, longitudes) + np.arange(int(longitudes.sum()))
+    columnas = arreglos['columnas'][aristas]
+    return columnas, arreglos['costos'][aristas] + precios[columnas], inicios, longitudes
+
+def _pujas(personas, precios, epsilon, arreglos=None):
+    # Pujas de Jacobi de las personas indicadas (todas con los mismos precios): cada una puja
+    # por el objeto con menor costo + precio y sube su precio en la diferencia con el segundo
+    # mejor mas epsilon. Devuelve (personas, objeto, nuevo precio).
+    columnas, valores, inicios, _ = _valores(personas, precios, arreglos if arreglos is not None else _ARREGLOS)
+    mejor, pos = (arreglo[0] for arreglo in min_por_segmento(valores, inicios))
+    valores[pos] = np.inf
+    segundo = min_por_segmento(valores, inicios)[0][0]
+    # con un solo objeto posible no hay competencia: basta con epsilon
+    segundo = np.where(np.isfinite(segundo), segundo, mejor)
+    objetos = columnas[pos]
+    return personas, objetos, precios[objetos] + (segundo - mejor) + epsilon
+
+def _puja_persona(persona, precios, epsilon, arreglos):
+    # Puja de una sola persona (igual que _pujas), sin armar los arreglos de un bloque
+    inicio, fin = arreglos['indptr'][persona], arreglos['indptr'][persona + 1]
+    columnas = arreglos['columnas'][inicio:fin]
+    valores = arreglos['costos'][inicio:fin] + precios[columnas]
+    if len(valores) == 1:
+        return int(columnas[0]), precios[columnas[0]] + epsilon
+    dos = np.argpartition(valores, 1)[:2]
+    objeto = int(columnas[dos[0]])
+    return objeto, precios[objeto] + (valores[dos[1]] - valores[dos[0]]) + epsilon
+
+def _cumplen_holgura(personas, objeto, precios, epsilon, arreglos):
+    # Personas cuya asignacion actual esta a menos de epsilon de su mejor objeto
+    columnas, valores, inicios, longitudes = _valores(personas, precios, arreglos)
+    mejor = min_por_segmento(valores, inicios)[0][0]
+    actual = min_por_segmento(np.where(columnas == np.repeat(objeto[personas], longitudes), valores, np.inf), inicios)[0][0]
+    return actual <= mejor + epsilon
+
+def _pujas_rango(inicio, fin, epsilon):
+    return _pujas(_ARREGLOS['libres'][inicio:fin], _ARREGLOS['precios'], epsilon)
+
+def _ronda(libres, precios, epsilon, arreglos, pool, cpus):
+    if pool is None or len(libres) < PUJAS_POR_PROCESO:
+        return _pujas(libres, precios, epsilon, arreglos)
+    # los procesos leen precios y libres de memoria compartida; solo se envia el rango de cada uno
+    arreglos['libres'][:len(libres)] = libres
+    limites = np.linspace(0, len(libres), cpus + 1).astype(np.int64).tolist()
+    partes = pool.starmap(_pujas_rango, [(inicio, fin, epsilon) for inicio, fin in zip(limites[:-1], limites[1:])])
+    return tuple(np.concatenate(columna) for columna in zip(*partes))
+
+def _subasta(arreglos, epsilon_final, pool=None, cpus=1):
+    # Subasta con escalamiento de epsilon (minimizacion de costo). Cada fase parte de los
+    # precios de la anterior y termina cuando todas las personas tienen objeto.
+    # arreglos['precios'] (en ceros) se actualiza en su lugar; con pool, arreglos esta en
+    # memoria compartida e incluye 'libres'.
+    # Devuelve el objeto de cada persona y el numero de rondas (mas pujas secuenciales).
+    n = len(arreglos['indptr']) - 1
+    precios = arreglos['precios']
+    objeto = np.full(n, -1, dtype=np.int64)
+    costo_max = float(arreglos['costos'].max()) if len(arreglos['costos']) else 0.0
+    epsilon = max(costo_max / FACTOR_EPSILON, epsilon_final)
+    rondas = 0
+    dueno = np.full(n, -1, dtype=np.int64)
+    while True:
+        # se conservan las asignaciones de la fase anterior que cumplen holgura con el nuevo epsilon
+        asignadas = np.flatnonzero(objeto >= 0)
+        if len(asignadas):
+            liberadas = asignadas[~_cumplen_holgura(asignadas, objeto, precios, epsilon, arreglos)]
+            dueno[objeto[liberadas]] = -1
+            objeto[liberadas] = -1
+        libres = np.flatnonzero(objeto < 0)
+        while len(libres) > PUJAS_SECUENCIALES:
+            rondas += 1
+            personas, objetos, pujas = _ronda(libres, precios, epsilon, arreglos, pool, cpus)
+            # gana la puja mas alta de cada objeto
+            orden = np.lexsort((-pujas, objetos))
+            primera = np.ones(len(orden), dtype=bool)
+            primera[1:] = objetos[orden[1:]] != objetos[orden[:-1]]
+            ganadoras = orden[primera]
+            objetos, personas = objetos[ganadoras], personas[ganadoras]
+            anteriores = dueno[objetos]
+            anteriores = anteriores[anteriores >= 0]
+            objeto[anteriores] = -1
+            precios[objetos] = pujas[ganadoras]
+            dueno[objetos] = personas
+            objeto[personas] = objetos
+            libres = np.flatnonzero(objeto < 0)
+        # con pocas personas libres las pujas forman cadenas de desalojos: se sigue cada
+        # cadena de una persona a la vez (Gauss-Seidel)
+        pendientes = libres.tolist()
+        while pendientes:
+            rondas += 1
+            persona = pendientes.pop()
+            j, puja = _puja_persona(persona, precios, epsilon, arreglos)
+            anterior = dueno[j]
+            if anterior >= 0:
+                objeto[anterior] = -1
+                pendientes.append(int(anterior))
+            precios[j] = puja
+            dueno[j] = persona
+            objeto[persona] = j
+        if epsilon <= epsilon_final:
+            return objeto, rondas
+        epsilon = max(epsilon / FACTOR_EPSILON, epsilon_final)
+
+def algoritmo_subasta(veh_factory, q, epsilon=1.0, n_procesos=None):
+    # Asignacion personas -> asientos con el algoritmo de subasta (pujas de Jacobi vectorizadas
+    # y escalamiento de epsilon) sobre el mismo problema que algoritmo_optimo.
+    # epsilon: epsilon final (metros); la distancia total queda a lo mas epsilon por persona
+    # y por asiento por encima del optimo
+    # n_procesos: procesos que calculan las pujas de bloques disjuntos de personas en cada
+    # ronda; por defecto la mitad de los cpus (1 lo hace en el proceso principal)
+    # Devuelve lo mismo que algoritmo_optimo: (estado, total_people_walk, vehicles_final)
+    estado = EstadoAsignacion(veh_factory)
+    path_len = estado.path_len
+    parejas = _parejas_utiles(q, path_len, estado.lugares)
+    if len(parejas):
+        grafo, conductor_asiento = _grafo_asientos(parejas, path_len, estado.lugares)
+        n_asientos = len(conductor_asiento)
+        arreglos = _problema_simetrico(grafo, n_asientos)
+        n = len(arreglos['indptr']) - 1
+        arreglos['precios'] = np.zeros(n)
+        cpus = n_procesos if n_procesos else max(1, mp.cpu_count()//2)
+        print("Subasta con", n, "personas y objetos, cpus:", cpus)
+        if cpus == 1:
+            objeto, rondas = _subasta(arreglos, epsilon)
+        else:
+            arreglos['libres'] = np.empty(n, dtype=np.int64)
+            with ArreglosCompartidos(arreglos) as compartidos:
+                with mp.get_context("spawn").Pool(cpus, initializer=_inicializar_proceso, initargs=(compartidos.specs,)) as pool:
+                    objeto, rondas = _subasta(compartidos.arreglos, epsilon, pool, cpus)
+        print("Rondas de pujas: ", rondas)
+
+        columnas = objeto[:len(path_len)]
+        pasajeros = np.flatnonzero(columnas < n_asientos)
+        _asignar_parejas(estado, parejas, pasajeros, conductor_asiento[columnas[pasajeros]])
+
+    estado.marcar_sin_asignar()
+    total_people_walk, vehicles_final = resultados_asignacion(estado, q.ids_pasajeros, q.ids_conductores)
+    return estado, total_people_walk, vehicles_final
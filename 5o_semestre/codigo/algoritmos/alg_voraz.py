@@ -1,42 +1,78 @@
-import copy
 import random
+import numpy as np
+from algoritmos.candidatos import SIN_CANDIDATO
+from algoritmos.estado_asignacion import EstadoAsignacion, SIN_ASIGNAR
 
-def algoritmo_voraz(veh_factory, dict_distances):
-    vehicle_factory_v1 = copy.deepcopy(veh_factory)
-    sharing = vehicle_factory_v1.veh_sharing
-    sharing_not = vehicle_factory_v1.veh_not_sharing
-    random.shuffle(sharing_not)
+# Filas con a lo mas este numero de candidatos se recorren sin numpy
+FILA_CORTA = 32
+
+def _recorrido_voraz(orden, filas, mas_cercano, dist_mas_cercano, distancias, lugares):
+    # Asigna a cada persona (en el orden dado) su vehiculo con lugares mas cercano; solo usa
+    # indices y arreglos, sin objetos Vehicle (lo usan tambien los procesos de voraz_multiple).
+    # lugares se modifica. Devuelve el vehiculo (SIN_ASIGNAR si no alcanza) y la distancia
+    # de cada persona en el orden recorrido.
+    # vehiculo mas cercano de cada persona sin considerar capacidad; solo se vuelve a
+    # buscar en la fila (argmin enmascarando vehiculos llenos) si ese vehiculo ya se lleno
+    asignados = []
+    for idx_not in orden:
+        idx = filas[idx_not]
+        idx_sh = mas_cercano[idx]
+        user_distance_walk = dist_mas_cercano[idx]
+        if idx_sh != SIN_ASIGNAR and lugares[idx_sh] <= 0: #check vehicle max capacity
+            conductores, dist_candidatos = distancias.fila(idx)
+            if len(conductores) <= FILA_CORTA:
+                # filas recortadas (radio/top_k): un ciclo simple es mas rapido que numpy
+                idx_sh, user_distance_walk = SIN_ASIGNAR, SIN_CANDIDATO
+                for idx_c, dist_c in zip(conductores.tolist(), dist_candidatos.tolist()):
+                    if dist_c < user_distance_walk and lugares[idx_c] > 0:
+                        idx_sh, user_distance_walk = idx_c, dist_c
+            else:
+                dist_libres = np.where(lugares[conductores] > 0, dist_candidatos, SIN_CANDIDATO)
+                pos = int(np.argmin(dist_libres))
+                user_distance_walk = dist_libres[pos].item()
+                idx_sh = int(conductores[pos]) if user_distance_walk != SIN_CANDIDATO else SIN_ASIGNAR
+        if idx_sh != SIN_ASIGNAR:
+            lugares[idx_sh] -= 1
+        asignados.append((idx_not, idx_sh, user_distance_walk))
+    return asignados
+
+def algoritmo_voraz(veh_factory, distancias, semilla=None):
+    # No copia la fabrica: la asignacion se guarda en EstadoAsignacion.
+    # semilla: si se indica, el orden se baraja con random.Random(semilla) y no con el
+    # generador global de random (misma permutacion que random.seed(semilla) + shuffle)
+    # Precision: las comparaciones y la suma se hacen con floats de Python (float64) de los
+    # valores guardados en distancias. MatrizDistancias guarda float32, asi que cada distancia
+    # ya viene redondeada (error relativo ~6e-8): el total puede diferir del calculado con
+    # CandidatosDispersos (float64) y dos vehiculos a distancias que solo difieren por debajo
+    # de ese redondeo empatan y se elige el primero. Para resultados exactos en float64 se
+    # pasa CandidatosDispersos (candidatos_cercanos).
+    # Devuelve (estado, total_people_walk, final_vehicles); estado.materializar() genera la
+    # fabrica con la asignacion para save_rou_file.
+    estado = EstadoAsignacion(veh_factory)
+    sharing = veh_factory.veh_sharing
+    sharing_not = veh_factory.veh_not_sharing
+    # se barajan indices en lugar de la lista de vehiculos (misma permutacion con la misma semilla)
+    orden = list(range(len(sharing_not)))
+    (random.Random(semilla) if semilla is not None else random).shuffle(orden)
+    # indice de cada persona en la matriz de candidatos (no su posicion despues del shuffle)
+    idx_pasajero = distancias.idx_pasajero
+    filas = [idx_pasajero[veh_not.get_attribute('id')] for veh_not in sharing_not]
+    mas_cercano, dist_mas_cercano = distancias.mas_cercanos()
+    mas_cercano, dist_mas_cercano = mas_cercano.tolist(), dist_mas_cercano.astype(np.float64).tolist()
+    asignados = _recorrido_voraz(orden, filas, mas_cercano, dist_mas_cercano, distancias, estado.lugares.copy())
     final_vehicles = []
     total_people_walk = 0
-    for idx, veh_not in enumerate(sharing_not):
-        veh_id_not = veh_not.get_attribute('id')        
-        final_shortest_path = []
-        for veh_sh in sharing:
-            veh_id_sh = veh_sh.get_attribute('id')
-            veh_current_capacity = veh_sh.get_attribute("personNumber")
-            
-            veh_att = veh_sh.get_attribute("type")
-            veh_capacity = veh_att.get_attribute("personCapacity")
-            # s_all_shortest_path = []
-            # t_all_shortest_path = []
-            if veh_current_capacity != veh_capacity: #check vehicle max capacity
-                user_distance_walk = dict_distances[veh_id_sh][idx]
-                aux = (user_distance_walk,(veh_not, veh_sh), (veh_id_not, veh_id_sh)) #usuario, carro 
-                final_shortest_path.append(aux)
-        
-        if final_shortest_path:
-            min_final = min(final_shortest_path, key=lambda x: x[0])
-            final_vehicles.append(min_final)
-            veh_sh_x = min_final[-2][1]            
-            veh_person_cap = veh_sh_x.get_attribute('personNumber')
-            veh_sh_x.set_attribute('personNumber', veh_person_cap+1)
-            v_not = min_final[-2][0]
-            v_not.user_dist_walk = min_final[0]
-            total_people_walk += v_not.user_dist_walk 
-            veh_sh_x.vehicles_sharing= v_not
+    for idx_not, idx_sh, user_distance_walk in asignados:
+        veh_not = sharing_not[idx_not]
+        if idx_sh != SIN_ASIGNAR:
+            veh_sh = sharing[idx_sh]
+            estado.asignar(idx_not, idx_sh, user_distance_walk)
+            total_people_walk += user_distance_walk
+            final_vehicles.append((user_distance_walk, (veh_not, veh_sh),
+                                   (veh_not.get_attribute('id'), veh_sh.get_attribute('id')))) #usuario, carro
         else:
-            vehicle_factory_v1.veh_not_get = veh_not
+            estado.marcar_sin_vehiculo(idx_not)
             l_path = veh_not.get_attribute('route').ox_route.path_len
             total_people_walk += l_path
-        
-    return vehicle_factory_v1, total_people_walk, final_vehicles
\ No newline at end of file
+
+    return estado, total_people_walk, final_vehicles
@@ -0,0 +1,100 @@
+import multiprocessing as mp
+import random
+import numpy as np
+from algoritmos.alg_voraz import _recorrido_voraz, algoritmo_voraz
+from algoritmos.estado_asignacion import EstadoAsignacion, SIN_ASIGNAR
+from algoritmos.memoria_compartida import ArreglosCompartidos
+
+# Cuantiles de la distancia total que se reportan por defecto
+CUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Corridas que se envian juntas a un proceso del pool
+CORRIDAS_POR_TAREA = 8
+
+# Bloques de memoria compartida y datos que cada proceso abre una sola vez en _inicializar_proceso
+_BLOQUES = []
+_CONTEXTO = None
+
+def _crear_contexto(tipo, arreglos, ids_pasajeros, ids_conductores):
+    # Estructura de distancias y listas que usa _recorrido_voraz, a partir de los arreglos
+    distancias = tipo.desde_arreglos({nombre: arreglo for nombre, arreglo in arreglos.items()
+                                      if not nombre.startswith('voraz_')}, ids_pasajeros, ids_conductores)
+    return {
+        'distancias': distancias,
+        'filas': arreglos['voraz_filas'].tolist(),
+        'mas_cercano': arreglos['voraz_mas_cercano'].tolist(),
+        'dist_mas_cercano': arreglos['voraz_dist_mas_cercano'].tolist(),
+        'lugares': arreglos['voraz_lugares'],
+        'path_len': arreglos['voraz_path_len'].tolist(),
+    }
+
+def _inicializar_proceso(specs, tipo, ids_pasajeros, ids_conductores):
+    global _BLOQUES, _CONTEXTO
+    _BLOQUES, arreglos = ArreglosCompartidos.adjuntar(specs)
+    _CONTEXTO = _crear_contexto(tipo, arreglos, ids_pasajeros, ids_conductores)
+
+def _corridas(semillas, contexto=None):
+    # Distancia total de una corrida de algoritmo_voraz por semilla (mismo orden de suma)
+    c = contexto if contexto is not None else _CONTEXTO
+    path_len = c['path_len']
+    totales = []
+    for semilla in semillas:
+        orden = list(range(len(c['filas'])))
+        random.Random(semilla).shuffle(orden)
+        asignados = _recorrido_voraz(orden, c['filas'], c['mas_cercano'], c['dist_mas_cercano'],
+                                     c['distancias'], c['lugares'].copy())
+        total_people_walk = 0
+        for idx_not, idx_sh, user_distance_walk in asignados:
+            total_people_walk += user_distance_walk if idx_sh != SIN_ASIGNAR else path_len[idx_not]
+        totales.append(total_people_walk)
+    return totales
+
+def algoritmo_voraz_multiple(veh_factory, distancias, n_corridas, semilla=None, n_procesos=None, cuantiles=CUANTILES):
+    # Ejecuta n_corridas de algoritmo_voraz con semillas independientes en un pool de procesos
+    # que comparten la estructura de distancias (solo lectura) en memoria compartida; si sus
+    # arreglos son memmaps (p.ej. de candidatos_en_disco) cada proceso abre los archivos.
+    # semilla: semilla base; las semillas de cada corrida se derivan de ella con
+    # numpy.random.SeedSequence, por lo que la corrida i es reproducible con
+    # algoritmo_voraz(veh_factory, distancias, semilla=estadisticas['semillas'][i])
+    # Devuelve (estado, total_people_walk, final_vehicles) de la mejor corrida y un dict con
+    # las semillas, los totales de cada corrida y su mejor, media, desviacion y cuantiles.
+    semillas = np.random.SeedSequence(semilla).generate_state(n_corridas).tolist()
+    estado = EstadoAsignacion(veh_factory)
+    idx_pasajero = distancias.idx_pasajero
+    mas_cercano, dist_mas_cercano = distancias.mas_cercanos()
+    arreglos = dict(distancias.arreglos())
+    arreglos.update({
+        'voraz_filas': np.array([idx_pasajero[v.get_attribute('id')] for v in veh_factory.veh_not_sharing], dtype=np.int64),
+        'voraz_mas_cercano': mas_cercano,
+        'voraz_dist_mas_cercano': dist_mas_cercano,
+        'voraz_lugares': estado.lugares,
+        'voraz_path_len': estado.path_len,
+    })
+    ids = (distancias.ids_pasajeros, distancias.ids_conductores)
+    cpus = n_procesos if n_procesos else max(1, mp.cpu_count()//2)
+    print("Ejecutando", n_corridas, "corridas del algoritmo voraz con cpus:", cpus)
+    tareas = [semillas[inicio:inicio + CORRIDAS_POR_TAREA] for inicio in range(0, n_corridas, CORRIDAS_POR_TAREA)]
+    if cpus == 1 or len(tareas) == 1:
+        contexto = _crear_contexto(type(distancias), arreglos, *ids)
+        partes = [_corridas(tarea, contexto) for tarea in tareas]
+    else:
+        with ArreglosCompartidos(arreglos) as compartidos:
+            with mp.get_context("spawn").Pool(cpus, initializer=_inicializar_proceso,
+                                              initargs=(compartidos.specs, type(distancias), *ids)) as pool:
+                partes = pool.map(_corridas, tareas)
+    totales = np.array([total for parte in partes for total in parte])
+
+    mejor = int(np.argmin(totales))
+    estadisticas = {
+        'semillas': semillas,
+        'totales': totales,
+        'semilla_mejor': semillas[mejor],
+        'mejor': float(totales[mejor]),
+        'media': float(totales.mean()),
+        'desviacion': float(totales.std()),
+        'cuantiles': {c: float(v) for c, v in zip(cuantiles, np.quantile(totales, cuantiles))},
+    }
+    print("Mejor: {mejor}, media: {media}, desviacion: {desviacion}".format(**estadisticas))
+    # la mejor asignacion se reconstruye con su semilla en el proceso principal
+    estado, total_people_walk, final_vehicles = algoritmo_voraz(veh_factory, distancias, semilla=semillas[mejor])
+    return estado, total_people_walk, final_vehicles, estadisticas
@@ -1,58 +1,52 @@
-import copy
+import numpy as np
+from algoritmos.estado_asignacion import EstadoAsignacion, resultados_asignacion
 
-def _procesar_rutas(vehicle_factory_v2, q):
-    flag = True
-    v_not_sharing = vehicle_factory_v2.veh_not_sharing
-    v_sharing = vehicle_factory_v2.veh_sharing
-    l_v_not_sharing = len(v_not_sharing)
-    l_v_sharing = len(v_sharing)
-    v_sharing_aux = []
-    v_not_aux = []
-    total_people_walk = 0
-    vehicles_final = []
-    while flag:
-        l_sharing_aux = len(v_sharing_aux)
-        l_v_not_aux = len(v_not_aux)
-        if l_v_sharing != l_sharing_aux and l_v_not_sharing != l_v_not_aux:
-            data = q.get()
-            item = data.data
-            id_not = item[-1][0]
-            id_sh = item[-1][1]
-            v_not = vehicle_factory_v2.get_vehicle_by_id(id_not)
-            v_sh = vehicle_factory_v2.get_vehicle_by_id(id_sh)
-            
-            v_current_capa = v_sh.get_attribute("personNumber")
-            v_att = v_sh.get_attribute("type")
-            v_capacity = v_att.get_attribute("personCapacity")
-            
-            if v_current_capa != v_capacity:
-                if not(v_not in v_not_aux):
-                    veh_person_cap = v_sh.get_attribute('personNumber')
-                    v_sh.set_attribute('personNumber', veh_person_cap + 1)
-                    
-                    v_not.user_dist_walk = item[0]
-                    total_people_walk += v_not.user_dist_walk 
-                    v_sh.vehicles_sharing= v_not
-                    v_not_aux.append(v_not)
-                    vehicles_final.append(item)
-            else:
-                if not(v_sh in v_sharing_aux):
-                    v_sharing_aux.append(v_sh)
-        else:
-            flag = False
-    
-    #checar si existen personas sin vehiculo
-    if l_v_not_sharing>len(v_not_aux):
-        for v in v_not_sharing:
-            if not(v in v_not_aux):
-                vehicle_factory_v2.veh_not_get = v
-                l_path = v.get_attribute('route').ox_route.path_len
-                total_people_walk += l_path
-                
-    return total_people_walk, vehicles_final
+def _procesar_rutas(estado, q):
+    # Recorre los candidatos en orden de prioridad usando solo indices y arreglos booleanos
+    # por persona y por vehiculo; no consulta objetos Vehicle.
+    # Termina al agotar los candidatos, al asignar a todas las personas o al llenar
+    # todos los vehiculos compartidos.
+    lugares = estado.lugares
+    asignado = np.zeros(len(estado.conductor), dtype=bool)
+    lleno = lugares <= 0
+    pendientes = len(asignado)
+    con_lugar = len(lleno) - int(lleno.sum())
+    extraidos = 0
+    if pendientes and con_lugar:
+        for bloque in q.bloques():
+            # descarta de una vez las parejas con persona asignada o vehiculo lleno al inicio del bloque
+            vivos = np.flatnonzero(~asignado[bloque['pasajero']] & ~lleno[bloque['conductor']])
+            terminado = False
+            for pos, (prioridad, idx_not, idx_sh, nodo_s, nodo_t) in zip(vivos.tolist(), bloque[vivos].tolist()):
+                if lleno[idx_sh] or asignado[idx_not]:
+                    continue
+                estado.asignar(idx_not, idx_sh, prioridad, nodo_s, nodo_t)
+                asignado[idx_not] = True
+                pendientes -= 1
+                if lugares[idx_sh] <= 0:
+                    lleno[idx_sh] = True
+                    con_lugar -= 1
+                if not pendientes or not con_lugar:
+                    extraidos += pos + 1
+                    terminado = True
+                    break
+            if terminado:
+                break
+            extraidos += len(bloque)
+    asignaciones = len(asignado) - pendientes
+    return {'extraidos': extraidos, 'descartados': extraidos - asignaciones, 'asignaciones': asignaciones}
 
-def algoritmo_voraz_q_prioridades(veh_factory, q):
-    vehicle_factory_v2 = copy.deepcopy(veh_factory)
+def algoritmo_voraz_q_prioridades(veh_factory, q, contadores=None):
+    # No copia la fabrica: devuelve (estado, total_people_walk, vehicles_final);
+    # estado.materializar() genera la fabrica con la asignacion para save_rou_file.
+    # contadores: dict opcional donde se guardan extraidos, descartados y asignaciones
+    estado = EstadoAsignacion(veh_factory)
     print("Obteniendo distancia total")
-    total_people_walk, vehicles_final = _procesar_rutas(vehicle_factory_v2, q)
-    return vehicle_factory_v2, total_people_walk, vehicles_final
\ No newline at end of file
+    conteo = _procesar_rutas(estado, q)
+    print("Candidatos extraidos: {extraidos}, descartados: {descartados}, asignaciones: {asignaciones}".format(**conteo))
+    if contadores is not None:
+        contadores.update(conteo)
+
+    estado.marcar_sin_asignar()
+    total_people_walk, vehicles_final = resultados_asignacion(estado, q.ids_pasajeros, q.ids_conductores)
+    return estado, total_people_walk, vehicles_final
@@ -1,95 +1,310 @@
-import copy
 import multiprocessing as mp
-from queue import PriorityQueue
-from algoritmos.distances import haversine_distance
-
-class PrioritizedItem:
-    def __init__(self, priority, data):
-        self.priority = priority
-        self.data = data
-    
-    def __lt__(self, other):
-        return self.priority < other.priority
-
-def _generar_combinaciones(vehicle_factory):
+import numpy as np
+from algoritmos.indice_espacial import IndiceRutas
+from algoritmos.candidatos import CandidatosDispersos, ELEMENTOS_POR_BLOQUE, ListaCandidatos, seleccionar_top_k
+from algoritmos.matriz_distancias import MatrizDistancias
+from algoritmos.distancias_red import CacheRed, bloques_parejas_red, RADIO_RED
+from algoritmos.memoria_compartida import ArreglosCompartidos
+from algoritmos.almacen_candidatos import EscritorCandidatos
+
+# Rangos de vehiculos compartidos que se generan por cada proceso del pool
+TAREAS_POR_PROCESO = 4
+
+# Arreglos de solo lectura e indice espacial que cada proceso abre una sola vez en _inicializar_proceso
+_BLOQUES = []
+_ARREGLOS = {}
+_INDICE = None
+
+def _coordenadas_nodos(G, nodes, tabla_nodos=None):
+    if tabla_nodos is not None:
+        rows = tabla_nodos.rows(nodes)
+        return tabla_nodos.lat[rows], tabla_nodos.lon[rows]
+    lat = np.fromiter((G.nodes[node]['y'] for node in nodes), dtype=np.float64, count=len(nodes))
+    lon = np.fromiter((G.nodes[node]['x'] for node in nodes), dtype=np.float64, count=len(nodes))
+    return lat, lon
+
+def _coordenadas_ruta(G, ox_route, tabla_nodos=None):
+    # Nodos y coordenadas de una ruta; usa los arreglos que RouteOx guarda en create_route
+    # y solo los calcula si la ruta no los tiene (p.ej. rutas guardadas antes de existir)
+    lat = getattr(ox_route, 'lat', None)
+    if lat is not None:
+        return ox_route.nodes, lat, ox_route.lon
+    nodes = np.asarray(ox_route.route, dtype=np.int64)
+    lat, lon = _coordenadas_nodos(G, nodes, tabla_nodos)
+    return nodes, lat, lon
+
+def _generar_arreglos(vehicle_factory, tabla_nodos=None):
+    # Convierte personas y rutas compartidas en arreglos contiguos que se
+    # colocan en memoria compartida; los procesos solo reciben indices.
+    G = vehicle_factory.G
     sharing = vehicle_factory.veh_sharing
     sharing_not = vehicle_factory.veh_not_sharing
-    G = vehicle_factory.G
-    veh_combinations = []
-    for veh_not in sharing_not:
-       for veh_sh in sharing:
-           veh_combinations.append((G, veh_not, veh_sh))
-    return veh_combinations
-
-def _calculate_min_distances(G, veh_not, veh_sh):
-    veh_id_not = veh_not.get_attribute('id')
-    ox_route =  veh_not.get_attribute('route').ox_route
-    s = ox_route.orig
-    s_data = G.nodes[s]
-    lat_s = s_data['y']
-    lon_s = s_data['x']
-    
-    t = ox_route.dest_sharing
-    t_data = G.nodes[t]
-    lat_t = t_data['y']
-    lon_t = t_data['x']
-    
-    final_shortest_path = []
-    s_all_shortest_path = []
-    t_all_shortest_path = []
-    
-    veh_att = veh_sh.get_attribute('route')
-    veh_id_sh = veh_sh.get_attribute('id')
-    v_route_ox = veh_att.ox_route.route    
-    for node in v_route_ox:
-        node_data = G.nodes[node]
-        lat_veh = node_data['y']
-        lon_veh = node_data['x']
-        dist_s = haversine_distance(lat_s, lon_s, lat_veh, lon_veh)
-        dist_t = haversine_distance(lat_t, lon_t, lat_veh, lon_veh)
-        if dist_s is not None:
-            s_all_shortest_path.append((dist_s, node))
-        if dist_t is not None:
-            t_all_shortest_path.append((dist_t, node))
-    min_s_path = min(s_all_shortest_path, key=lambda x: x[0])
-    min_t_path = min(t_all_shortest_path, key=lambda x: x[0])
-    user_distance_walk = min_s_path[0]+min_t_path[0]+ veh_not.user_dist_walk
-    aux = (user_distance_walk,(s, t), (min_s_path[1], min_t_path[1]), (veh_not, veh_sh), (veh_id_not, veh_id_sh))              
-    return aux
-
-def _ordenar_rutas(min_paths, vehicle_factory):
-    q=PriorityQueue()  #Crear cola de prioridades
-
-    dict_distances = {}
-    veh_not_sharing = vehicle_factory.veh_not_sharing
-    l_v_sharing = len(veh_not_sharing)
-    idx_dictionary_sharing = {}
-    dict_distances = {}
-    
-    for idx, v in enumerate(veh_not_sharing):
-        idx_dictionary_sharing[v.get_attribute('id')] = idx
-    
-    for min_path in min_paths:
-        item = PrioritizedItem(priority=min_path[0], data=min_path)
-        q.put(item)
-        id_sh = min_path[-1][1]
-        if not(id_sh in dict_distances):
-            dict_distances[id_sh] = [-1]*l_v_sharing
-        
-        id_not = min_path[-1][0]
-        index = idx_dictionary_sharing[id_not]
-        dict_distances[id_sh][index] = min_path[0]
-    return q, dict_distances                      
-
-
-def all_people_distances(veh_factory):
-    vehicle_factory = copy.deepcopy(veh_factory)
-    combinations = _generar_combinaciones(vehicle_factory)
-    cpus = mp.cpu_count()/2
-    cpus = print("Ejecutando distancias con cpus:", cpus)
-    print("El numero de combinaciones es: ", len(combinations))
-    with mp.get_context("spawn").Pool(cpus) as pool:
-        min_paths = pool.starmap_async(_calculate_min_distances, combinations).get()
-    q, dict_distances = _ordenar_rutas(min_paths, vehicle_factory)
-        
-    return q, dict_distances
\ No newline at end of file
+
+    orig = []
+    dest = []
+    walk = np.empty(len(sharing_not), dtype=np.float64)
+    for idx, veh_not in enumerate(sharing_not):
+        ox_route = veh_not.get_attribute('route').ox_route
+        orig.append(ox_route.orig)
+        dest.append(ox_route.dest_sharing)
+        walk[idx] = veh_not.user_dist_walk
+    # Muchas personas comparten nodo de origen y hay pocos destinos compartidos: las distancias
+    # se calculan una vez por origen/destino unico y se reparten con inv_o / inv_d
+    orig = np.asarray(orig, dtype=np.int64)
+    dest = np.asarray(dest, dtype=np.int64)
+    orig_u, inv_o = np.unique(orig, return_inverse=True)
+    dest_u, inv_d = np.unique(dest, return_inverse=True)
+    lat_o, lon_o = _coordenadas_nodos(G, orig_u, tabla_nodos)
+    lat_d, lon_d = _coordenadas_nodos(G, dest_u, tabla_nodos)
+
+    # Nodos de todas las rutas compartidas concatenados (formato CSR)
+    rutas = [_coordenadas_ruta(G, veh_sh.get_attribute('route').ox_route, tabla_nodos) for veh_sh in sharing]
+    longitudes = np.fromiter((len(ruta[0]) for ruta in rutas), dtype=np.int64, count=len(rutas))
+    inicios = np.concatenate(([0], np.cumsum(longitudes)[:-1])).astype(np.int64)
+    if rutas:
+        nodos, lat_r, lon_r = (np.concatenate(columna) for columna in zip(*rutas))
+    else:
+        nodos = np.empty(0, dtype=np.int64)
+        lat_r = lon_r = np.empty(0, dtype=np.float64)
+
+    return {
+        'lat_s': lat_o[inv_o], 'lon_s': lon_o[inv_o],
+        'lat_t': lat_d[inv_d], 'lon_t': lon_d[inv_d],
+        'lat_o': lat_o, 'lon_o': lon_o, 'inv_o': inv_o.astype(np.int64),
+        'lat_d': lat_d, 'lon_d': lon_d, 'inv_d': inv_d.astype(np.int64),
+        'walk': walk,
+        'orig': orig,
+        'dest': dest,
+        'nodos': nodos,
+        'inicios': inicios,
+        'lat_r': lat_r, 'lon_r': lon_r,
+    }
+
+def _inicializar_proceso(specs):
+    global _BLOQUES, _ARREGLOS, _INDICE
+    _BLOQUES, _ARREGLOS = ArreglosCompartidos.adjuntar(specs)
+    _INDICE = IndiceRutas(_ARREGLOS['lat_r'], _ARREGLOS['lon_r'], _ARREGLOS['inicios'])
+
+def _mas_cercano_unicos(indice, idx_veh, lat, lon, inversa):
+    # Nodo mas cercano de la ruta para los origenes/destinos unicos de un subconjunto de personas
+    unicos, inv = np.unique(inversa, return_inverse=True)
+    dist, pos = indice.mas_cercano(idx_veh, lat[unicos], lon[unicos])
+    return dist[inv], pos[inv]
+
+def _calcular_bloque(inicio, fin, radio_caminata=None, top_k=None, arreglos=None, indice=None):
+    # Parejas candidatas de todas las personas contra las rutas compartidas [inicio, fin)
+    if arreglos is None:
+        arreglos = _ARREGLOS
+        indice = _INDICE
+    lat_o = arreglos['lat_o']
+    lon_o = arreglos['lon_o']
+    inv_o = arreglos['inv_o']
+    lat_d = arreglos['lat_d']
+    lon_d = arreglos['lon_d']
+    inv_d = arreglos['inv_d']
+    walk = arreglos['walk']
+
+    if radio_caminata is not None:
+        # cota inferior con las cajas de cada ruta, descarta parejas sin recorrer nodos
+        cotas = (indice.cotas_inferiores(lat_o, lon_o, inicio, fin)[inv_o]
+                 + indice.cotas_inferiores(lat_d, lon_d, inicio, fin)[inv_d] + walk[:, None])
+
+    pasajeros = []
+    conductores = []
+    distancias = []
+    pos_s = []
+    pos_t = []
+    todos = np.arange(len(walk))
+    for col, idx_veh in enumerate(range(inicio, fin)):
+        pas = todos if radio_caminata is None else np.flatnonzero(cotas[:, col] <= radio_caminata)
+        if not len(pas):
+            continue
+        if radio_caminata is None:
+            min_s, p_s = (arreglo[inv_o] for arreglo in indice.mas_cercano(idx_veh, lat_o, lon_o))
+            min_t, p_t = (arreglo[inv_d] for arreglo in indice.mas_cercano(idx_veh, lat_d, lon_d))
+        else:
+            min_s, p_s = _mas_cercano_unicos(indice, idx_veh, lat_o, lon_o, inv_o[pas])
+            min_t, p_t = _mas_cercano_unicos(indice, idx_veh, lat_d, lon_d, inv_d[pas])
+        dist = min_s + min_t + walk[pas]
+        if radio_caminata is not None:
+            dentro = dist <= radio_caminata
+            pas, dist, p_s, p_t = pas[dentro], dist[dentro], p_s[dentro], p_t[dentro]
+        pasajeros.append(pas)
+        conductores.append(np.full(len(pas), idx_veh, dtype=np.int64))
+        distancias.append(dist)
+        pos_s.append(p_s)
+        pos_t.append(p_t)
+
+    if not pasajeros:
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, vacio, np.empty(0, dtype=np.float64), vacio, vacio
+    pasajeros = np.concatenate(pasajeros)
+    conductores = np.concatenate(conductores)
+    distancias = np.concatenate(distancias)
+    pos_s = np.concatenate(pos_s)
+    pos_t = np.concatenate(pos_t)
+    if top_k is not None:
+        # el top_k global de cada persona esta contenido en la union de los top_k de cada bloque
+        seleccion = seleccionar_top_k(pasajeros, conductores, distancias, top_k)
+        pasajeros, conductores, distancias = pasajeros[seleccion], conductores[seleccion], distancias[seleccion]
+        pos_s, pos_t = pos_s[seleccion], pos_t[seleccion]
+    return pasajeros, conductores, distancias, pos_s, pos_t
+
+def _calcular_rango(rango):
+    # Adaptador de un solo argumento para imap_unordered
+    return _calcular_bloque(*rango)
+
+def _generar_rangos(n_conductores, cpus, tam_max=None):
+    # Varios rangos por proceso para balancear rutas de distinta longitud;
+    # tam_max acota los vehiculos por rango (y con ello la memoria de cada bloque)
+    tam = max(1, -(-n_conductores // (cpus * TAREAS_POR_PROCESO)))
+    if tam_max is not None:
+        tam = min(tam, tam_max)
+    return [(inicio, min(inicio + tam, n_conductores)) for inicio in range(0, n_conductores, tam)]
+
+
+def _calcular_red(arreglos, cache_red, radio_caminata):
+    # Parejas con distancia a pie sobre la red (modo='red'), se calcula en el proceso principal
+    # por bloques de a lo mas ELEMENTOS_POR_BLOQUE parejas
+    radio = radio_caminata if radio_caminata is not None else RADIO_RED
+    for inicio, distancias, pos_s, pos_t in bloques_parejas_red(arreglos, cache_red, radio):
+        filas, conductores = np.nonzero(distancias <= radio if radio_caminata is not None else np.isfinite(distancias))
+        yield (filas + inicio, conductores, distancias[filas, conductores],
+               pos_s[filas, conductores], pos_t[filas, conductores])
+
+def _iterar_bloques(arreglos, rangos, cpus, modo, cache_red, radio_caminata):
+    # Genera los bloques de parejas conforme se calculan (en cualquier orden)
+    if modo == 'red':
+        yield from _calcular_red(arreglos, cache_red, radio_caminata)
+    elif cpus == 1 or len(rangos) == 1:
+        indice = IndiceRutas(arreglos['lat_r'], arreglos['lon_r'], arreglos['inicios'])
+        for rango in rangos:
+            yield _calcular_bloque(*rango, arreglos, indice)
+    else:
+        with ArreglosCompartidos(arreglos) as compartidos:
+            with mp.get_context("spawn").Pool(cpus, initializer=_inicializar_proceso, initargs=(compartidos.specs,)) as pool:
+                yield from pool.imap_unordered(_calcular_rango, rangos)
+
+def _bloques_parejas(veh_factory, n_procesos, radio_caminata, top_k, modo, cache_red, tabla_nodos, en_disco=False):
+    # Prepara los arreglos y devuelve el generador de bloques de parejas, los nodos de las
+    # rutas compartidas y los ids de personas y vehiculos compartidos.
+    # solo lectura: no se copia la fabrica (ni el grafo)
+    l_not = len(veh_factory.veh_not_sharing)
+    l_sh = len(veh_factory.veh_sharing)
+    arreglos = _generar_arreglos(veh_factory, tabla_nodos)
+    cpus = n_procesos if n_procesos else max(1, mp.cpu_count()//2)
+    # en disco se acotan los vehiculos por rango para que cada bloque quepa en memoria
+    tam_max = max(1, ELEMENTOS_POR_BLOQUE // max(1, l_not)) if en_disco else None
+    rangos = [(inicio, fin, radio_caminata, top_k) for inicio, fin in _generar_rangos(l_sh, cpus, tam_max)]
+    print("Ejecutando distancias con cpus:", cpus)
+    print("El numero de combinaciones es: ", l_not*l_sh)
+
+    if modo == 'red' and cache_red is None:
+        cache_red = CacheRed(veh_factory.G)
+    bloques = _iterar_bloques(arreglos, rangos, cpus, modo, cache_red, radio_caminata) if l_not and l_sh else iter(())
+    ids_not = [v.get_attribute('id') for v in veh_factory.veh_not_sharing]
+    ids_sh = [v.get_attribute('id') for v in veh_factory.veh_sharing]
+    return bloques, arreglos['nodos'], ids_not, ids_sh
+
+def _candidatos_en_memoria(veh_factory, n_procesos, radio_caminata, top_k, modo, cache_red, tabla_nodos):
+    bloques, nodos, ids_not, ids_sh = _bloques_parejas(veh_factory, n_procesos, radio_caminata, top_k, modo,
+                                                       cache_red, tabla_nodos)
+    bloques = list(bloques)
+    if bloques:
+        pasajeros, conductores, distancias, pos_s, pos_t = (np.concatenate(columna) for columna in zip(*bloques))
+    else:
+        pasajeros = conductores = pos_s = pos_t = np.empty(0, dtype=np.int64)
+        distancias = np.empty(0, dtype=np.float64)
+    candidatos = CandidatosDispersos.desde_parejas(pasajeros, conductores, distancias, nodos[pos_s], nodos[pos_t],
+                                                   ids_not, ids_sh, top_k)
+    print("El numero de parejas candidatas es: ", candidatos.n_candidatos)
+    q = ListaCandidatos.desde_candidatos(candidatos)  #Lista de candidatos ordenada por prioridad
+    return q, candidatos
+
+def all_people_distances(veh_factory, n_procesos=None, modo='haversine', cache_red=None, tabla_nodos=None,
+                         ruta_matriz=None):
+    """
+    Calcula la distancia a caminar de todas las parejas persona / vehículo compartido en una
+    matriz densa.
+
+    Parámetros:
+    -----------
+    veh_factory : VehicleFactory
+        Fábrica de vehículos (solo lectura).
+    n_procesos : int, opcional
+        Procesos del pool. Por defecto la mitad de los núcleos.
+    modo : str, opcional
+        'haversine' (línea recta, por defecto) o 'red' (distancia a pie sobre el grafo; las
+        parejas a más de RADIO_RED quedan como SIN_CANDIDATO).
+    cache_red : CacheRed, opcional
+        Árboles de caminos reutilizables entre llamadas en modo 'red'.
+    tabla_nodos : NodeTable, opcional
+        Tabla de coordenadas de Map, para no consultar G.nodes nodo por nodo.
+    ruta_matriz : str, opcional
+        Archivo .npy donde se guarda la matriz como memmap.
+
+    Devuelve:
+    ---------
+    tuple
+        (ListaCandidatos ordenada por prioridad, MatrizDistancias).
+    """
+    q, candidatos = _candidatos_en_memoria(veh_factory, n_procesos, None, None, modo, cache_red, tabla_nodos)
+    return q, MatrizDistancias.desde_candidatos(candidatos, ruta_matriz)
+
+def candidatos_cercanos(veh_factory, radio_caminata=None, top_k=None, n_procesos=None, modo='haversine',
+                        cache_red=None, tabla_nodos=None):
+    """
+    Calcula solo las parejas persona / vehículo compartido candidatas, recortadas por radio
+    de caminata y por número de vehículos por persona, en formato CSR.
+
+    Parámetros:
+    -----------
+    veh_factory : VehicleFactory
+        Fábrica de vehículos (solo lectura).
+    radio_caminata : float, opcional
+        Distancia total máxima a caminar de una pareja candidata (metros). Por defecto sin
+        radio (en modo 'red', RADIO_RED).
+    top_k : int, opcional
+        Número máximo de vehículos compartidos candidatos por persona. Por defecto sin límite.
+    n_procesos, modo, cache_red, tabla_nodos :
+        Igual que en all_people_distances.
+
+    Devuelve:
+    ---------
+    tuple
+        (ListaCandidatos ordenada por prioridad, CandidatosDispersos).
+        MatrizDistancias.desde_candidatos convierte las distancias a una matriz densa.
+    """
+    return _candidatos_en_memoria(veh_factory, n_procesos, radio_caminata, top_k, modo, cache_red, tabla_nodos)
+
+def candidatos_en_disco(veh_factory, directorio, radio_caminata=None, top_k=None, n_procesos=None,
+                        modo='haversine', cache_red=None, tabla_nodos=None):
+    """
+    Igual que candidatos_cercanos, pero los bloques de parejas se escriben en disco conforme
+    se calculan (ver almacen_candidatos) y las estructuras devueltas leen de memmaps.
+    La memoria no depende del total de parejas, pero sí crece con el número de personas
+    (ver EscritorCandidatos).
+
+    Parámetros:
+    -----------
+    veh_factory : VehicleFactory
+        Fábrica de vehículos (solo lectura).
+    directorio : str
+        Directorio del almacén; se puede reabrir con cargar_almacen.
+    radio_caminata, top_k, n_procesos, modo, cache_red, tabla_nodos :
+        Igual que en candidatos_cercanos.
+
+    Devuelve:
+    ---------
+    tuple
+        (ListaCandidatosDisco ordenada por prioridad, CandidatosDispersos sobre memmaps).
+        MatrizDistancias.desde_candidatos(candidatos, ruta) la convierte a una matriz en disco.
+    """
+    bloques, nodos, ids_not, ids_sh = _bloques_parejas(veh_factory, n_procesos, radio_caminata, top_k, modo,
+                                                       cache_red, tabla_nodos, en_disco=True)
+    escritor = EscritorCandidatos(directorio, ids_not, ids_sh)
+    for pasajeros, conductores, distancias, pos_s, pos_t in bloques:
+        escritor.agregar_bloque(pasajeros, conductores, distancias, nodos[pos_s], nodos[pos_t])
+    q, candidatos = escritor.cerrar(top_k)
+    print("El numero de parejas candidatas es: ", candidatos.n_candidatos)
+    return q, candidatos
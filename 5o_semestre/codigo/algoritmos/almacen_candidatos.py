@@ -0,0 +1,301 @@
+import json
+import os
+import numpy as np
+from algoritmos.candidatos import (CandidatosDispersos, DTYPE_CANDIDATO, ELEMENTOS_POR_BLOQUE, ListaCandidatos,
+                                   seleccionar_top_k)
+
+# Archivos del almacen dentro del directorio
+ARCHIVO_META = "almacen.json"
+ARCHIVOS_CSR = {
+    'indptr': np.int64,
+    'conductores': np.int32,
+    'distancias': np.float64,
+    'nodos_s': np.int64,
+    'nodos_t': np.int64,
+}
+
+def _rangos_pasajeros(indptr, elementos):
+    # Rangos de personas [inicio, fin) con a lo mas 'elementos' parejas (o una sola persona)
+    n_pasajeros = len(indptr) - 1
+    inicio = 0
+    while inicio < n_pasajeros:
+        fin = int(np.searchsorted(indptr, indptr[inicio] + elementos, side='right')) - 1
+        fin = min(n_pasajeros, max(inicio + 1, fin))
+        yield inicio, fin
+        inicio = fin
+
+class ListaCandidatosDisco:
+    """
+    Lista de candidatos ordenada por prioridad guardada en disco como varios archivos .npy,
+    cada uno ordenado. Se recorre igual que ListaCandidatos, con una mezcla de k vías en numpy
+    que lee cada archivo por bloques, sin cargar todas las parejas en memoria.
+
+    Memoria: no es constante. Al recorrerla se tiene un bloque de ListaCandidatos.TAM_BLOQUE
+    registros por archivo (un archivo por cada ELEMENTOS_POR_BLOQUE parejas) y las listas de
+    ids, que crecen con el número de personas y vehículos compartidos.
+
+    Atributos:
+    ----------
+    _rutas : list
+        Archivos .npy con registros DTYPE_CANDIDATO ordenados por prioridad.
+    _ids_pasajeros : list
+        Id de cada persona, en el orden de veh_not_sharing.
+    _ids_conductores : list
+        Id de cada vehículo compartido, en el orden de veh_sharing.
+    """
+
+    def __init__(self, rutas, ids_pasajeros, ids_conductores):
+        """
+        Inicializa una instancia de ListaCandidatosDisco.
+
+        Parámetros:
+        -----------
+        rutas : list
+            Archivos .npy ordenados por (prioridad, persona, vehículo).
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        """
+        self._rutas = list(rutas)
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._ids_conductores = list(ids_conductores)
+
+    def __iter__(self):
+        """
+        Recorre las parejas en orden de prioridad.
+
+        Devuelve:
+        ---------
+        iterator
+            Tuplas (prioridad, pasajero, conductor, nodo_s, nodo_t).
+        """
+        for bloque in self.bloques():
+            yield from bloque.tolist()
+
+    def bloques(self):
+        """
+        Recorre las parejas en orden de prioridad por bloques de a lo más
+        ListaCandidatos.TAM_BLOQUE registros.
+
+        Devuelve:
+        ---------
+        iterator
+            Arreglos con dtype DTYPE_CANDIDATO.
+        """
+        # Mezcla de k vias por bloques: de cada archivo se lee un bloque a partir de su cursor; el
+        # limite es el menor ultimo registro leido de los archivos que no se terminan en este bloque,
+        # y de cada archivo se toman (searchsorted) los registros que no pasan del limite. Cada
+        # archivo tiene un rango de personas mayor que el del anterior, asi que con prioridades
+        # iguales el orden de los archivos es el de las personas: la mezcla se ordena con argsort
+        # estable y queda el mismo desempate que ListaCandidatos (prioridad, persona, vehiculo).
+        archivos = [np.load(ruta, mmap_mode='r') for ruta in self._rutas]
+        cursores = [0] * len(archivos)
+        tam = ListaCandidatos.TAM_BLOQUE
+        while True:
+            cabezas = [archivo[cursor:cursor + tam] for archivo, cursor in zip(archivos, cursores)]
+            if not any(len(cabeza) for cabeza in cabezas):
+                return
+            limites = [(cabeza['prioridad'][-1], idx) for idx, (archivo, cursor, cabeza)
+                       in enumerate(zip(archivos, cursores, cabezas)) if cursor + len(cabeza) < len(archivo)]
+            limite = min(limites) if limites else None
+            partes = []
+            for idx, cabeza in enumerate(cabezas):
+                n = len(cabeza)
+                if limite is not None:
+                    # los archivos antes del limite (o el mismo) desempatan antes que el
+                    lado = 'right' if idx <= limite[1] else 'left'
+                    n = int(np.searchsorted(cabeza['prioridad'], limite[0], side=lado))
+                partes.append(np.array(cabeza[:n]))
+                cursores[idx] += n
+            mezcla = np.concatenate(partes)
+            mezcla = mezcla[np.argsort(mezcla['prioridad'], kind='stable')]
+            for inicio in range(0, len(mezcla), tam):
+                yield mezcla[inicio:inicio + tam]
+
+    def __len__(self):
+        return sum(len(np.load(ruta, mmap_mode='r')) for ruta in self._rutas)
+
+    @property
+    def ids_pasajeros(self):
+        """
+        Devuelve el id de cada persona.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada persona.
+        """
+        return self._ids_pasajeros
+
+    @property
+    def ids_conductores(self):
+        """
+        Devuelve el id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada vehículo compartido.
+        """
+        return self._ids_conductores
+
+class EscritorCandidatos:
+    """
+    Construye en disco las parejas candidatas a partir de bloques que llegan en cualquier
+    orden (p.ej. de un pool de procesos). Las parejas nunca están todas en memoria: se
+    procesan a lo más ELEMENTOS_POR_BLOQUE a la vez.
+
+    Los bloques se escriben tal cual llegan; al cerrar se reagrupan por persona en un CSR
+    (memmap) y se generan los archivos ordenados de ListaCandidatosDisco.
+
+    Memoria: además del bloque en proceso quedan en memoria estructuras O(n_pasajeros),
+    que no se pasan a disco: el conteo de parejas por persona y los indptr/cursores del
+    reagrupado (unos 50 bytes por persona en total) y las listas de ids de personas y
+    vehículos compartidos (más los diccionarios id -> índice de CandidatosDispersos).
+    El pico de memoria es O(ELEMENTOS_POR_BLOQUE + n_pasajeros), no constante.
+
+    Atributos:
+    ----------
+    _directorio : str
+        Directorio del almacén.
+    _ids_pasajeros : list
+        Id de cada persona.
+    _ids_conductores : list
+        Id de cada vehículo compartido.
+    _conteo : numpy.ndarray
+        Número de parejas recibidas de cada persona.
+    _bloques : list
+        Archivos de los bloques recibidos.
+    """
+
+    def __init__(self, directorio, ids_pasajeros, ids_conductores):
+        """
+        Inicializa una instancia de EscritorCandidatos.
+
+        Parámetros:
+        -----------
+        directorio : str
+            Directorio del almacén; se crea si no existe.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        self._directorio = directorio
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._ids_conductores = list(ids_conductores)
+        self._conteo = np.zeros(len(self._ids_pasajeros), dtype=np.int64)
+        self._bloques = []
+
+    def _ruta(self, nombre):
+        return os.path.join(self._directorio, nombre)
+
+    def agregar_bloque(self, pasajeros, conductores, distancias, nodos_s, nodos_t):
+        """
+        Escribe un bloque de parejas en disco.
+
+        Parámetros:
+        -----------
+        pasajeros : numpy.ndarray
+            Índice de la persona de cada pareja.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada pareja.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada pareja.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada pareja.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada pareja.
+        """
+        if not len(distancias):
+            return
+        registros = ListaCandidatos._crear_registros(pasajeros, conductores, distancias, nodos_s, nodos_t)
+        ruta = self._ruta(f"bloque_{len(self._bloques)}.npy")
+        np.save(ruta, registros)
+        self._bloques.append(ruta)
+        self._conteo += np.bincount(registros['pasajero'], minlength=len(self._conteo))
+
+    def _agrupar(self):
+        # Reagrupa los bloques por persona en un solo archivo (sin orden dentro de cada persona)
+        indptr = np.concatenate(([0], np.cumsum(self._conteo)))
+        ruta = self._ruta("agrupadas.npy")
+        agrupadas = np.lib.format.open_memmap(ruta, mode='w+', dtype=DTYPE_CANDIDATO, shape=(int(indptr[-1]),))
+        cursor = indptr[:-1].copy()
+        for ruta_bloque in self._bloques:
+            bloque = np.load(ruta_bloque, mmap_mode='r')
+            for inicio in range(0, len(bloque), ELEMENTOS_POR_BLOQUE):
+                registros = bloque[inicio:inicio + ELEMENTOS_POR_BLOQUE]
+                registros = registros[np.argsort(registros['pasajero'], kind='stable')]
+                pasajeros = registros['pasajero'].astype(np.int64)
+                rango = np.arange(len(pasajeros)) - np.searchsorted(pasajeros, pasajeros)
+                agrupadas[cursor[pasajeros] + rango] = registros
+                cursor += np.bincount(pasajeros, minlength=len(cursor))
+            del bloque
+            os.remove(ruta_bloque)
+        agrupadas.flush()
+        return agrupadas, indptr
+
+    def cerrar(self, top_k=None):
+        """
+        Termina el almacén: CSR por persona y lista ordenada por prioridad.
+
+        Parámetros:
+        -----------
+        top_k : int, opcional
+            Si se indica, se conservan solo los k candidatos más cercanos de cada persona.
+
+        Devuelve:
+        ---------
+        tuple
+            (ListaCandidatosDisco, CandidatosDispersos sobre memmaps de solo lectura).
+        """
+        agrupadas, indptr = self._agrupar()
+        conteo_final = self._conteo if top_k is None else np.minimum(self._conteo, top_k)
+        indptr_final = np.concatenate(([0], np.cumsum(conteo_final)))
+        n_final = int(indptr_final[-1])
+        np.save(self._ruta("indptr.npy"), indptr_final)
+        csr = {nombre: np.lib.format.open_memmap(self._ruta(f"{nombre}.npy"), mode='w+', dtype=dtype, shape=(n_final,))
+               for nombre, dtype in ARCHIVOS_CSR.items() if nombre != 'indptr'}
+
+        listas = []
+        for inicio, fin in _rangos_pasajeros(indptr, ELEMENTOS_POR_BLOQUE):
+            registros = np.array(agrupadas[indptr[inicio]:indptr[fin]])
+            if not len(registros):
+                continue
+            if top_k is not None:
+                registros = registros[seleccionar_top_k(registros['pasajero'], registros['conductor'],
+                                                        registros['prioridad'], top_k)]
+            registros = registros[np.lexsort((registros['conductor'], registros['pasajero']))]
+            tramo = slice(indptr_final[inicio], indptr_final[fin])
+            csr['conductores'][tramo] = registros['conductor']
+            csr['distancias'][tramo] = registros['prioridad']
+            csr['nodos_s'][tramo] = registros['nodo_s']
+            csr['nodos_t'][tramo] = registros['nodo_t']
+            # mismo desempate que ListaCandidatos: prioridad, persona, vehiculo
+            ruta = self._ruta(f"lista_{len(listas)}.npy")
+            np.save(ruta, registros[np.argsort(registros['prioridad'], kind='stable')])
+            listas.append(os.path.basename(ruta))
+        for arreglo in csr.values():
+            arreglo.flush()
+        del agrupadas, csr
+        os.remove(self._ruta("agrupadas.npy"))
+
+        with open(self._ruta(ARCHIVO_META), "w") as archivo:
+            json.dump({"pasajeros": self._ids_pasajeros, "conductores": self._ids_conductores,
+                       "listas": listas, "top_k": top_k}, archivo)
+        return cargar_almacen(self._directorio)
+
+def cargar_almacen(directorio, mmap_mode='r'):
+    # Abre un almacen escrito por EscritorCandidatos; los arreglos se leen del disco bajo demanda.
+    # Devuelve (ListaCandidatosDisco, CandidatosDispersos)
+    with open(os.path.join(directorio, ARCHIVO_META)) as archivo:
+        meta = json.load(archivo)
+    arreglos = {nombre: np.load(os.path.join(directorio, f"{nombre}.npy"), mmap_mode=mmap_mode)
+                for nombre in ARCHIVOS_CSR}
+    candidatos = CandidatosDispersos(arreglos['indptr'], arreglos['conductores'], arreglos['distancias'],
+                                     arreglos['nodos_s'], arreglos['nodos_t'], meta["pasajeros"], meta["conductores"])
+    q = ListaCandidatosDisco([os.path.join(directorio, nombre) for nombre in meta["listas"]],
+                             meta["pasajeros"], meta["conductores"])
+    return q, candidatos
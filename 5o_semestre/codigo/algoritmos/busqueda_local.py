@@ -0,0 +1,139 @@
+import time
+import numpy as np
+from algoritmos.candidatos import SIN_CANDIDATO
+from algoritmos.estado_asignacion import EstadoAsignacion, SIN_ASIGNAR
+
+# Mejora minima (metros) para aplicar un movimiento; evita ciclos por redondeo
+MEJORA_MINIMA = 1e-6
+
+def _reconstruir_estado(estado, conductor, costo):
+    # Nuevo EstadoAsignacion con la asignacion final. Se respeta el orden de asignacion del
+    # estado original; los nodos de recogida/bajada se conservan si la persona no cambio de vehiculo.
+    nuevo = EstadoAsignacion(estado.veh_factory)
+    conductor_original = estado.conductor.tolist()
+    nodo_s = estado.nodo_s.tolist()
+    nodo_t = estado.nodo_t.tolist()
+    en_orden = set(estado.orden_asignacion)
+    orden = [idx for idx in estado.orden_asignacion if conductor[idx] != SIN_ASIGNAR]
+    orden += [idx for idx in range(len(conductor)) if conductor[idx] != SIN_ASIGNAR and idx not in en_orden]
+    for idx_not in orden:
+        idx_sh = conductor[idx_not]
+        if idx_sh == conductor_original[idx_not]:
+            nuevo.asignar(idx_not, idx_sh, costo[idx_not], nodo_s[idx_not], nodo_t[idx_not])
+        else:
+            nuevo.asignar(idx_not, idx_sh, costo[idx_not])
+    for idx_not in range(len(conductor)):
+        if conductor[idx_not] == SIN_ASIGNAR:
+            nuevo.marcar_sin_vehiculo(idx_not)
+    return nuevo
+
+def busqueda_local(estado, distancias, tiempo_max=None, intercambios=True):
+    # Mejora una asignacion (EstadoAsignacion de cualquier algoritmo) con movimientos de
+    # reubicacion (una persona a un vehiculo con lugar o a viajar sola) e intercambio (dos
+    # personas de vehiculos distintos, o una asignada con una sin vehiculo). Cada movimiento
+    # se evalua en tiempo constante con distancias.distancia y los lugares libres.
+    # Se repiten pasadas sobre todas las personas hasta un optimo local o hasta tiempo_max (s).
+    # Las distancias de la asignacion se leen de distancias para comparar en la misma escala.
+    # Devuelve (estado, total_people_walk, reporte); reporte incluye la mejora por segundo.
+    inicio = time.perf_counter()
+    veh_factory = estado.veh_factory
+    idx_pasajero = distancias.idx_pasajero
+    filas = [idx_pasajero[v.get_attribute('id')] for v in veh_factory.veh_not_sharing]
+    path_len = estado.path_len.tolist()
+    lugares = estado.lugares.tolist()
+    conductor = estado.conductor.tolist()
+    # costo actual de cada persona: caminata si tiene vehiculo, path_len si viaja sola
+    costo = [distancias.distancia(filas[i], conductor[i]) if conductor[i] != SIN_ASIGNAR else path_len[i]
+             for i in range(len(conductor))]
+    ocupantes = [set() for _ in lugares]
+    for i, idx_sh in enumerate(conductor):
+        if idx_sh != SIN_ASIGNAR:
+            ocupantes[idx_sh].add(i)
+
+    def costo_en(j, idx_sh):
+        return path_len[j] if idx_sh == SIN_ASIGNAR else distancias.distancia(filas[j], idx_sh)
+
+    def mover(i, idx_sh, nuevo_costo):
+        anterior = conductor[i]
+        if anterior != SIN_ASIGNAR:
+            ocupantes[anterior].discard(i)
+            lugares[anterior] += 1
+        if idx_sh != SIN_ASIGNAR:
+            ocupantes[idx_sh].add(i)
+            lugares[idx_sh] -= 1
+        conductor[i] = idx_sh
+        costo[i] = nuevo_costo
+
+    total_inicial = sum(costo)
+    reubicaciones = 0
+    cambios = 0
+    pasadas = 0
+    optimo_local = False
+    agotado = False
+    while not agotado:
+        pasadas += 1
+        mejoro = False
+        for i in range(len(conductor)):
+            if tiempo_max is not None and time.perf_counter() - inicio > tiempo_max:
+                agotado = True
+                break
+            actual = conductor[i]
+            # viajar sola es mejor que caminar
+            if actual != SIN_ASIGNAR and path_len[i] < costo[i] - MEJORA_MINIMA:
+                mover(i, SIN_ASIGNAR, path_len[i])
+                reubicaciones += 1
+                mejoro = True
+                actual = SIN_ASIGNAR
+            conductores, dist = distancias.fila(filas[i])
+            # solo los vehiculos mas cercanos que el costo actual pueden mejorar a la persona i;
+            # un intercambio que mejora tiene al menos una de las dos personas en este caso
+            utiles = dist < costo[i] - MEJORA_MINIMA
+            conductores, dist = conductores[utiles], dist[utiles]
+            for pos in np.argsort(dist, kind='stable').tolist():
+                idx_sh = int(conductores[pos])
+                if idx_sh == actual:
+                    continue
+                d_i = float(dist[pos])
+                if lugares[idx_sh] > 0:
+                    mover(i, idx_sh, d_i)
+                    reubicaciones += 1
+                    mejoro = True
+                    break
+                if not intercambios:
+                    continue
+                hecho = False
+                for j in ocupantes[idx_sh]:
+                    d_j = costo_en(j, actual)
+                    if d_j == SIN_CANDIDATO:
+                        continue
+                    if d_i + d_j < costo[i] + costo[j] - MEJORA_MINIMA:
+                        # j se mueve primero para liberar el lugar de i
+                        mover(j, actual, d_j)
+                        mover(i, idx_sh, d_i)
+                        cambios += 1
+                        hecho = True
+                        break
+                if hecho:
+                    mejoro = True
+                    break
+        if not agotado and not mejoro:
+            optimo_local = True
+            break
+
+    nuevo = _reconstruir_estado(estado, conductor, costo)
+    total_people_walk = nuevo.total_caminata()
+    segundos = time.perf_counter() - inicio
+    reporte = {
+        'total_inicial': total_inicial,
+        'total_final': total_people_walk,
+        'mejora': total_inicial - total_people_walk,
+        'segundos': segundos,
+        'mejora_por_segundo': (total_inicial - total_people_walk) / segundos if segundos > 0 else 0.0,
+        'reubicaciones': reubicaciones,
+        'intercambios': cambios,
+        'pasadas': pasadas,
+        'optimo_local': optimo_local,
+    }
+    print("Busqueda local: mejora {mejora:.2f} en {segundos:.2f}s ({mejora_por_segundo:.2f} por segundo), "
+          "reubicaciones: {reubicaciones}, intercambios: {intercambios}".format(**reporte))
+    return nuevo, total_people_walk, reporte
@@ -0,0 +1,138 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# Numero de cromosomas cuyo fitness se guarda por defecto
+TAM_CACHE = 100_000
+
+class CacheFitness:
+    """
+    Cache acotado del fitness de cromosomas (filas de la población del algoritmo genético),
+    indexado por un hash del cromosoma y con desalojo del menos usado recientemente (LRU).
+
+    Atributos:
+    ----------
+    _maximo : int
+        Número máximo de cromosomas guardados.
+    _valores : collections.OrderedDict
+        Hash del cromosoma -> fitness, del menos al más usado recientemente.
+    _consultas : int
+        Cromosomas consultados.
+    _aciertos : int
+        Consultas cuyo fitness no se calculó (estaba en el cache o repetido en la misma consulta).
+    """
+
+    def __init__(self, maximo=TAM_CACHE):
+        """
+        Inicializa una instancia de CacheFitness.
+
+        Parámetros:
+        -----------
+        maximo : int
+            Número máximo de cromosomas guardados.
+
+        Lanza:
+        ------
+        ValueError
+            Si maximo no es positivo.
+        """
+        if maximo <= 0:
+            raise ValueError("El tamaño del cache debe ser positivo.")
+        self._maximo = maximo
+        self._valores = OrderedDict()
+        self._consultas = 0
+        self._aciertos = 0
+
+    @staticmethod
+    def llave(cromosoma):
+        """
+        Calcula el hash con el que se guarda un cromosoma.
+
+        Parámetros:
+        -----------
+        cromosoma : numpy.ndarray
+            Fila de la población.
+
+        Devuelve:
+        ---------
+        bytes
+            Hash blake2b de 16 bytes de los genes.
+        """
+        return hashlib.blake2b(np.ascontiguousarray(cromosoma), digest_size=16).digest()
+
+    def evaluar(self, cromosomas, calcular):
+        """
+        Obtiene el fitness de un conjunto de cromosomas, calculando solo los que no están en
+        el cache (una vez por cromosoma distinto) y guardándolos.
+
+        Parámetros:
+        -----------
+        cromosomas : numpy.ndarray
+            Matriz de cromosomas (una fila por cromosoma).
+        calcular : callable
+            Función que recibe una matriz de cromosomas y devuelve su fitness.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Fitness de cada cromosoma.
+        """
+        fitness = np.empty(len(cromosomas), dtype=np.float64)
+        faltantes = {}
+        for pos, cromosoma in enumerate(cromosomas):
+            llave = self.llave(cromosoma)
+            valor = self._valores.get(llave)
+            if valor is not None:
+                self._valores.move_to_end(llave)
+                fitness[pos] = valor
+            else:
+                faltantes.setdefault(llave, []).append(pos)
+        self._consultas += len(cromosomas)
+        self._aciertos += len(cromosomas) - len(faltantes)
+        if faltantes:
+            valores = calcular(cromosomas[[posiciones[0] for posiciones in faltantes.values()]])
+            for (llave, posiciones), valor in zip(faltantes.items(), valores.tolist()):
+                fitness[posiciones] = valor
+                self._valores[llave] = valor
+            while len(self._valores) > self._maximo:
+                self._valores.popitem(last=False)
+        return fitness
+
+    def __len__(self):
+        return len(self._valores)
+
+    @property
+    def consultas(self):
+        """
+        Devuelve el número de cromosomas consultados.
+
+        Devuelve:
+        ---------
+        int
+            Consultas acumuladas.
+        """
+        return self._consultas
+
+    @property
+    def aciertos(self):
+        """
+        Devuelve el número de consultas que no requirieron calcular el fitness.
+
+        Devuelve:
+        ---------
+        int
+            Aciertos acumulados.
+        """
+        return self._aciertos
+
+    @property
+    def tasa_aciertos(self):
+        """
+        Devuelve la fracción de consultas que no requirieron calcular el fitness.
+
+        Devuelve:
+        ---------
+        float
+            Aciertos / consultas, 0 si no hay consultas.
+        """
+        return self._aciertos / self._consultas if self._consultas else 0.0
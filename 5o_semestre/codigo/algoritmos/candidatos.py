@@ -0,0 +1,711 @@
+import numpy as np
+from algoritmos.distances import min_por_segmento
+
+# Valor de distancia para una pareja persona/vehículo que no es candidata
+SIN_CANDIDATO = np.inf
+
+# Elementos (parejas, o fuentes x nodos de rutas) que se cargan en memoria a la vez al
+# calcular, reagrupar o copiar por bloques; lo comparten todos los modulos de distancias
+ELEMENTOS_POR_BLOQUE = 4_000_000
+
+def seleccionar_top_k(pasajeros, conductores, distancias, top_k):
+    # Posiciones de los top_k candidatos mas cercanos de cada persona
+    orden = np.lexsort((conductores, distancias, pasajeros))
+    pasajeros_ord = pasajeros[orden]
+    rango = np.arange(len(orden)) - np.searchsorted(pasajeros_ord, pasajeros_ord)
+    return orden[rango < top_k]
+
+class CandidatosDispersos:
+    """
+    Parejas candidatas persona -> vehículo compartido en formato CSR (una fila por persona).
+
+    Atributos:
+    ----------
+    _indptr : numpy.ndarray
+        Inicio de los candidatos de cada persona, longitud n_pasajeros + 1.
+    _conductores : numpy.ndarray
+        Índice del vehículo compartido de cada candidato (ordenado dentro de cada fila).
+    _distancias : numpy.ndarray
+        Distancia total a caminar de cada candidato.
+    _nodos_s : numpy.ndarray
+        Nodo de la ruta compartida donde se recoge a la persona.
+    _nodos_t : numpy.ndarray
+        Nodo de la ruta compartida donde se deja a la persona.
+    _ids_pasajeros : list
+        Id de cada persona, en el orden de veh_not_sharing.
+    _ids_conductores : list
+        Id de cada vehículo compartido, en el orden de veh_sharing.
+    """
+
+    def __init__(self, indptr, conductores, distancias, nodos_s, nodos_t, ids_pasajeros, ids_conductores):
+        """
+        Inicializa una instancia de CandidatosDispersos.
+
+        Parámetros:
+        -----------
+        indptr : numpy.ndarray
+            Inicio de los candidatos de cada persona.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada candidato.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada candidato.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        """
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._conductores = np.asarray(conductores, dtype=np.int32)
+        self._distancias = np.asarray(distancias, dtype=np.float64)
+        self._nodos_s = np.asarray(nodos_s, dtype=np.int64)
+        self._nodos_t = np.asarray(nodos_t, dtype=np.int64)
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._ids_conductores = list(ids_conductores)
+        self._idx_pasajero = {id: idx for idx, id in enumerate(self._ids_pasajeros)}
+        self._idx_conductor = {id: idx for idx, id in enumerate(self._ids_conductores)}
+
+    @classmethod
+    def desde_parejas(cls, pasajeros, conductores, distancias, nodos_s, nodos_t, ids_pasajeros, ids_conductores, top_k=None):
+        """
+        Construye la estructura a partir de parejas sin ordenar.
+
+        Parámetros:
+        -----------
+        pasajeros : numpy.ndarray
+            Índice de la persona de cada pareja.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada pareja.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada pareja.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada pareja.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada pareja.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        top_k : int, opcional
+            Si se indica, se conservan solo los k candidatos más cercanos de cada persona.
+
+        Devuelve:
+        ---------
+        CandidatosDispersos
+            Estructura con las parejas agrupadas por persona.
+        """
+        pasajeros = np.asarray(pasajeros, dtype=np.int64)
+        conductores = np.asarray(conductores, dtype=np.int64)
+        distancias = np.asarray(distancias, dtype=np.float64)
+        nodos_s = np.asarray(nodos_s, dtype=np.int64)
+        nodos_t = np.asarray(nodos_t, dtype=np.int64)
+        if top_k is not None:
+            seleccion = seleccionar_top_k(pasajeros, conductores, distancias, top_k)
+            pasajeros = pasajeros[seleccion]
+            conductores = conductores[seleccion]
+            distancias = distancias[seleccion]
+            nodos_s = nodos_s[seleccion]
+            nodos_t = nodos_t[seleccion]
+        candidatos = cls(np.zeros(len(ids_pasajeros) + 1), [], [], [], [], ids_pasajeros, ids_conductores)
+        candidatos._asignar_parejas(pasajeros, conductores, distancias, nodos_s, nodos_t)
+        return candidatos
+
+    @classmethod
+    def desde_arreglos(cls, arreglos, ids_pasajeros, ids_conductores):
+        """
+        Construye la estructura sobre los arreglos devueltos por arreglos() (p.ej. abiertos
+        desde memoria compartida en otro proceso), sin copiarlos.
+
+        Parámetros:
+        -----------
+        arreglos : dict
+            Diccionario nombre -> numpy.ndarray.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        CandidatosDispersos
+            Estructura sobre los arreglos.
+        """
+        return cls(arreglos['indptr'], arreglos['conductores'], arreglos['distancias'],
+                   arreglos['nodos_s'], arreglos['nodos_t'], ids_pasajeros, ids_conductores)
+
+    def arreglos(self):
+        """
+        Devuelve los arreglos de la estructura, p.ej. para copiarlos a ArreglosCompartidos.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nombre -> numpy.ndarray.
+        """
+        return {'indptr': self._indptr, 'conductores': self._conductores, 'distancias': self._distancias,
+                'nodos_s': self._nodos_s, 'nodos_t': self._nodos_t}
+
+    def _asignar_parejas(self, pasajeros, conductores, distancias, nodos_s, nodos_t):
+        # Reconstruye el CSR a partir de parejas sin ordenar (sin recalcular distancias)
+        orden = np.lexsort((conductores, pasajeros))
+        conteo = np.bincount(pasajeros, minlength=self.n_pasajeros)
+        self._indptr = np.concatenate(([0], np.cumsum(conteo))).astype(np.int64)
+        self._conductores = np.asarray(conductores, dtype=np.int32)[orden]
+        self._distancias = np.asarray(distancias, dtype=np.float64)[orden]
+        self._nodos_s = np.asarray(nodos_s, dtype=np.int64)[orden]
+        self._nodos_t = np.asarray(nodos_t, dtype=np.int64)[orden]
+
+    def fila(self, idx_pasajero):
+        """
+        Obtiene los candidatos de una persona.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+
+        Devuelve:
+        ---------
+        tuple
+            (índices de vehículos compartidos, distancias).
+        """
+        inicio = self._indptr[idx_pasajero]
+        fin = self._indptr[idx_pasajero + 1]
+        return self._conductores[inicio:fin], self._distancias[inicio:fin]
+
+    def distancias_pasajero(self, idx_pasajero):
+        """
+        Obtiene la distancia de una persona contra todos los vehículos compartidos.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Arreglo (n_conductores,), SIN_CANDIDATO en parejas no candidatas.
+        """
+        distancias = np.full(self.n_conductores, SIN_CANDIDATO)
+        conductores, valores = self.fila(idx_pasajero)
+        distancias[conductores] = valores
+        return distancias
+
+    def distancia(self, idx_pasajero, idx_conductor):
+        """
+        Obtiene la distancia de una pareja persona/vehículo compartido.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        idx_conductor : int
+            Índice del vehículo compartido.
+
+        Devuelve:
+        ---------
+        float
+            Distancia total a caminar, o SIN_CANDIDATO si la pareja no es candidata.
+        """
+        inicio = self._indptr[idx_pasajero]
+        fin = self._indptr[idx_pasajero + 1]
+        pos = inicio + np.searchsorted(self._conductores[inicio:fin], idx_conductor)
+        if pos < fin and self._conductores[pos] == idx_conductor:
+            return float(self._distancias[pos])
+        return SIN_CANDIDATO
+
+    def mas_cercanos(self):
+        """
+        Obtiene el vehículo compartido más cercano de cada persona (el primero en caso de empate).
+
+        Devuelve:
+        ---------
+        tuple
+            (índice del vehículo o -1 si la persona no tiene candidatos, distancia o SIN_CANDIDATO).
+        """
+        conductores = np.full(self.n_pasajeros, -1, dtype=np.int64)
+        distancias = np.full(self.n_pasajeros, SIN_CANDIDATO)
+        no_vacias = np.flatnonzero(np.diff(self._indptr))
+        if len(no_vacias):
+            mins, pos = min_por_segmento(self._distancias[self._indptr[no_vacias[0]]:self._indptr[-1]],
+                                         self._indptr[no_vacias] - self._indptr[no_vacias[0]])
+            conductores[no_vacias] = self._conductores[pos[0] + self._indptr[no_vacias[0]]]
+            distancias[no_vacias] = mins[0]
+        return conductores, distancias
+
+    def parejas(self, inicio=0, fin=None):
+        """
+        Devuelve las parejas candidatas de las personas [inicio, fin).
+
+        Parámetros:
+        -----------
+        inicio : int, opcional
+            Primera persona. Por defecto es 0.
+        fin : int, opcional
+            Persona final (excluida). Por defecto todas.
+
+        Devuelve:
+        ---------
+        tuple
+            (personas, vehículos compartidos, distancias, nodos de recogida, nodos de bajada).
+        """
+        if fin is None:
+            fin = self.n_pasajeros
+        tramo = slice(self._indptr[inicio], self._indptr[fin])
+        pasajeros = np.repeat(np.arange(inicio, fin), np.diff(self._indptr[inicio:fin + 1]))
+        return (pasajeros, self._conductores[tramo], self._distancias[tramo],
+                self._nodos_s[tramo], self._nodos_t[tramo])
+
+    def agregar_pasajero(self, id_pasajero, conductores, distancias, nodos_s, nodos_t):
+        """
+        Agrega una persona al final (nueva fila) con sus candidatos.
+
+        Parámetros:
+        -----------
+        id_pasajero : str
+            Id de la persona.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada candidato.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada candidato.
+        """
+        orden = np.argsort(conductores, kind='stable')
+        self._ids_pasajeros.append(id_pasajero)
+        self._idx_pasajero[id_pasajero] = len(self._ids_pasajeros) - 1
+        self._indptr = np.append(self._indptr, self._indptr[-1] + len(orden))
+        self._conductores = np.concatenate((self._conductores, np.asarray(conductores, dtype=np.int32)[orden]))
+        self._distancias = np.concatenate((self._distancias, np.asarray(distancias, dtype=np.float64)[orden]))
+        self._nodos_s = np.concatenate((self._nodos_s, np.asarray(nodos_s, dtype=np.int64)[orden]))
+        self._nodos_t = np.concatenate((self._nodos_t, np.asarray(nodos_t, dtype=np.int64)[orden]))
+
+    def quitar_pasajero(self, idx_pasajero):
+        """
+        Quita una persona (fila) y sus candidatos; las personas siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        """
+        inicio = self._indptr[idx_pasajero]
+        fin = self._indptr[idx_pasajero + 1]
+        self._conductores = np.delete(self._conductores, np.s_[inicio:fin])
+        self._distancias = np.delete(self._distancias, np.s_[inicio:fin])
+        self._nodos_s = np.delete(self._nodos_s, np.s_[inicio:fin])
+        self._nodos_t = np.delete(self._nodos_t, np.s_[inicio:fin])
+        self._indptr = np.concatenate((self._indptr[:idx_pasajero + 1], self._indptr[idx_pasajero + 2:] - (fin - inicio)))
+        del self._ids_pasajeros[idx_pasajero]
+        self._idx_pasajero = {id: idx for idx, id in enumerate(self._ids_pasajeros)}
+
+    def agregar_conductor(self, id_conductor, pasajeros, distancias, nodos_s, nodos_t):
+        """
+        Agrega un vehículo compartido al final (nueva columna) con sus candidatos.
+
+        Parámetros:
+        -----------
+        id_conductor : str
+            Id del vehículo compartido.
+        pasajeros : numpy.ndarray
+            Índice de la persona de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada candidato.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada candidato.
+        """
+        self._ids_conductores.append(id_conductor)
+        self._idx_conductor[id_conductor] = len(self._ids_conductores) - 1
+        # el vehiculo nuevo tiene el indice mas grande: va al final de la fila de cada persona
+        orden = np.argsort(pasajeros, kind='stable')
+        pasajeros = np.asarray(pasajeros, dtype=np.int64)[orden]
+        posiciones = self._indptr[pasajeros + 1]
+        conteo = np.bincount(pasajeros, minlength=self.n_pasajeros)
+        self._indptr = self._indptr + np.concatenate(([0], np.cumsum(conteo)))
+        self._conductores = np.insert(self._conductores, posiciones, len(self._ids_conductores) - 1)
+        self._distancias = np.insert(self._distancias, posiciones, np.asarray(distancias, dtype=np.float64)[orden])
+        self._nodos_s = np.insert(self._nodos_s, posiciones, np.asarray(nodos_s, dtype=np.int64)[orden])
+        self._nodos_t = np.insert(self._nodos_t, posiciones, np.asarray(nodos_t, dtype=np.int64)[orden])
+
+    def quitar_conductor(self, idx_conductor):
+        """
+        Quita un vehículo compartido (columna); los vehículos siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_conductor : int
+            Índice del vehículo compartido.
+        """
+        quitadas = np.flatnonzero(self._conductores == idx_conductor)
+        filas = np.searchsorted(self._indptr, quitadas, side='right') - 1
+        conteo = np.bincount(filas, minlength=self.n_pasajeros)
+        self._indptr = self._indptr - np.concatenate(([0], np.cumsum(conteo)))
+        # los indices se recorren sin cambiar el orden dentro de cada fila
+        conductores = np.delete(self._conductores, quitadas)
+        self._conductores = conductores - (conductores > idx_conductor).astype(conductores.dtype)
+        self._distancias = np.delete(self._distancias, quitadas)
+        self._nodos_s = np.delete(self._nodos_s, quitadas)
+        self._nodos_t = np.delete(self._nodos_t, quitadas)
+        del self._ids_conductores[idx_conductor]
+        self._idx_conductor = {id: idx for idx, id in enumerate(self._ids_conductores)}
+
+    def reemplazar_pasajeros(self, idx_pasajeros, pasajeros, conductores, distancias, nodos_s, nodos_t):
+        """
+        Sustituye todos los candidatos de las personas indicadas por las parejas dadas.
+
+        Parámetros:
+        -----------
+        idx_pasajeros : numpy.ndarray
+            Índices de las personas cuyas filas se sustituyen.
+        pasajeros, conductores, distancias, nodos_s, nodos_t : numpy.ndarray
+            Nuevas parejas de esas personas (cada persona debe estar en idx_pasajeros).
+        """
+        reemplazada = np.zeros(self.n_pasajeros, dtype=bool)
+        reemplazada[idx_pasajeros] = True
+        pasajeros = np.asarray(pasajeros, dtype=np.int64)
+        orden = np.lexsort((conductores, pasajeros))
+        conteo = np.where(reemplazada, np.bincount(pasajeros, minlength=self.n_pasajeros), np.diff(self._indptr))
+        quedan = ~np.repeat(reemplazada, np.diff(self._indptr))
+        # las filas que no cambian se copian en orden y las nuevas parejas llenan las sustituidas
+        nueva = np.repeat(reemplazada, conteo)
+        self._indptr = np.concatenate(([0], np.cumsum(conteo))).astype(np.int64)
+        for nombre, valores, dtype in (('_conductores', conductores, np.int32), ('_distancias', distancias, np.float64),
+                                       ('_nodos_s', nodos_s, np.int64), ('_nodos_t', nodos_t, np.int64)):
+            anterior = getattr(self, nombre)
+            arreglo = np.empty(len(nueva), dtype=dtype)
+            arreglo[~nueva] = anterior[quedan]
+            arreglo[nueva] = np.asarray(valores, dtype=dtype)[orden]
+            setattr(self, nombre, arreglo)
+
+    @property
+    def n_pasajeros(self):
+        """
+        Devuelve el número de personas (filas).
+
+        Devuelve:
+        ---------
+        int
+            Número de personas.
+        """
+        return len(self._ids_pasajeros)
+
+    @property
+    def n_conductores(self):
+        """
+        Devuelve el número de vehículos compartidos (columnas).
+
+        Devuelve:
+        ---------
+        int
+            Número de vehículos compartidos.
+        """
+        return len(self._ids_conductores)
+
+    @property
+    def n_candidatos(self):
+        """
+        Devuelve el número de parejas candidatas almacenadas.
+
+        Devuelve:
+        ---------
+        int
+            Número de parejas candidatas.
+        """
+        return len(self._conductores)
+
+    @property
+    def ids_pasajeros(self):
+        """
+        Devuelve el id de cada persona.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada persona.
+        """
+        return self._ids_pasajeros
+
+    @property
+    def ids_conductores(self):
+        """
+        Devuelve el id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada vehículo compartido.
+        """
+        return self._ids_conductores
+
+    @property
+    def idx_pasajero(self):
+        """
+        Devuelve el diccionario id -> índice de persona.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario id -> índice.
+        """
+        return self._idx_pasajero
+
+    @property
+    def idx_conductor(self):
+        """
+        Devuelve el diccionario id -> índice de vehículo compartido.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario id -> índice.
+        """
+        return self._idx_conductor
+
+
+# Registro de una pareja candidata en ListaCandidatos
+DTYPE_CANDIDATO = np.dtype([
+    ('prioridad', np.float64),
+    ('pasajero', np.int32),
+    ('conductor', np.int32),
+    ('nodo_s', np.int64),
+    ('nodo_t', np.int64),
+])
+
+class ListaCandidatos:
+    """
+    Parejas candidatas ordenadas por prioridad (distancia a caminar) en un arreglo
+    estructurado de numpy. Sustituye a la cola de prioridades: se ordena una sola vez
+    y se puede recorrer varias veces sin consumirse.
+
+    Atributos:
+    ----------
+    _registros : numpy.ndarray
+        Arreglo con dtype DTYPE_CANDIDATO ordenado por prioridad.
+    _ids_pasajeros : list
+        Id de cada persona, en el orden de veh_not_sharing.
+    _ids_conductores : list
+        Id de cada vehículo compartido, en el orden de veh_sharing.
+    """
+
+    # Registros que se convierten a tuplas de python en cada paso del iterador
+    TAM_BLOQUE = 4096
+
+    def __init__(self, registros, ids_pasajeros, ids_conductores, ordenado=False):
+        """
+        Inicializa una instancia de ListaCandidatos.
+
+        Parámetros:
+        -----------
+        registros : numpy.ndarray
+            Arreglo con dtype DTYPE_CANDIDATO.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        ordenado : bool, opcional
+            Indica si registros ya está ordenado por prioridad. Por defecto es False.
+        """
+        if not ordenado:
+            # argsort estable: ante empates se respeta el orden persona, vehiculo
+            registros = registros[np.argsort(registros['prioridad'], kind='stable')]
+        self._registros = registros
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._ids_conductores = list(ids_conductores)
+
+    @classmethod
+    def desde_candidatos(cls, candidatos):
+        """
+        Construye la lista a partir de CandidatosDispersos.
+
+        Parámetros:
+        -----------
+        candidatos : CandidatosDispersos
+            Parejas candidatas.
+
+        Devuelve:
+        ---------
+        ListaCandidatos
+            Lista ordenada por prioridad.
+        """
+        registros = cls._crear_registros(*candidatos.parejas())
+        return cls(registros, candidatos.ids_pasajeros, candidatos.ids_conductores)
+
+    def __iter__(self):
+        """
+        Recorre las parejas en orden de prioridad.
+
+        Devuelve:
+        ---------
+        iterator
+            Tuplas (prioridad, pasajero, conductor, nodo_s, nodo_t).
+        """
+        for bloque in self.bloques():
+            yield from bloque.tolist()
+
+    def bloques(self):
+        """
+        Recorre las parejas en orden de prioridad por bloques de TAM_BLOQUE registros.
+
+        Devuelve:
+        ---------
+        iterator
+            Arreglos con dtype DTYPE_CANDIDATO.
+        """
+        for inicio in range(0, len(self._registros), self.TAM_BLOQUE):
+            yield self._registros[inicio:inicio + self.TAM_BLOQUE]
+
+    def __len__(self):
+        return len(self._registros)
+
+    @staticmethod
+    def _crear_registros(pasajeros, conductores, distancias, nodos_s, nodos_t):
+        registros = np.empty(len(distancias), dtype=DTYPE_CANDIDATO)
+        registros['prioridad'] = distancias
+        registros['pasajero'] = pasajeros
+        registros['conductor'] = conductores
+        registros['nodo_s'] = nodos_s
+        registros['nodo_t'] = nodos_t
+        return registros
+
+    def _insertar(self, nuevos):
+        # Inserta registros nuevos respetando el orden (prioridad, persona, vehiculo) que
+        # produce el ordenamiento completo; solo se desempata nodo a nodo en los empates.
+        nuevos = nuevos[np.lexsort((nuevos['conductor'], nuevos['pasajero'], nuevos['prioridad']))]
+        prioridad = self._registros['prioridad']
+        pos = np.searchsorted(prioridad, nuevos['prioridad'], side='left')
+        fin = np.searchsorted(prioridad, nuevos['prioridad'], side='right')
+        for i in np.flatnonzero(fin > pos).tolist():
+            empates = self._registros[pos[i]:fin[i]]
+            llave = (empates['pasajero'].astype(np.int64) << 32) | empates['conductor']
+            llave_nueva = (int(nuevos['pasajero'][i]) << 32) | int(nuevos['conductor'][i])
+            pos[i] += np.searchsorted(llave, llave_nueva)
+        self._registros = np.insert(self._registros, pos, nuevos)
+
+    def _filtrar(self, quedan, campo, idx):
+        registros = self._registros[quedan]
+        registros[campo][registros[campo] > idx] -= 1
+        self._registros = registros
+
+    def agregar_pasajero(self, id_pasajero, conductores, distancias, nodos_s, nodos_t):
+        """
+        Agrega una persona al final con sus candidatos, sin reordenar el resto de la lista.
+
+        Parámetros:
+        -----------
+        id_pasajero : str
+            Id de la persona.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada candidato.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada candidato.
+        """
+        self._ids_pasajeros.append(id_pasajero)
+        pasajeros = np.full(len(distancias), len(self._ids_pasajeros) - 1)
+        self._insertar(self._crear_registros(pasajeros, conductores, distancias, nodos_s, nodos_t))
+
+    def quitar_pasajero(self, idx_pasajero):
+        """
+        Quita una persona y sus candidatos; las personas siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        """
+        self._filtrar(self._registros['pasajero'] != idx_pasajero, 'pasajero', idx_pasajero)
+        del self._ids_pasajeros[idx_pasajero]
+
+    def agregar_conductor(self, id_conductor, pasajeros, distancias, nodos_s, nodos_t):
+        """
+        Agrega un vehículo compartido al final con sus candidatos, sin reordenar el resto de la lista.
+
+        Parámetros:
+        -----------
+        id_conductor : str
+            Id del vehículo compartido.
+        pasajeros : numpy.ndarray
+            Índice de la persona de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        nodos_s : numpy.ndarray
+            Nodo de recogida de cada candidato.
+        nodos_t : numpy.ndarray
+            Nodo de bajada de cada candidato.
+        """
+        self._ids_conductores.append(id_conductor)
+        conductores = np.full(len(distancias), len(self._ids_conductores) - 1)
+        self._insertar(self._crear_registros(pasajeros, conductores, distancias, nodos_s, nodos_t))
+
+    def quitar_conductor(self, idx_conductor):
+        """
+        Quita un vehículo compartido y sus candidatos; los vehículos siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_conductor : int
+            Índice del vehículo compartido.
+        """
+        self._filtrar(self._registros['conductor'] != idx_conductor, 'conductor', idx_conductor)
+        del self._ids_conductores[idx_conductor]
+
+    def reemplazar_pasajeros(self, idx_pasajeros, pasajeros, conductores, distancias, nodos_s, nodos_t):
+        """
+        Sustituye todos los candidatos de las personas indicadas por las parejas dadas.
+
+        Parámetros:
+        -----------
+        idx_pasajeros : numpy.ndarray
+            Índices de las personas cuyos candidatos se sustituyen.
+        pasajeros, conductores, distancias, nodos_s, nodos_t : numpy.ndarray
+            Nuevas parejas de esas personas.
+        """
+        self._registros = self._registros[~np.isin(self._registros['pasajero'], idx_pasajeros)]
+        self._insertar(self._crear_registros(pasajeros, conductores, distancias, nodos_s, nodos_t))
+
+    @property
+    def registros(self):
+        """
+        Devuelve el arreglo estructurado ordenado por prioridad.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Arreglo con dtype DTYPE_CANDIDATO.
+        """
+        return self._registros
+
+    @property
+    def ids_pasajeros(self):
+        """
+        Devuelve el id de cada persona.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada persona.
+        """
+        return self._ids_pasajeros
+
+    @property
+    def ids_conductores(self):
+        """
+        Devuelve el id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada vehículo compartido.
+        """
+        return self._ids_conductores
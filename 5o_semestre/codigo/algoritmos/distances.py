@@ -1,8 +1,12 @@
 import math
+import numpy as np
+
+# Radio de la Tierra en kilometros
+R_TIERRA = 6371.0
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     # Radius of the Earth in kilometers
-    R = 6371.0
+    R = R_TIERRA
 
     # Convert latitude and longitude from degrees to radians
     lat1 = math.radians(lat1)
@@ -17,7 +21,57 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     # Haversine formula
     a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
+
     # Distance in meters
     distance = R * c * 1000
-    return distance
\ No newline at end of file
+    return distance
+
+def haversine_distances(lat1, lon1, lat2, lon2):
+    # Version vectorizada de haversine_distance, acepta escalares o arreglos
+    # con broadcasting de numpy (uno a muchos o elemento a elemento).
+    lat1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1 = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lon2, dtype=np.float64))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return R_TIERRA * c * 1000
+
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    # Muchos a muchos: regresa una matriz (n, m) con la distancia en metros
+    # entre cada punto (lat1, lon1) y cada punto (lat2, lon2).
+    lat1 = np.asarray(lat1, dtype=np.float64).reshape(-1, 1)
+    lon1 = np.asarray(lon1, dtype=np.float64).reshape(-1, 1)
+    lat2 = np.asarray(lat2, dtype=np.float64).reshape(1, -1)
+    lon2 = np.asarray(lon2, dtype=np.float64).reshape(1, -1)
+    return haversine_distances(lat1, lon1, lat2, lon2)
+
+def a_cartesianas(lat, lon):
+    # Coordenadas (x, y, z) sobre la esfera unitaria, arreglo (n, 3). La
+    # distancia euclidiana (cuerda) es monotona con la distancia de haversine,
+    # por lo que el vecino mas cercano en 3D es el mismo que sobre la esfera.
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def cuerda_a_metros(cuerda):
+    # Convierte una cuerda de la esfera unitaria a distancia sobre la superficie en metros
+    cuerda = np.clip(np.asarray(cuerda, dtype=np.float64), 0.0, 2.0)
+    return 2 * np.arcsin(cuerda / 2) * R_TIERRA * 1000
+
+def min_por_segmento(valores, inicios):
+    # Minimo y posicion (primer minimo) de cada segmento de columnas de valores (n, l_total);
+    # inicios es la posicion donde empieza cada segmento (formato CSR, segmentos no vacios).
+    valores = np.atleast_2d(valores)
+    l_total = valores.shape[1]
+    longitudes = np.diff(np.append(inicios, l_total))
+    mins = np.minimum.reduceat(valores, inicios, axis=1)
+    es_min = valores == np.repeat(mins, longitudes, axis=1)
+    posiciones = np.where(es_min, np.arange(l_total), l_total)
+    argmins = np.minimum.reduceat(posiciones, inicios, axis=1)
+    return mins, np.minimum(argmins, l_total - 1)
@@ -0,0 +1,127 @@
+import numpy as np
+import networkx as nx
+from algoritmos.candidatos import ELEMENTOS_POR_BLOQUE
+from algoritmos.distances import min_por_segmento
+
+# Radio por defecto (metros) de los Dijkstra acotados desde el origen de cada persona
+RADIO_RED = 3000
+
+class CacheRed:
+    """
+    Caché de árboles de distancias a pie sobre la red del mapa. Se calcula un Dijkstra
+    completo por cada destino compartido (pocos, p.ej. estaciones de metro) y un Dijkstra
+    acotado por cada nodo de origen; los árboles se reutilizan entre todas las parejas
+    persona/vehículo y entre ejecuciones de los algoritmos.
+
+    Atributos:
+    ----------
+    _G : networkx.MultiGraph
+        Vista no dirigida del grafo (a pie no aplican los sentidos de las calles).
+    _destinos : dict
+        Nodo destino -> diccionario nodo -> distancia al destino.
+    _origenes : dict
+        Nodo origen -> (radio, diccionario nodo -> distancia desde el origen).
+    """
+
+    def __init__(self, G, weight="length"):
+        """
+        Inicializa una instancia de CacheRed.
+
+        Parámetros:
+        -----------
+        G : networkx.MultiDiGraph
+            Grafo del mapa de la clase Map.
+        weight : str, opcional
+            Atributo de las aristas usado como longitud. Por defecto es "length".
+        """
+        self._G = G.to_undirected(as_view=True)
+        self._weight = weight
+        self._destinos = {}
+        self._origenes = {}
+
+    def hacia_destino(self, nodo):
+        """
+        Obtiene la distancia a pie de todos los nodos hacia un destino compartido.
+
+        Parámetros:
+        -----------
+        nodo : int
+            Nodo destino.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nodo -> distancia en metros.
+        """
+        arbol = self._destinos.get(nodo)
+        if arbol is None:
+            arbol = nx.single_source_dijkstra_path_length(self._G, nodo, weight=self._weight)
+            self._destinos[nodo] = arbol
+        return arbol
+
+    def desde_origen(self, nodo, radio=RADIO_RED):
+        """
+        Obtiene la distancia a pie desde un origen a los nodos dentro del radio.
+
+        Parámetros:
+        -----------
+        nodo : int
+            Nodo origen.
+        radio : float, opcional
+            Distancia máxima a explorar. Por defecto RADIO_RED.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nodo -> distancia en metros (solo nodos dentro del radio).
+        """
+        guardado = self._origenes.get(nodo)
+        if guardado is not None and guardado[0] >= radio:
+            if guardado[0] == radio:
+                return guardado[1]
+            return {n: d for n, d in guardado[1].items() if d <= radio}
+        arbol = nx.single_source_dijkstra_path_length(self._G, nodo, cutoff=radio, weight=self._weight)
+        self._origenes[nodo] = (radio, arbol)
+        return arbol
+
+def _distancias_nodos(arbol, nodos_unicos, inversa):
+    # Distancia de cada posicion de las rutas concatenadas usando un arbol de Dijkstra
+    nodos_arbol = np.fromiter(arbol.keys(), dtype=np.int64, count=len(arbol))
+    dist_arbol = np.fromiter(arbol.values(), dtype=np.float64, count=len(arbol))
+    pos = np.minimum(np.searchsorted(nodos_unicos, nodos_arbol), len(nodos_unicos) - 1)
+    encontrado = nodos_unicos[pos] == nodos_arbol
+    dist_unicos = np.full(len(nodos_unicos), np.inf)
+    dist_unicos[pos[encontrado]] = dist_arbol[encontrado]
+    return dist_unicos[inversa]
+
+def _min_por_fuente(fuentes, arbol_fuente, nodos_unicos, inversa, inicios):
+    # Minimo por ruta compartida para cada fuente, en bloques de filas para acotar la memoria
+    filas = max(1, ELEMENTOS_POR_BLOQUE // max(1, len(inversa)))
+    mins = []
+    posiciones = []
+    for inicio in range(0, len(fuentes), filas):
+        dist = np.vstack([_distancias_nodos(arbol_fuente(int(nodo)), nodos_unicos, inversa)
+                          for nodo in fuentes[inicio:inicio + filas]])
+        min_b, pos_b = min_por_segmento(dist, inicios)
+        mins.append(min_b)
+        posiciones.append(pos_b)
+    return np.vstack(mins), np.vstack(posiciones)
+
+def bloques_parejas_red(arreglos, cache_red, radio=RADIO_RED):
+    # Distancias a pie sobre la red de todas las personas contra todas las rutas compartidas.
+    # Genera (inicio, distancias, pos_s, pos_t) por bloques de filas densos (filas, n_conductores)
+    # de a lo mas ELEMENTOS_POR_BLOQUE elementos, a partir de la persona inicio; inf si
+    # ningun nodo de la ruta queda dentro del radio del origen.
+    inicios = arreglos['inicios']
+    nodos_unicos, inversa = np.unique(arreglos['nodos'], return_inverse=True)
+    origenes, inv_o = np.unique(arreglos['orig'], return_inverse=True)
+    destinos, inv_d = np.unique(arreglos['dest'], return_inverse=True)
+
+    min_o, pos_o = _min_por_fuente(origenes, lambda nodo: cache_red.desde_origen(nodo, radio),
+                                   nodos_unicos, inversa, inicios)
+    min_d, pos_d = _min_por_fuente(destinos, cache_red.hacia_destino, nodos_unicos, inversa, inicios)
+
+    filas = max(1, ELEMENTOS_POR_BLOQUE // max(1, len(inicios)))
+    for inicio in range(0, len(inv_o), filas):
+        o, d = inv_o[inicio:inicio + filas], inv_d[inicio:inicio + filas]
+        yield inicio, min_o[o] + min_d[d] + arreglos['walk'][inicio:inicio + filas, None], pos_o[o], pos_d[d]
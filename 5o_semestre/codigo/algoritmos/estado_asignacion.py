@@ -0,0 +1,330 @@
+import copy
+import numpy as np
+
+# Valor de conductor/nodo de una persona sin vehículo asignado
+SIN_ASIGNAR = -1
+
+class EstadoAsignacion:
+    """
+    Estado de una asignación personas -> vehículos compartidos guardado en arreglos, que
+    los algoritmos modifican en lugar de una copia de VehicleFactory. La fábrica, el grafo
+    y las rutas se comparten sin copiarse; materializar() genera una fábrica con el
+    resultado solo cuando se necesita (p.ej. para save_rou_file).
+
+    Atributos:
+    ----------
+    _veh_factory : VehicleFactory
+        Fábrica original, no se modifica.
+    _lugares : numpy.ndarray
+        Lugares libres de cada vehículo compartido (personCapacity - personNumber).
+    _conductor : numpy.ndarray
+        Índice del vehículo compartido asignado a cada persona, SIN_ASIGNAR si no tiene.
+    _caminata : numpy.ndarray
+        Distancia a caminar de cada persona asignada.
+    _nodo_s : numpy.ndarray
+        Nodo de recogida de cada persona asignada, SIN_ASIGNAR si no se conoce.
+    _nodo_t : numpy.ndarray
+        Nodo de bajada de cada persona asignada, SIN_ASIGNAR si no se conoce.
+    _path_len : numpy.ndarray
+        Longitud de la ruta de cada persona (lo que recorre si viaja en su vehículo).
+    _orden_asignacion : list
+        Personas asignadas en el orden en que se asignaron.
+    _sin_vehiculo : list
+        Personas que no alcanzaron vehículo, en el orden en que se marcaron.
+    _marcada : numpy.ndarray
+        Indica si cada persona ya está en _sin_vehiculo.
+    """
+
+    def __init__(self, veh_factory):
+        """
+        Inicializa una instancia de EstadoAsignacion sin personas asignadas.
+
+        Parámetros:
+        -----------
+        veh_factory : VehicleFactory
+            Fábrica de vehículos.
+        """
+        self._veh_factory = veh_factory
+        sharing = veh_factory.veh_sharing
+        sharing_not = veh_factory.veh_not_sharing
+        self._lugares = np.fromiter((v.get_attribute("type").get_attribute("personCapacity") - v.get_attribute("personNumber")
+                                     for v in sharing), dtype=np.int32, count=len(sharing))
+        self._conductor = np.full(len(sharing_not), SIN_ASIGNAR, dtype=np.int32)
+        self._caminata = np.zeros(len(sharing_not), dtype=np.float64)
+        self._nodo_s = np.full(len(sharing_not), SIN_ASIGNAR, dtype=np.int64)
+        self._nodo_t = np.full(len(sharing_not), SIN_ASIGNAR, dtype=np.int64)
+        self._path_len = np.fromiter((v.get_attribute('route').ox_route.path_len for v in sharing_not),
+                                     dtype=np.float64, count=len(sharing_not))
+        self._orden_asignacion = []
+        self._sin_vehiculo = []
+        self._marcada = np.zeros(len(sharing_not), dtype=bool)
+
+    def lleno(self, idx_conductor):
+        """
+        Indica si un vehículo compartido ya no tiene lugares.
+
+        Parámetros:
+        -----------
+        idx_conductor : int
+            Índice del vehículo compartido.
+
+        Devuelve:
+        ---------
+        bool
+            True si el vehículo está lleno.
+        """
+        return self._lugares[idx_conductor] <= 0
+
+    def asignado(self, idx_pasajero):
+        """
+        Indica si una persona ya tiene vehículo compartido.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+
+        Devuelve:
+        ---------
+        bool
+            True si la persona ya fue asignada.
+        """
+        return self._conductor[idx_pasajero] != SIN_ASIGNAR
+
+    def asignar(self, idx_pasajero, idx_conductor, distancia, nodo_s=SIN_ASIGNAR, nodo_t=SIN_ASIGNAR):
+        """
+        Asigna una persona a un vehículo compartido y ocupa un lugar.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        idx_conductor : int
+            Índice del vehículo compartido.
+        distancia : float
+            Distancia total a caminar de la persona.
+        nodo_s : int, opcional
+            Nodo de recogida.
+        nodo_t : int, opcional
+            Nodo de bajada.
+
+        Lanza:
+        ------
+        ValueError
+            Si el vehículo está lleno o la persona ya tiene vehículo.
+        """
+        if self.lleno(idx_conductor):
+            raise ValueError(f"El vehículo compartido {idx_conductor} está lleno.")
+        if self.asignado(idx_pasajero):
+            raise ValueError(f"La persona {idx_pasajero} ya tiene vehículo.")
+        self._lugares[idx_conductor] -= 1
+        self._conductor[idx_pasajero] = idx_conductor
+        self._caminata[idx_pasajero] = distancia
+        self._nodo_s[idx_pasajero] = nodo_s
+        self._nodo_t[idx_pasajero] = nodo_t
+        self._orden_asignacion.append(idx_pasajero)
+
+    def marcar_sin_vehiculo(self, idx_pasajero):
+        """
+        Registra que una persona no alcanzó vehículo (viaja en el suyo). Registrar otra vez
+        a la misma persona no tiene efecto.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        """
+        if not self._marcada[idx_pasajero]:
+            self._marcada[idx_pasajero] = True
+            self._sin_vehiculo.append(idx_pasajero)
+
+    def marcar_sin_asignar(self):
+        """
+        Registra como sin vehículo, en orden de índice, a todas las personas que no fueron
+        asignadas. Las ya registradas se ignoran, así que se puede llamar más de una vez.
+        """
+        for idx_pasajero in np.flatnonzero(self._conductor == SIN_ASIGNAR).tolist():
+            self.marcar_sin_vehiculo(idx_pasajero)
+
+    def total_caminata(self):
+        """
+        Calcula la distancia total: caminata de las personas asignadas más la longitud de
+        la ruta de las personas sin vehículo.
+
+        Devuelve:
+        ---------
+        float
+            Distancia total.
+        """
+        asignadas = self._conductor != SIN_ASIGNAR
+        return float(self._caminata[asignadas].sum() + self._path_len[~asignadas].sum())
+
+    def materializar(self):
+        """
+        Genera una copia de la fábrica con la asignación aplicada (personNumber,
+        vehicles_sharing, user_dist_walk y veh_not_get), como la devolvían los algoritmos
+        antes. El grafo, las rutas y los tipos de vehículo se comparten con la fábrica original.
+
+        Devuelve:
+        ---------
+        VehicleFactory
+            Fábrica con la asignación.
+        """
+        factory = self._veh_factory
+        memo = {id(factory.G): factory.G}
+        for veh_type in factory.veh_types:
+            memo[id(veh_type)] = veh_type
+        for vehicle in factory.vehicles:
+            route = vehicle.get_attribute('route')
+            memo[id(route)] = route
+        nueva = copy.deepcopy(factory, memo)
+
+        sharing = nueva.veh_sharing
+        sharing_not = nueva.veh_not_sharing
+        for idx_not in self._orden_asignacion:
+            v_not = sharing_not[idx_not]
+            v_sh = sharing[self._conductor[idx_not]]
+            v_sh.set_attribute('personNumber', v_sh.get_attribute('personNumber') + 1)
+            v_sh.vehicles_sharing = v_not
+            v_not.user_dist_walk = float(self._caminata[idx_not])
+        for idx_not in self._sin_vehiculo:
+            nueva.veh_not_get = sharing_not[idx_not]
+        return nueva
+
+    @property
+    def veh_factory(self):
+        """
+        Devuelve la fábrica original.
+
+        Devuelve:
+        ---------
+        VehicleFactory
+            Fábrica de vehículos.
+        """
+        return self._veh_factory
+
+    @property
+    def lugares(self):
+        """
+        Devuelve los lugares libres de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Lugares libres (int32).
+        """
+        return self._lugares
+
+    @property
+    def conductor(self):
+        """
+        Devuelve el vehículo compartido asignado a cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Índice del vehículo (int32), SIN_ASIGNAR si no tiene.
+        """
+        return self._conductor
+
+    @property
+    def caminata(self):
+        """
+        Devuelve la distancia a caminar de cada persona asignada.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Distancias (float64), 0 en personas sin asignar.
+        """
+        return self._caminata
+
+    @property
+    def nodo_s(self):
+        """
+        Devuelve el nodo de recogida de cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Nodos (int64), SIN_ASIGNAR si no se conoce.
+        """
+        return self._nodo_s
+
+    @property
+    def nodo_t(self):
+        """
+        Devuelve el nodo de bajada de cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Nodos (int64), SIN_ASIGNAR si no se conoce.
+        """
+        return self._nodo_t
+
+    @property
+    def path_len(self):
+        """
+        Devuelve la longitud de la ruta de cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Longitudes (float64).
+        """
+        return self._path_len
+
+    @property
+    def orden_asignacion(self):
+        """
+        Devuelve las personas asignadas en el orden en que se asignaron.
+
+        Devuelve:
+        ---------
+        list
+            Índices de las personas.
+        """
+        return self._orden_asignacion
+
+    @property
+    def sin_vehiculo(self):
+        """
+        Devuelve las personas que no alcanzaron vehículo.
+
+        Devuelve:
+        ---------
+        list
+            Índices de las personas, en el orden en que se marcaron.
+        """
+        return self._sin_vehiculo
+
+def resultados_asignacion(estado, ids_pasajeros, ids_conductores):
+    # Total y vehicles_final a partir del estado, en el orden de asignacion; solo aqui se
+    # consultan los vehiculos. No modifica el estado: las personas sin vehiculo se registran
+    # con estado.marcar_sin_asignar().
+    # Lo comparten algoritmo_voraz_q_prioridades, algoritmo_optimo y algoritmo_subasta;
+    # cada elemento de vehicles_final es (caminata, (origen, destino), (nodo_s, nodo_t),
+    # (persona, vehiculo compartido), (id persona, id vehiculo compartido)).
+    veh_factory = estado.veh_factory
+    v_not_sharing = veh_factory.veh_not_sharing
+    v_sharing = veh_factory.veh_sharing
+    conductor = estado.conductor.tolist()
+    caminata = estado.caminata.tolist()
+    nodo_s = estado.nodo_s.tolist()
+    nodo_t = estado.nodo_t.tolist()
+    total_people_walk = 0
+    vehicles_final = []
+    for idx_not in estado.orden_asignacion:
+        idx_sh = conductor[idx_not]
+        v_not = v_not_sharing[idx_not]
+        ox_route = v_not.get_attribute('route').ox_route
+        total_people_walk += caminata[idx_not]
+        vehicles_final.append((caminata[idx_not], (ox_route.orig, ox_route.dest_sharing), (nodo_s[idx_not], nodo_t[idx_not]),
+                               (v_not, v_sharing[idx_sh]), (ids_pasajeros[idx_not], ids_conductores[idx_sh])))
+
+    #checar si existen personas sin vehiculo
+    for idx_not, v in enumerate(v_not_sharing):
+        if conductor[idx_not] == SIN_ASIGNAR:
+            total_people_walk += v.get_attribute('route').ox_route.path_len
+    return total_people_walk, vehicles_final
@@ -0,0 +1,247 @@
+import numpy as np
+from algoritmos.all_people_distances import _coordenadas_nodos, _coordenadas_ruta, _generar_arreglos
+from algoritmos.candidatos import ELEMENTOS_POR_BLOQUE, seleccionar_top_k
+from algoritmos.distances import haversine_matrix, min_por_segmento
+
+class DistanciasIncrementales:
+    """
+    Mantiene actualizadas la lista de candidatos y la estructura de distancias que devuelve
+    all_people_distances o candidatos_cercanos (modo 'haversine') cuando llegan o se van personas o vehículos
+    compartidos, sin volver a calcular todas las parejas.
+
+    Agregar una persona calcula solo su fila; agregar un vehículo compartido calcula solo
+    su columna. Quitar no calcula distancias, salvo con top_k: las personas que tenían
+    como candidato al vehículo quitado recalculan su fila para recuperar el siguiente.
+
+    Atributos:
+    ----------
+    _veh_factory : VehicleFactory
+        Fábrica de vehículos; se mantiene sincronizada con las estructuras.
+    _q : ListaCandidatos
+        Lista de candidatos ordenada por prioridad.
+    _distancias : MatrizDistancias o CandidatosDispersos
+        Distancias de las parejas candidatas.
+    _radio_caminata : float
+        Distancia total máxima a caminar de una pareja candidata.
+    _top_k : int
+        Número máximo de vehículos compartidos candidatos por persona.
+    _tabla_nodos : NodeTable
+        Tabla de coordenadas de los nodos.
+    _arreglos : dict
+        Arreglos de personas (lat_s, lon_s, lat_t, lon_t, walk) y de rutas concatenadas
+        (nodos, inicios, lat_r, lon_r), en el mismo formato que all_people_distances.
+    """
+
+    def __init__(self, veh_factory, q, distancias, radio_caminata=None, top_k=None, tabla_nodos=None):
+        """
+        Inicializa una instancia de DistanciasIncrementales.
+
+        Parámetros:
+        -----------
+        veh_factory : VehicleFactory
+            Fábrica de vehículos usada en all_people_distances o candidatos_cercanos.
+        q : ListaCandidatos
+            Lista de candidatos devuelta por all_people_distances o candidatos_cercanos.
+        distancias : MatrizDistancias o CandidatosDispersos
+            Distancias devueltas por all_people_distances o candidatos_cercanos.
+        radio_caminata : float, opcional
+            El mismo radio usado en candidatos_cercanos. Por defecto sin radio.
+        top_k : int, opcional
+            El mismo top_k usado en candidatos_cercanos. Por defecto sin límite.
+        tabla_nodos : NodeTable, opcional
+            Tabla de coordenadas de los nodos de Map.
+        """
+        self._veh_factory = veh_factory
+        self._q = q
+        self._distancias = distancias
+        self._radio_caminata = radio_caminata
+        self._top_k = top_k
+        self._tabla_nodos = tabla_nodos
+        self._arreglos = _generar_arreglos(veh_factory, tabla_nodos)
+
+    def _parejas_pasajeros(self, idx_pasajeros):
+        # Candidatos de las personas indicadas contra todas las rutas compartidas
+        a = self._arreglos
+        idx_pasajeros = np.asarray(idx_pasajeros, dtype=np.int64)
+        if not len(idx_pasajeros) or not len(a['inicios']):
+            vacio = np.empty(0, dtype=np.int64)
+            return vacio, vacio, np.empty(0, dtype=np.float64), vacio, vacio
+        filas = max(1, ELEMENTOS_POR_BLOQUE // max(1, len(a['nodos'])))
+        bloques = []
+        for inicio in range(0, len(idx_pasajeros), filas):
+            pas = idx_pasajeros[inicio:inicio + filas]
+            min_s, pos_s = min_por_segmento(haversine_matrix(a['lat_s'][pas], a['lon_s'][pas], a['lat_r'], a['lon_r']), a['inicios'])
+            min_t, pos_t = min_por_segmento(haversine_matrix(a['lat_t'][pas], a['lon_t'][pas], a['lat_r'], a['lon_r']), a['inicios'])
+            dist = min_s + min_t + a['walk'][pas, None]
+            fila, conductores = np.nonzero(dist <= self._radio_caminata if self._radio_caminata is not None
+                                           else np.ones(dist.shape, dtype=bool))
+            bloques.append((pas[fila], conductores, dist[fila, conductores],
+                            pos_s[fila, conductores], pos_t[fila, conductores]))
+        return self._recortar(*(np.concatenate(columna) for columna in zip(*bloques)))
+
+    def _parejas_conductor(self, idx_conductor):
+        # Candidatos de todas las personas contra la ruta de un vehiculo compartido
+        a = self._arreglos
+        inicio = a['inicios'][idx_conductor]
+        fin = a['inicios'][idx_conductor + 1] if idx_conductor + 1 < len(a['inicios']) else len(a['nodos'])
+        lat_r, lon_r = a['lat_r'][inicio:fin], a['lon_r'][inicio:fin]
+        dist_s = haversine_matrix(a['lat_s'], a['lon_s'], lat_r, lon_r)
+        dist_t = haversine_matrix(a['lat_t'], a['lon_t'], lat_r, lon_r)
+        pos_s = np.argmin(dist_s, axis=1)
+        pos_t = np.argmin(dist_t, axis=1)
+        todos = np.arange(len(a['walk']))
+        dist = dist_s[todos, pos_s] + dist_t[todos, pos_t] + a['walk']
+        pas = todos if self._radio_caminata is None else np.flatnonzero(dist <= self._radio_caminata)
+        return pas, dist[pas], pos_s[pas] + inicio, pos_t[pas] + inicio
+
+    def _recortar(self, pasajeros, conductores, distancias, pos_s, pos_t):
+        if self._top_k is None:
+            return pasajeros, conductores, distancias, pos_s, pos_t
+        seleccion = seleccionar_top_k(pasajeros, conductores, distancias, self._top_k)
+        return (pasajeros[seleccion], conductores[seleccion], distancias[seleccion],
+                pos_s[seleccion], pos_t[seleccion])
+
+    def _reemplazar(self, idx_pasajeros, pasajeros, conductores, distancias, nodos_s, nodos_t):
+        for estructura in (self._q, self._distancias):
+            estructura.reemplazar_pasajeros(idx_pasajeros, pasajeros, conductores, distancias, nodos_s, nodos_t)
+
+    def _agregar_pasajero(self, vehicle):
+        a = self._arreglos
+        ox_route = vehicle.get_attribute('route').ox_route
+        G = self._veh_factory.G
+        lat, lon = _coordenadas_nodos(G, [ox_route.orig, ox_route.dest_sharing], self._tabla_nodos)
+        for llave, valor in (('lat_s', lat[0]), ('lon_s', lon[0]), ('lat_t', lat[1]), ('lon_t', lon[1]),
+                             ('walk', vehicle.user_dist_walk), ('orig', ox_route.orig), ('dest', ox_route.dest_sharing)):
+            a[llave] = np.append(a[llave], np.asarray(valor, dtype=a[llave].dtype))
+        _, conductores, distancias, pos_s, pos_t = self._parejas_pasajeros([len(a['walk']) - 1])
+        for estructura in (self._q, self._distancias):
+            estructura.agregar_pasajero(vehicle.get_attribute('id'), conductores, distancias,
+                                        a['nodos'][pos_s], a['nodos'][pos_t])
+
+    def _agregar_conductor(self, vehicle):
+        a = self._arreglos
+        ruta, lat_r, lon_r = _coordenadas_ruta(self._veh_factory.G, vehicle.get_attribute('route').ox_route,
+                                               self._tabla_nodos)
+        a['inicios'] = np.append(a['inicios'], len(a['nodos']))
+        a['nodos'] = np.concatenate((a['nodos'], ruta))
+        a['lat_r'] = np.concatenate((a['lat_r'], lat_r))
+        a['lon_r'] = np.concatenate((a['lon_r'], lon_r))
+        idx_conductor = len(a['inicios']) - 1
+        pasajeros, distancias, pos_s, pos_t = self._parejas_conductor(idx_conductor)
+        id_conductor = vehicle.get_attribute('id')
+        if self._top_k is None:
+            for estructura in (self._q, self._distancias):
+                estructura.agregar_conductor(id_conductor, pasajeros, distancias, a['nodos'][pos_s], a['nodos'][pos_t])
+            return
+        # con top_k el nuevo vehiculo compite con los candidatos actuales de cada persona
+        for estructura in (self._q, self._distancias):
+            estructura.agregar_conductor(id_conductor, pasajeros[:0], distancias[:0], pos_s[:0], pos_t[:0])
+        registros = self._q.registros
+        actuales = registros[np.isin(registros['pasajero'], pasajeros)]
+        seleccion = self._recortar(
+            np.concatenate((actuales['pasajero'], pasajeros)),
+            np.concatenate((actuales['conductor'], np.full(len(pasajeros), idx_conductor))),
+            np.concatenate((actuales['prioridad'], distancias)),
+            np.concatenate((actuales['nodo_s'], a['nodos'][pos_s])),
+            np.concatenate((actuales['nodo_t'], a['nodos'][pos_t])))
+        self._reemplazar(pasajeros, *seleccion)
+
+    def _quitar_pasajero(self, idx_pasajero):
+        a = self._arreglos
+        for llave in ('lat_s', 'lon_s', 'lat_t', 'lon_t', 'walk', 'orig', 'dest'):
+            a[llave] = np.delete(a[llave], idx_pasajero)
+        for estructura in (self._q, self._distancias):
+            estructura.quitar_pasajero(idx_pasajero)
+
+    def _quitar_conductor(self, idx_conductor):
+        a = self._arreglos
+        inicio = a['inicios'][idx_conductor]
+        fin = a['inicios'][idx_conductor + 1] if idx_conductor + 1 < len(a['inicios']) else len(a['nodos'])
+        for llave in ('nodos', 'lat_r', 'lon_r'):
+            a[llave] = np.delete(a[llave], np.s_[inicio:fin])
+        a['inicios'] = np.delete(a['inicios'], idx_conductor)
+        a['inicios'][idx_conductor:] -= fin - inicio
+        registros = self._q.registros
+        afectados = np.unique(registros['pasajero'][registros['conductor'] == idx_conductor])
+        for estructura in (self._q, self._distancias):
+            estructura.quitar_conductor(idx_conductor)
+        if self._top_k is not None and len(afectados):
+            # el siguiente mejor vehiculo de cada persona afectada puede entrar al top_k
+            pasajeros, conductores, distancias, pos_s, pos_t = self._parejas_pasajeros(afectados)
+            self._reemplazar(afectados, pasajeros, conductores, distancias, a['nodos'][pos_s], a['nodos'][pos_t])
+
+    def agregar_vehiculo(self, id, veh_type, route, sharing, depart=0):
+        """
+        Agrega un vehículo a la fábrica y sus parejas candidatas a las estructuras.
+
+        Parámetros:
+        -----------
+        id : str
+            Identificador del vehículo.
+        veh_type : VehicleType
+            Tipo del vehículo.
+        route : Route
+            Ruta del vehículo creado en la fabrica Sumo.
+        sharing : bool
+            True si es un vehículo compartido, False si es una persona que quiere viajar.
+        depart : int, opcional
+            Tiempo de salida del vehículo. Por defecto es 0.
+
+        Devuelve:
+        ---------
+        Vehicle
+            Vehículo creado.
+        """
+        vehicle = self._veh_factory.add_vehicle(id, veh_type, route, sharing, depart)
+        if sharing:
+            self._agregar_conductor(vehicle)
+        else:
+            self._agregar_pasajero(vehicle)
+        return vehicle
+
+    def quitar_vehiculo(self, id):
+        """
+        Quita un vehículo de la fábrica y sus parejas candidatas de las estructuras.
+
+        Parámetros:
+        -----------
+        id : str
+            Identificador del vehículo.
+
+        Devuelve:
+        ---------
+        Vehicle
+            Vehículo quitado.
+        """
+        idx_pasajero = self._distancias.idx_pasajero.get(id)
+        idx_conductor = self._distancias.idx_conductor.get(id)
+        vehicle = self._veh_factory.remove_vehicle(id)
+        if idx_pasajero is not None:
+            self._quitar_pasajero(idx_pasajero)
+        elif idx_conductor is not None:
+            self._quitar_conductor(idx_conductor)
+        return vehicle
+
+    @property
+    def q(self):
+        """
+        Devuelve la lista de candidatos actualizada.
+
+        Devuelve:
+        ---------
+        ListaCandidatos
+            Lista de candidatos ordenada por prioridad.
+        """
+        return self._q
+
+    @property
+    def distancias(self):
+        """
+        Devuelve la estructura de distancias actualizada.
+
+        Devuelve:
+        ---------
+        MatrizDistancias o CandidatosDispersos
+            Distancias de las parejas candidatas.
+        """
+        return self._distancias
@@ -0,0 +1,125 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from algoritmos.distances import a_cartesianas, cuerda_a_metros, haversine_distances
+
+class IndiceRutas:
+    """
+    Índice espacial (KD-tree) sobre los nodos de las rutas de los vehículos compartidos.
+
+    Los nodos se indexan en coordenadas cartesianas de la esfera unitaria, donde el
+    vecino más cercano coincide con el de la distancia de haversine; las distancias
+    devueltas se recalculan con haversine sobre el nodo encontrado.
+
+    Atributos:
+    ----------
+    _lat : numpy.ndarray
+        Latitud de todos los nodos de las rutas concatenadas.
+    _lon : numpy.ndarray
+        Longitud de todos los nodos de las rutas concatenadas.
+    _inicios : numpy.ndarray
+        Posición donde inicia la ruta de cada vehículo (formato CSR).
+    _xyz : numpy.ndarray
+        Coordenadas cartesianas de los nodos, arreglo (n, 3).
+    _caja_min : numpy.ndarray
+        Esquina mínima de la caja (3D) que contiene cada ruta, arreglo (n_vehiculos, 3).
+    _caja_max : numpy.ndarray
+        Esquina máxima de la caja (3D) que contiene cada ruta, arreglo (n_vehiculos, 3).
+    _arboles : dict
+        KD-tree por vehículo, se construyen bajo demanda.
+    """
+
+    def __init__(self, lat, lon, inicios):
+        """
+        Inicializa una instancia de IndiceRutas.
+
+        Parámetros:
+        -----------
+        lat : numpy.ndarray
+            Latitud de los nodos de las rutas concatenadas.
+        lon : numpy.ndarray
+            Longitud de los nodos de las rutas concatenadas.
+        inicios : numpy.ndarray
+            Posición donde inicia la ruta de cada vehículo.
+        """
+        self._lat = np.asarray(lat, dtype=np.float64)
+        self._lon = np.asarray(lon, dtype=np.float64)
+        self._inicios = np.asarray(inicios, dtype=np.int64)
+        self._fines = np.append(self._inicios[1:], len(self._lat))
+        self._xyz = a_cartesianas(self._lat, self._lon)
+        if len(self._inicios):
+            self._caja_min = np.minimum.reduceat(self._xyz, self._inicios, axis=0)
+            self._caja_max = np.maximum.reduceat(self._xyz, self._inicios, axis=0)
+        else:
+            self._caja_min = self._caja_max = np.empty((0, 3))
+        self._arboles = {}
+
+    def _arbol(self, idx_veh):
+        arbol = self._arboles.get(idx_veh)
+        if arbol is None:
+            arbol = cKDTree(self._xyz[self._inicios[idx_veh]:self._fines[idx_veh]])
+            self._arboles[idx_veh] = arbol
+        return arbol
+
+    def mas_cercano(self, idx_veh, lat, lon):
+        """
+        Obtiene, para cada punto, el nodo más cercano de la ruta de un vehículo.
+
+        Parámetros:
+        -----------
+        idx_veh : int
+            Índice del vehículo.
+        lat : numpy.ndarray
+            Latitud de los puntos a consultar.
+        lon : numpy.ndarray
+            Longitud de los puntos a consultar.
+
+        Devuelve:
+        ---------
+        tuple
+            (distancias en metros, posiciones globales de los nodos).
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        _, pos = self._arbol(idx_veh).query(a_cartesianas(lat, lon))
+        pos = pos + self._inicios[idx_veh]
+        return haversine_distances(lat, lon, self._lat[pos], self._lon[pos]), pos
+
+    def cotas_inferiores(self, lat, lon, inicio=0, fin=None):
+        """
+        Obtiene una cota inferior de la distancia de cada punto a cada ruta en [inicio, fin)
+        usando la caja que contiene a la ruta; no recorre los nodos.
+
+        Parámetros:
+        -----------
+        lat : numpy.ndarray
+            Latitud de los puntos a consultar.
+        lon : numpy.ndarray
+            Longitud de los puntos a consultar.
+        inicio : int, opcional
+            Primer vehículo a consultar. Por defecto es 0.
+        fin : int, opcional
+            Vehículo final (excluido). Por defecto todos.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Cota inferior en metros, arreglo (n_puntos, fin - inicio).
+        """
+        if fin is None:
+            fin = len(self._inicios)
+        puntos = a_cartesianas(lat, lon)[:, None, :]
+        exceso = np.maximum(self._caja_min[None, inicio:fin] - puntos, puntos - self._caja_max[None, inicio:fin])
+        cuerda = np.sqrt(np.sum(np.maximum(exceso, 0.0)**2, axis=2))
+        return cuerda_a_metros(cuerda)
+
+    @property
+    def n_vehiculos(self):
+        """
+        Devuelve el número de rutas indexadas.
+
+        Devuelve:
+        ---------
+        int
+            Número de rutas indexadas.
+        """
+        return len(self._inicios)
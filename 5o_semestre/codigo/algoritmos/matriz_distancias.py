@@ -0,0 +1,414 @@
+import json
+import numpy as np
+from algoritmos.candidatos import ELEMENTOS_POR_BLOQUE, SIN_CANDIDATO
+
+class MatrizDistancias:
+    """
+    Matriz densa de distancias a caminar, una fila por vehículo compartido y una columna
+    por persona que quiere viajar. Las parejas no candidatas valen SIN_CANDIDATO.
+    Las distancias se guardan en float32 (la mitad de memoria que float64), con un error
+    relativo de ~6e-8 respecto a las de CandidatosDispersos.
+
+    Atributos:
+    ----------
+    _datos : numpy.ndarray o numpy.memmap
+        Arreglo float32 (n_conductores, n_pasajeros).
+    _ids_conductores : list
+        Id de cada vehículo compartido, en el orden de veh_sharing.
+    _ids_pasajeros : list
+        Id de cada persona, en el orden de veh_not_sharing.
+    _idx_conductor : dict
+        Diccionario id -> índice de vehículo compartido.
+    _idx_pasajero : dict
+        Diccionario id -> índice de persona.
+    """
+
+    def __init__(self, datos, ids_conductores, ids_pasajeros):
+        """
+        Inicializa una instancia de MatrizDistancias.
+
+        Parámetros:
+        -----------
+        datos : numpy.ndarray
+            Arreglo (n_conductores, n_pasajeros) con las distancias.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+        ids_pasajeros : list
+            Id de cada persona.
+        """
+        if datos.shape != (len(ids_conductores), len(ids_pasajeros)):
+            raise ValueError("La forma de datos no coincide con el número de ids.")
+        self._datos = datos
+        self._ids_conductores = list(ids_conductores)
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._idx_conductor = {id: idx for idx, id in enumerate(self._ids_conductores)}
+        self._idx_pasajero = {id: idx for idx, id in enumerate(self._ids_pasajeros)}
+
+    @staticmethod
+    def _crear_datos(n_conductores, n_pasajeros, ruta=None):
+        if ruta is None:
+            return np.full((n_conductores, n_pasajeros), SIN_CANDIDATO, dtype=np.float32)
+        datos = np.lib.format.open_memmap(ruta, mode='w+', dtype=np.float32, shape=(n_conductores, n_pasajeros))
+        datos[...] = SIN_CANDIDATO
+        return datos
+
+    @classmethod
+    def desde_candidatos(cls, candidatos, ruta=None):
+        """
+        Construye la matriz densa a partir de CandidatosDispersos.
+
+        Parámetros:
+        -----------
+        candidatos : CandidatosDispersos
+            Parejas candidatas.
+        ruta : str, opcional
+            Archivo .npy donde se guarda la matriz como memmap. Por defecto en memoria.
+
+        Devuelve:
+        ---------
+        MatrizDistancias
+            Matriz densa.
+        """
+        datos = cls._crear_datos(candidatos.n_conductores, candidatos.n_pasajeros, ruta)
+        # por bloques de personas para no cargar todas las parejas a la vez
+        tam = max(1, ELEMENTOS_POR_BLOQUE // max(1, candidatos.n_conductores))
+        for inicio in range(0, candidatos.n_pasajeros, tam):
+            pasajeros, conductores, distancias, _, _ = candidatos.parejas(inicio, min(inicio + tam, candidatos.n_pasajeros))
+            datos[conductores, pasajeros] = distancias
+        matriz = cls(datos, candidatos.ids_conductores, candidatos.ids_pasajeros)
+        if ruta is not None:
+            matriz._guardar_ids(ruta)
+        return matriz
+
+    def _guardar_ids(self, ruta):
+        with open(f"{ruta}.json", "w") as archivo:
+            json.dump({"conductores": self._ids_conductores, "pasajeros": self._ids_pasajeros}, archivo)
+
+    def guardar(self, ruta):
+        """
+        Guarda la matriz en un archivo .npy y los ids en ruta + '.json'.
+
+        Parámetros:
+        -----------
+        ruta : str
+            Archivo .npy destino.
+        """
+        np.save(ruta, self._datos)
+        self._guardar_ids(ruta)
+
+    @classmethod
+    def cargar(cls, ruta, mmap_mode='r'):
+        """
+        Carga una matriz guardada con guardar o desde_candidatos.
+
+        Parámetros:
+        -----------
+        ruta : str
+            Archivo .npy.
+        mmap_mode : str, opcional
+            Modo de numpy.load; None carga la matriz en memoria. Por defecto 'r'.
+
+        Devuelve:
+        ---------
+        MatrizDistancias
+            Matriz cargada.
+        """
+        datos = np.load(ruta, mmap_mode=mmap_mode)
+        with open(f"{ruta}.json") as archivo:
+            ids = json.load(archivo)
+        return cls(datos, ids["conductores"], ids["pasajeros"])
+
+    @classmethod
+    def desde_arreglos(cls, arreglos, ids_pasajeros, ids_conductores):
+        """
+        Construye la matriz sobre los arreglos devueltos por arreglos() (p.ej. abiertos
+        desde memoria compartida en otro proceso), sin copiarlos.
+
+        Parámetros:
+        -----------
+        arreglos : dict
+            Diccionario nombre -> numpy.ndarray.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        MatrizDistancias
+            Matriz sobre los arreglos.
+        """
+        return cls(arreglos['datos'], ids_conductores, ids_pasajeros)
+
+    def arreglos(self):
+        """
+        Devuelve los arreglos de la matriz, p.ej. para copiarlos a ArreglosCompartidos.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nombre -> numpy.ndarray.
+        """
+        return {'datos': self._datos}
+
+    def distancias_pasajero(self, idx_pasajero):
+        """
+        Obtiene la distancia de una persona contra todos los vehículos compartidos.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Arreglo (n_conductores,), SIN_CANDIDATO en parejas no candidatas.
+        """
+        return self._datos[:, idx_pasajero]
+
+    def fila(self, idx_pasajero):
+        """
+        Obtiene los candidatos de una persona.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+
+        Devuelve:
+        ---------
+        tuple
+            (índices de vehículos compartidos, distancias).
+        """
+        distancias = self.distancias_pasajero(idx_pasajero)
+        conductores = np.flatnonzero(distancias != SIN_CANDIDATO)
+        return conductores, distancias[conductores]
+
+    def parejas(self, inicio=0, fin=None):
+        """
+        Devuelve las parejas candidatas de las personas [inicio, fin), igual que
+        CandidatosDispersos.parejas. La matriz no guarda nodos: se devuelven en -1.
+
+        Parámetros:
+        -----------
+        inicio : int, opcional
+            Primera persona. Por defecto es 0.
+        fin : int, opcional
+            Persona final (excluida). Por defecto todas.
+
+        Devuelve:
+        ---------
+        tuple
+            (personas, vehículos compartidos, distancias, nodos de recogida, nodos de bajada).
+        """
+        if fin is None:
+            fin = self.n_pasajeros
+        bloque = np.asarray(self._datos[:, inicio:fin]).T
+        pasajeros, conductores = np.nonzero(bloque != SIN_CANDIDATO)
+        sin_nodo = np.full(len(pasajeros), -1, dtype=np.int64)
+        return pasajeros + inicio, conductores, bloque[pasajeros, conductores], sin_nodo, sin_nodo.copy()
+
+    def mas_cercanos(self):
+        """
+        Obtiene el vehículo compartido más cercano de cada persona (el primero en caso de empate).
+
+        Devuelve:
+        ---------
+        tuple
+            (índice del vehículo o -1 si la persona no tiene candidatos, distancia o SIN_CANDIDATO).
+        """
+        conductores = np.full(self.n_pasajeros, -1, dtype=np.int64)
+        distancias = np.full(self.n_pasajeros, SIN_CANDIDATO, dtype=self._datos.dtype)
+        if not self.n_conductores:
+            return conductores, distancias
+        tam = max(1, ELEMENTOS_POR_BLOQUE // self.n_conductores)
+        for inicio in range(0, self.n_pasajeros, tam):
+            bloque = np.asarray(self._datos[:, inicio:inicio + tam])
+            pos = np.argmin(bloque, axis=0)
+            conductores[inicio:inicio + tam] = pos
+            distancias[inicio:inicio + tam] = bloque[pos, np.arange(bloque.shape[1])]
+        conductores[distancias == SIN_CANDIDATO] = -1
+        return conductores, distancias
+
+    def distancia(self, idx_pasajero, idx_conductor):
+        """
+        Obtiene la distancia de una pareja persona/vehículo compartido.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        idx_conductor : int
+            Índice del vehículo compartido.
+
+        Devuelve:
+        ---------
+        float
+            Distancia total a caminar, o SIN_CANDIDATO si la pareja no es candidata.
+        """
+        return float(self._datos[idx_conductor, idx_pasajero])
+
+    def agregar_pasajero(self, id_pasajero, conductores, distancias, nodos_s=None, nodos_t=None):
+        """
+        Agrega una persona al final (nueva columna). Los nodos se aceptan por compatibilidad
+        con CandidatosDispersos pero la matriz no los guarda. Si la matriz es un memmap, el
+        resultado queda en memoria.
+
+        Parámetros:
+        -----------
+        id_pasajero : str
+            Id de la persona.
+        conductores : numpy.ndarray
+            Índice del vehículo compartido de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        """
+        columna = np.full((self.n_conductores, 1), SIN_CANDIDATO, dtype=self._datos.dtype)
+        columna[conductores, 0] = distancias
+        self._datos = np.concatenate((self._datos, columna), axis=1)
+        self._ids_pasajeros.append(id_pasajero)
+        self._idx_pasajero[id_pasajero] = len(self._ids_pasajeros) - 1
+
+    def quitar_pasajero(self, idx_pasajero):
+        """
+        Quita una persona (columna); las personas siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_pasajero : int
+            Índice de la persona.
+        """
+        self._datos = np.delete(self._datos, idx_pasajero, axis=1)
+        del self._ids_pasajeros[idx_pasajero]
+        self._idx_pasajero = {id: idx for idx, id in enumerate(self._ids_pasajeros)}
+
+    def agregar_conductor(self, id_conductor, pasajeros, distancias, nodos_s=None, nodos_t=None):
+        """
+        Agrega un vehículo compartido al final (nueva fila).
+
+        Parámetros:
+        -----------
+        id_conductor : str
+            Id del vehículo compartido.
+        pasajeros : numpy.ndarray
+            Índice de la persona de cada candidato.
+        distancias : numpy.ndarray
+            Distancia total a caminar de cada candidato.
+        """
+        fila = np.full((1, self.n_pasajeros), SIN_CANDIDATO, dtype=self._datos.dtype)
+        fila[0, pasajeros] = distancias
+        self._datos = np.concatenate((self._datos, fila), axis=0)
+        self._ids_conductores.append(id_conductor)
+        self._idx_conductor[id_conductor] = len(self._ids_conductores) - 1
+
+    def quitar_conductor(self, idx_conductor):
+        """
+        Quita un vehículo compartido (fila); los vehículos siguientes recorren su índice.
+
+        Parámetros:
+        -----------
+        idx_conductor : int
+            Índice del vehículo compartido.
+        """
+        self._datos = np.delete(self._datos, idx_conductor, axis=0)
+        del self._ids_conductores[idx_conductor]
+        self._idx_conductor = {id: idx for idx, id in enumerate(self._ids_conductores)}
+
+    def reemplazar_pasajeros(self, idx_pasajeros, pasajeros, conductores, distancias, nodos_s=None, nodos_t=None):
+        """
+        Sustituye las columnas de las personas indicadas por las parejas dadas.
+
+        Parámetros:
+        -----------
+        idx_pasajeros : numpy.ndarray
+            Índices de las personas cuyas columnas se sustituyen.
+        pasajeros, conductores, distancias : numpy.ndarray
+            Nuevas parejas de esas personas.
+        """
+        self._datos[:, idx_pasajeros] = SIN_CANDIDATO
+        self._datos[conductores, pasajeros] = distancias
+
+    @property
+    def datos(self):
+        """
+        Devuelve el arreglo (n_conductores, n_pasajeros) de distancias.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Distancias, SIN_CANDIDATO en parejas no candidatas.
+        """
+        return self._datos
+
+    @property
+    def n_pasajeros(self):
+        """
+        Devuelve el número de personas (columnas).
+
+        Devuelve:
+        ---------
+        int
+            Número de personas.
+        """
+        return len(self._ids_pasajeros)
+
+    @property
+    def n_conductores(self):
+        """
+        Devuelve el número de vehículos compartidos (filas).
+
+        Devuelve:
+        ---------
+        int
+            Número de vehículos compartidos.
+        """
+        return len(self._ids_conductores)
+
+    @property
+    def ids_pasajeros(self):
+        """
+        Devuelve el id de cada persona.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada persona.
+        """
+        return self._ids_pasajeros
+
+    @property
+    def ids_conductores(self):
+        """
+        Devuelve el id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada vehículo compartido.
+        """
+        return self._ids_conductores
+
+    @property
+    def idx_pasajero(self):
+        """
+        Devuelve el diccionario id -> índice de persona.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario id -> índice.
+        """
+        return self._idx_pasajero
+
+    @property
+    def idx_conductor(self):
+        """
+        Devuelve el diccionario id -> índice de vehículo compartido.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario id -> índice.
+        """
+        return self._idx_conductor
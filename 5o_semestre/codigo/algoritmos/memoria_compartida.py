@@ -0,0 +1,133 @@
+import mmap
+from multiprocessing import shared_memory
+import numpy as np
+
+def _en_archivo(arreglo):
+    # (ruta, offset) del archivo si el arreglo es una vista contigua de un numpy.memmap (p.ej. el
+    # resultado de np.asarray sobre el memmap), None si hay que copiarlo; los vacios se copian
+    # porque no se puede abrir un memmap de tamaño 0
+    base = arreglo
+    while isinstance(base, np.ndarray) and not (isinstance(base, np.memmap) and isinstance(base.base, mmap.mmap)):
+        base = base.base
+    if not isinstance(base, np.memmap) or base.filename is None or not arreglo.flags.c_contiguous or not arreglo.size:
+        return None
+    return base.filename, base.offset + arreglo.ctypes.data - base.ctypes.data
+
+class ArreglosCompartidos:
+    """
+    Conjunto de arreglos de numpy copiados a bloques de multiprocessing.shared_memory
+    para que los procesos de un Pool los lean sin necesidad de serializarlos.
+
+    Los arreglos que ya están en un archivo (vistas contiguas de un numpy.memmap, p.ej. de
+    cargar_almacen) no se copian: los procesos reciben la ruta y vuelven a abrir el archivo
+    en modo de solo lectura.
+
+    Atributos:
+    ----------
+    _bloques : list
+        Bloques de memoria compartida creados por este proceso.
+    _specs : dict
+        Diccionario nombre -> (nombre del bloque o ruta del archivo, forma, dtype, offset) que
+        se envía a los procesos; offset es None para los bloques de memoria compartida.
+    _arreglos : dict
+        Vistas de numpy sobre los bloques compartidos (o los memmaps originales).
+    """
+
+    def __init__(self, arreglos):
+        """
+        Copia los arreglos a memoria compartida, salvo los que ya son memmaps de un archivo.
+
+        Parámetros:
+        -----------
+        arreglos : dict
+            Diccionario nombre -> numpy.ndarray.
+        """
+        self._bloques = []
+        self._specs = {}
+        self._arreglos = {}
+        try:
+            for nombre, arreglo in arreglos.items():
+                archivo = _en_archivo(arreglo)
+                if archivo is not None:
+                    self._arreglos[nombre] = arreglo
+                    self._specs[nombre] = (archivo[0], arreglo.shape, arreglo.dtype.str, archivo[1])
+                    continue
+                arreglo = np.ascontiguousarray(arreglo)
+                bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+                self._bloques.append(bloque)
+                vista = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)
+                vista[...] = arreglo
+                self._arreglos[nombre] = vista
+                self._specs[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str, None)
+        except Exception as error:
+            self.cerrar()
+            raise error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cerrar()
+
+    def cerrar(self):
+        """
+        Libera los bloques de memoria compartida creados por este proceso.
+        """
+        self._arreglos = {}
+        for bloque in self._bloques:
+            bloque.close()
+            bloque.unlink()
+        self._bloques = []
+
+    @staticmethod
+    def adjuntar(specs):
+        """
+        Abre desde otro proceso los bloques descritos en specs.
+
+        Parámetros:
+        -----------
+        specs : dict
+            Diccionario generado por la propiedad specs.
+
+        Devuelve:
+        ---------
+        tuple
+            (lista de bloques abiertos, diccionario nombre -> numpy.ndarray de solo lectura).
+            Los bloques deben mantenerse vivos mientras se usen los arreglos.
+        """
+        bloques = []
+        arreglos = {}
+        for nombre, (origen, forma, dtype, offset) in specs.items():
+            if offset is not None:
+                arreglos[nombre] = np.memmap(origen, dtype=np.dtype(dtype), mode='r', offset=offset, shape=forma)
+                continue
+            bloque = shared_memory.SharedMemory(name=origen)
+            bloques.append(bloque)
+            arreglo = np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf)
+            arreglo.flags.writeable = False
+            arreglos[nombre] = arreglo
+        return bloques, arreglos
+
+    @property
+    def specs(self):
+        """
+        Devuelve la descripción de los bloques para enviarla a otros procesos.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nombre -> (nombre del bloque o ruta del archivo, forma, dtype, offset).
+        """
+        return self._specs
+
+    @property
+    def arreglos(self):
+        """
+        Devuelve las vistas locales sobre los bloques compartidos.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario nombre -> numpy.ndarray (los memmaps se devuelven tal cual).
+        """
+        return self._arreglos
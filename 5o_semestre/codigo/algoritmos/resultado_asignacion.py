@@ -0,0 +1,265 @@
+import json
+import numpy as np
+from algoritmos.estado_asignacion import SIN_ASIGNAR
+
+class ResultadoAsignacion:
+    """
+    Resultado de una asignación personas -> vehículos compartidos guardado solo en arreglos,
+    sin referencias a objetos Vehicle. Se puede comparar entre algoritmos, guardar y cargar
+    y, junto con la fábrica original, escribir con save_rou_file. Los arreglos son copias
+    de solo lectura: el resultado no cambia si se modifica el estado del que salió.
+
+    Atributos:
+    ----------
+    _conductor : numpy.ndarray
+        Índice del vehículo compartido de cada persona (int32), SIN_ASIGNAR si no tiene.
+    _ocupacion : numpy.ndarray
+        Número de personas asignadas a cada vehículo compartido (int32).
+    _caminata : numpy.ndarray
+        Distancia a caminar de cada persona (float64), 0 si no tiene vehículo.
+    _ids_pasajeros : list
+        Id de cada persona, en el orden de veh_not_sharing.
+    _ids_conductores : list
+        Id de cada vehículo compartido, en el orden de veh_sharing.
+    """
+
+    def __init__(self, conductor, caminata, ids_pasajeros, ids_conductores):
+        """
+        Inicializa una instancia de ResultadoAsignacion.
+
+        Parámetros:
+        -----------
+        conductor : numpy.ndarray
+            Índice del vehículo compartido de cada persona, SIN_ASIGNAR si no tiene.
+        caminata : numpy.ndarray
+            Distancia a caminar de cada persona.
+        ids_pasajeros : list
+            Id de cada persona.
+        ids_conductores : list
+            Id de cada vehículo compartido.
+
+        Lanza:
+        ------
+        ValueError
+            Si las longitudes no coinciden con el número de ids.
+        """
+        self._conductor = np.array(conductor, dtype=np.int32)
+        self._caminata = np.array(caminata, dtype=np.float64)
+        self._ids_pasajeros = list(ids_pasajeros)
+        self._ids_conductores = list(ids_conductores)
+        if len(self._conductor) != len(self._ids_pasajeros) or len(self._caminata) != len(self._ids_pasajeros):
+            raise ValueError("Las longitudes de conductor y caminata no coinciden con el número de personas.")
+        asignados = self._conductor[self._conductor != SIN_ASIGNAR]
+        self._ocupacion = np.bincount(asignados, minlength=len(self._ids_conductores)).astype(np.int32)
+        for arreglo in (self._conductor, self._caminata, self._ocupacion):
+            arreglo.setflags(write=False)
+
+    @classmethod
+    def desde_estado(cls, estado):
+        """
+        Construye el resultado a partir del EstadoAsignacion que devuelven los algoritmos.
+
+        Parámetros:
+        -----------
+        estado : EstadoAsignacion
+            Estado de la asignación.
+
+        Devuelve:
+        ---------
+        ResultadoAsignacion
+            Resultado con copias de los arreglos del estado.
+        """
+        factory = estado.veh_factory
+        return cls(estado.conductor, estado.caminata,
+                   [v.get_attribute('id') for v in factory.veh_not_sharing],
+                   [v.get_attribute('id') for v in factory.veh_sharing])
+
+    def __eq__(self, other):
+        """
+        Compara si dos resultados asignan igual a las mismas personas y vehículos.
+
+        Parámetros:
+        -----------
+        other : ResultadoAsignacion
+            Otro resultado.
+
+        Devuelve:
+        ---------
+        bool
+            True si los ids, los vehículos asignados y las distancias son iguales.
+        """
+        if not isinstance(other, ResultadoAsignacion):
+            return False
+        return (self._ids_pasajeros == other._ids_pasajeros and self._ids_conductores == other._ids_conductores
+                and np.array_equal(self._conductor, other._conductor) and np.array_equal(self._caminata, other._caminata))
+
+    __hash__ = None
+
+    def _comprobar_ids(self, other):
+        if self._ids_pasajeros != other._ids_pasajeros or self._ids_conductores != other._ids_conductores:
+            raise ValueError("Los resultados no corresponden a las mismas personas y vehículos.")
+
+    def diferencias(self, other):
+        """
+        Obtiene las personas con distinto vehículo compartido en otro resultado.
+
+        Parámetros:
+        -----------
+        other : ResultadoAsignacion
+            Resultado de las mismas personas y vehículos (p.ej. de otro algoritmo).
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Índices de las personas cuyo vehículo cambia.
+
+        Lanza:
+        ------
+        ValueError
+            Si los resultados no tienen los mismos ids.
+        """
+        self._comprobar_ids(other)
+        return np.flatnonzero(self._conductor != other._conductor)
+
+    def comprobar_fabrica(self, veh_factory):
+        """
+        Verifica que el resultado corresponda a las personas y vehículos de una fábrica.
+
+        Parámetros:
+        -----------
+        veh_factory : VehicleFactory
+            Fábrica de vehículos.
+
+        Lanza:
+        ------
+        ValueError
+            Si los ids no coinciden con veh_not_sharing y veh_sharing de la fábrica.
+        """
+        if ([v.get_attribute('id') for v in veh_factory.veh_not_sharing] != self._ids_pasajeros
+                or [v.get_attribute('id') for v in veh_factory.veh_sharing] != self._ids_conductores):
+            raise ValueError("El resultado no corresponde a los vehículos de la fábrica.")
+
+    def total_caminata(self, path_len):
+        """
+        Calcula la distancia total: caminata de las personas asignadas más la longitud de
+        la ruta de las personas sin vehículo.
+
+        Parámetros:
+        -----------
+        path_len : numpy.ndarray
+            Longitud de la ruta de cada persona (p.ej. EstadoAsignacion.path_len).
+
+        Devuelve:
+        ---------
+        float
+            Distancia total.
+        """
+        asignadas = self._conductor != SIN_ASIGNAR
+        return float(self._caminata[asignadas].sum() + np.asarray(path_len)[~asignadas].sum())
+
+    def guardar(self, ruta):
+        """
+        Guarda los arreglos en un archivo .npz y los ids en ruta + '.json'.
+
+        Parámetros:
+        -----------
+        ruta : str
+            Archivo .npz destino.
+        """
+        with open(ruta, "wb") as archivo:
+            np.savez(archivo, conductor=self._conductor, caminata=self._caminata)
+        with open(f"{ruta}.json", "w") as archivo:
+            json.dump({"conductores": self._ids_conductores, "pasajeros": self._ids_pasajeros}, archivo)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga un resultado guardado con guardar.
+
+        Parámetros:
+        -----------
+        ruta : str
+            Archivo .npz.
+
+        Devuelve:
+        ---------
+        ResultadoAsignacion
+            Resultado cargado.
+        """
+        with np.load(ruta) as arreglos:
+            conductor, caminata = arreglos['conductor'], arreglos['caminata']
+        with open(f"{ruta}.json") as archivo:
+            ids = json.load(archivo)
+        return cls(conductor, caminata, ids["pasajeros"], ids["conductores"])
+
+    @property
+    def conductor(self):
+        """
+        Devuelve el vehículo compartido asignado a cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Índice del vehículo (int32), SIN_ASIGNAR si no tiene. De solo lectura.
+        """
+        return self._conductor
+
+    @property
+    def ocupacion(self):
+        """
+        Devuelve el número de personas asignadas a cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Personas asignadas (int32), sin contar al conductor. De solo lectura.
+        """
+        return self._ocupacion
+
+    @property
+    def caminata(self):
+        """
+        Devuelve la distancia a caminar de cada persona.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Distancias (float64), 0 en personas sin vehículo. De solo lectura.
+        """
+        return self._caminata
+
+    @property
+    def sin_vehiculo(self):
+        """
+        Devuelve las personas que no tienen vehículo compartido.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Índices de las personas.
+        """
+        return np.flatnonzero(self._conductor == SIN_ASIGNAR)
+
+    @property
+    def ids_pasajeros(self):
+        """
+        Devuelve el id de cada persona.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada persona.
+        """
+        return self._ids_pasajeros
+
+    @property
+    def ids_conductores(self):
+        """
+        Devuelve el id de cada vehículo compartido.
+
+        Devuelve:
+        ---------
+        list
+            Id de cada vehículo compartido.
+        """
+        return self._ids_conductores
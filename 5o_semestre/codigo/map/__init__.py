@@ -1 +1,2 @@
-from .map import Map
\ No newline at end of file
+from .map import Map
+from .node_table import NodeTable
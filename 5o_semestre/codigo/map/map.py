@@ -2,6 +2,8 @@ import osmnx as ox
 import logging
 import warnings
 
+from map.node_table import NodeTable
+
 class Map:
     """
     Clase para manejar la creación y manipulación de grafos de mapas utilizando osmnx.
@@ -14,6 +16,8 @@ class Map:
         Nombre del archivo OSM.
     _graphml_file_name : str
         Nombre del archivo GraphML.
+    _node_table : NodeTable
+        Tabla de coordenadas de los nodos del grafo, se construye al cargar el mapa.
     """
 
     def __init__(self, value, arg="coordinates"):
@@ -26,9 +30,15 @@ class Map:
             Valor que se utilizará para crear el mapa. Puede ser un nombre de lugar, coordenadas o una ruta a un archivo GraphML.
         arg : str, opcional
             Tipo de argumento proporcionado en value. Puede ser "place_name", "coordinates" o "ox_graphml". Por defecto es "coordinates".
+
+        Lanza:
+        ------
+        Exception
+            Si el grafo se cargó pero falla la construcción de su NodeTable.
         """
         try:
             self._G = None  
+            self._node_table = None
             get_ox_map = {
                 "place_name": self._map_place_name,  
                 "coordinates": self._map_coordinates,  
@@ -44,6 +54,10 @@ class Map:
             print("Error in Map constructor")
             logging.error(error) 
 
+        # Fuera del try: si el grafo se cargo, un error al construir la tabla se propaga
+        if self._G is not None:
+            self._node_table = NodeTable(self._G)
+
     def save_map_osm(self, file_name):
         """
         Guarda el grafo del mapa en un archivo OSM.
@@ -113,6 +127,18 @@ class Map:
         return self._G
 
 
+    @property
+    def node_table(self):
+        """
+        Devuelve la tabla de coordenadas de los nodos del grafo.
+
+        Devuelve:
+        ---------
+        NodeTable
+            Tabla con ids OSM, latitud/longitud y coordenadas proyectadas de los nodos.
+        """
+        return self._node_table
+
     @property
     def osm_file_name(self):
         """
@@ -0,0 +1,159 @@
+import numpy as np
+import osmnx as ox
+
+class NodeTable:
+    """
+    Tabla compacta con las coordenadas de todos los nodos del grafo, para evitar
+    búsquedas G.nodes[node]['y'] / ['x'] dentro de los ciclos.
+
+    Atributos:
+    ----------
+    _osmid : numpy.ndarray
+        Id OSM (int64) de cada fila.
+    _index : dict
+        Diccionario id OSM -> fila.
+    _lat : numpy.ndarray
+        Latitud (float64) de cada fila.
+    _lon : numpy.ndarray
+        Longitud (float64) de cada fila.
+    _x : numpy.ndarray
+        Coordenada x proyectada (UTM, metros) de cada fila.
+    _y : numpy.ndarray
+        Coordenada y proyectada (UTM, metros) de cada fila.
+    _crs : pyproj.CRS
+        Sistema de coordenadas de x, y.
+    """
+
+    def __init__(self, G):
+        """
+        Construye la tabla a partir del grafo.
+
+        Parámetros:
+        -----------
+        G : networkx.MultiDiGraph
+            Grafo del mapa sin proyectar (coordenadas x = longitud, y = latitud).
+        """
+        gdf_nodes = ox.graph_to_gdfs(G, edges=False)
+        gdf_projected = ox.projection.project_gdf(gdf_nodes)
+        self._osmid = gdf_nodes.index.to_numpy(dtype=np.int64)
+        self._index = {osmid: row for row, osmid in enumerate(self._osmid.tolist())}
+        self._lat = gdf_nodes["y"].to_numpy(dtype=np.float64)
+        self._lon = gdf_nodes["x"].to_numpy(dtype=np.float64)
+        self._x = gdf_projected.geometry.x.to_numpy(dtype=np.float64)
+        self._y = gdf_projected.geometry.y.to_numpy(dtype=np.float64)
+        self._crs = gdf_projected.crs
+        self._sorted_rows = np.argsort(self._osmid)
+        self._sorted_osmid = self._osmid[self._sorted_rows]
+
+    def rows(self, nodes):
+        """
+        Convierte ids OSM a filas de la tabla.
+
+        Parámetros:
+        -----------
+        nodes : list o numpy.ndarray
+            Ids OSM de los nodos.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Fila (int64) de cada nodo.
+
+        Lanza:
+        ------
+        KeyError
+            Si algún nodo no existe en la tabla.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._sorted_osmid, nodes), len(self._sorted_osmid) - 1)
+        found = self._sorted_osmid[pos] == nodes
+        if not np.all(found):
+            raise KeyError(f"Nodos no encontrados en la tabla: {nodes[~found][:5].tolist()}")
+        return self._sorted_rows[pos]
+
+    def __len__(self):
+        return len(self._osmid)
+
+    @property
+    def osmid(self):
+        """
+        Devuelve el id OSM de cada fila.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Ids OSM (int64).
+        """
+        return self._osmid
+
+    @property
+    def index(self):
+        """
+        Devuelve el diccionario id OSM -> fila.
+
+        Devuelve:
+        ---------
+        dict
+            Diccionario id OSM -> fila.
+        """
+        return self._index
+
+    @property
+    def lat(self):
+        """
+        Devuelve la latitud de cada fila.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Latitudes (float64).
+        """
+        return self._lat
+
+    @property
+    def lon(self):
+        """
+        Devuelve la longitud de cada fila.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Longitudes (float64).
+        """
+        return self._lon
+
+    @property
+    def x(self):
+        """
+        Devuelve la coordenada x proyectada de cada fila.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Coordenadas x en metros (float64).
+        """
+        return self._x
+
+    @property
+    def y(self):
+        """
+        Devuelve la coordenada y proyectada de cada fila.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Coordenadas y en metros (float64).
+        """
+        return self._y
+
+    @property
+    def crs(self):
+        """
+        Devuelve el sistema de coordenadas de x, y.
+
+        Devuelve:
+        ---------
+        pyproj.CRS
+            Sistema de coordenadas proyectado.
+        """
+        return self._crs
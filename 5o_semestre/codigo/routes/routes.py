@@ -1,3 +1,4 @@
+import numpy as np
 import osmnx as ox
 import uuid
 import random
@@ -61,6 +62,12 @@ class RouteOx(Route):
         Nodo de destino.
     _orig_dist : float
         Distancia a pie desde el origen hasta el nodo más cercano.
+    _nodes : numpy.ndarray
+        Nodos de la ruta (int64), se calculan una sola vez en create_route.
+    _lat : numpy.ndarray
+        Latitud de cada nodo de la ruta.
+    _lon : numpy.ndarray
+        Longitud de cada nodo de la ruta.
     """
 
     def __init__(self, init_orig):
@@ -82,6 +89,9 @@ class RouteOx(Route):
         self._orig = None # node id
         self._dest = None # node id
         self._orig_dist = None #distance to walk from orig to nearest node
+        self._nodes = None
+        self._lat = None
+        self._lon = None
     
     def create_route(self, G):
         """
@@ -108,7 +118,59 @@ class RouteOx(Route):
                 flag = False
         
         self._route = ox.shortest_path(G, self._orig, self._dest, weight="length")
+        if self._route is not None:
+            self.set_coordinates(G)
+
+    def set_coordinates(self, G):
+        """
+        Guarda los nodos de la ruta y sus coordenadas como arreglos de numpy contiguos,
+        para que los cálculos de distancias no consulten G.nodes nodo por nodo.
+
+        Parámetros:
+        -----------
+        G : networkx.MultiDiGraph
+            Grafo del mapa de la clase Map.
+        """
+        self._nodes = np.asarray(self._route, dtype=np.int64)
+        self._lat = np.fromiter((G.nodes[node]['y'] for node in self._route), dtype=np.float64, count=len(self._route))
+        self._lon = np.fromiter((G.nodes[node]['x'] for node in self._route), dtype=np.float64, count=len(self._route))
     
+    @property
+    def nodes(self):
+        """
+        Devuelve los nodos de la ruta como arreglo.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Nodos de la ruta (int64), None si la ruta no se ha creado.
+        """
+        return self._nodes
+
+    @property
+    def lat(self):
+        """
+        Devuelve la latitud de cada nodo de la ruta.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Latitudes (float64), None si la ruta no se ha creado.
+        """
+        return self._lat
+
+    @property
+    def lon(self):
+        """
+        Devuelve la longitud de cada nodo de la ruta.
+
+        Devuelve:
+        ---------
+        numpy.ndarray
+            Longitudes (float64), None si la ruta no se ha creado.
+        """
+        return self._lon
+
     @property
     def path_len(self):
         """
@@ -44,7 +44,8 @@ def save_net_file(osm_file):
 
 ##################################################################
 
-def _rout_file(vehicle_types, vehicles, file_name):
+def _rout_file(vehicle_types, vehicles, file_name, person_number=None):
+    # person_number: dict opcional id -> personNumber que reemplaza al atributo del vehiculo
     root = ET.Element(
         "routes",
         {
@@ -73,6 +74,8 @@ def _rout_file(vehicle_types, vehicles, file_name):
                 veh_type = vehicle.get_attribute(key)
                 id_veh_type = veh_type.get_attribute("id")
                 veh_xml.set(key,id_veh_type)
+            elif key == "personNumber" and person_number is not None and vehicle.get_attribute("id") in person_number:
+                veh_xml.set(key,str(person_number[vehicle.get_attribute("id")]))
             else:
                 veh_xml.set(key,str(vehicle.get_attribute(key)))
             
@@ -88,13 +91,23 @@ def _check_file_exists(file):
         return False
 
 #################################################################
-def save_rou_file(veh_factory, rou_orig, rou_sim):
+def save_rou_file(veh_factory, rou_orig, rou_sim, resultado=None):
+    # resultado: ResultadoAsignacion opcional; si se indica, veh_factory es la fabrica original
+    # (sin modificar) y personNumber y veh_not_get se toman del resultado
     vehicle_types = veh_factory.veh_types
     veh_total = veh_factory.vehicles
     veh_sharing = veh_factory.veh_sharing
     veh_not_get = veh_factory.veh_not_get
     veh_ignore = veh_factory.veh_ignore
     vehicles_total_sharing = []
+    person_number = None
+
+    if resultado is not None:
+        resultado.comprobar_fabrica(veh_factory)
+        veh_not_sharing = veh_factory.veh_not_sharing
+        veh_not_get = [veh_not_sharing[idx] for idx in resultado.sin_vehiculo.tolist()]
+        person_number = {v.get_attribute("id"): v.get_attribute("personNumber") + ocupacion
+                         for v, ocupacion in zip(veh_sharing, resultado.ocupacion.tolist())}
 
     vehicles_total_sharing = veh_sharing + veh_not_get + veh_ignore
 
@@ -107,7 +120,7 @@ def save_rou_file(veh_factory, rou_orig, rou_sim):
 
     if not(rou_sim_exists):
         _create_directory(rou_sim)
-        _rout_file(vehicle_types, vehicles_total_sharing, rou_sim)
+        _rout_file(vehicle_types, vehicles_total_sharing, rou_sim, person_number)
     return True
 
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los paquetes (algoritmos, map, vehicles, ...) se importan desde la carpeta codigo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import networkx as nx
+import numpy as np
+
+from algoritmos.candidatos import SIN_CANDIDATO
+from algoritmos.matriz_distancias import MatrizDistancias
+from vehicles.vehicles import VehicleFactory, VehicleType
+
+# Fabricas de vehiculos sinteticas para las pruebas (sin mapa ni SUMO)
+
+def _ruta(path_len, orig=0, dest=0, nodos=(), orig_dist=0.0):
+    return SimpleNamespace(ox_route=SimpleNamespace(path_len=path_len, _orig_dist=orig_dist, orig=orig,
+                                                    dest_sharing=dest, route=list(nodos)))
+
+def fabrica_sin_grafo(n_pasajeros, capacidades, rng):
+    # Fabrica sin grafo: solo lo que leen los algoritmos de asignacion (path_len y capacidades)
+    fabrica = VehicleFactory(None, [])
+    for idx, capacidad in enumerate(capacidades):
+        tipo = VehicleType()
+        tipo.set_attribute("personCapacity", capacidad)
+        fabrica.add_vehicle(f"sh{idx}", tipo, _ruta(float(rng.uniform(500, 5000))), True)
+    tipo = VehicleType()
+    tipo.set_attribute("personCapacity", 1)
+    for idx in range(n_pasajeros):
+        fabrica.add_vehicle(f"not{idx}", tipo, _ruta(float(rng.uniform(500, 5000))), False)
+    return fabrica
+
+def distancias_aleatorias(fabrica, rng, p_sin_candidato=0.3):
+    # Matriz densa con algunas parejas no candidatas
+    datos = rng.uniform(100, 3000, (len(fabrica.veh_sharing), len(fabrica.veh_not_sharing))).astype(np.float32)
+    datos[rng.random(datos.shape) < p_sin_candidato] = SIN_CANDIDATO
+    return MatrizDistancias(datos, [v.get_attribute("id") for v in fabrica.veh_sharing],
+                            [v.get_attribute("id") for v in fabrica.veh_not_sharing])
+
+def grafo_aleatorio(n_nodos, rng):
+    # Solo las coordenadas de los nodos (x = longitud, y = latitud), alrededor de la CDMX
+    G = nx.Graph()
+    for nodo in range(n_nodos):
+        G.add_node(nodo, y=float(rng.uniform(19.35, 19.40)), x=float(rng.uniform(-99.19, -99.14)))
+    return G
+
+def ruta_aleatoria(G, rng, destinos, compartido):
+    # Ruta de un vehiculo compartido (nodos que recorre) o de una persona (origen y destino compartido)
+    if compartido:
+        nodos = rng.choice(G.number_of_nodes(), int(rng.integers(2, 12)), replace=False)
+        return _ruta(float(rng.uniform(500, 5000)), nodos=nodos.tolist())
+    return _ruta(float(rng.uniform(500, 5000)), int(rng.integers(G.number_of_nodes())), int(rng.choice(destinos)),
+                 orig_dist=float(rng.uniform(0, 30)))
+
+def fabrica_en_grafo(n_pasajeros, capacidades, rng, n_nodos=200, n_destinos=3):
+    # Fabrica sobre un grafo con coordenadas, para calcular distancias con all_people_distances
+    G = grafo_aleatorio(n_nodos, rng)
+    destinos = rng.choice(n_nodos, n_destinos, replace=False)
+    fabrica = VehicleFactory(G, [])
+    for idx, capacidad in enumerate(capacidades):
+        tipo = VehicleType()
+        tipo.set_attribute("personCapacity", capacidad)
+        fabrica.add_vehicle(f"sh{idx}", tipo, ruta_aleatoria(G, rng, destinos, True), True)
+    tipo = VehicleType()
+    tipo.set_attribute("personCapacity", 1)
+    for idx in range(n_pasajeros):
+        fabrica.add_vehicle(f"not{idx}", tipo, ruta_aleatoria(G, rng, destinos, False), False)
+    return fabrica, destinos
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import algoritmos.almacen_candidatos as almacen_candidatos
+from algoritmos.almacen_candidatos import EscritorCandidatos, cargar_almacen
+from algoritmos.candidatos import CandidatosDispersos, ListaCandidatos
+
+N_PASAJEROS, N_CONDUCTORES = 60, 25
+
+@pytest.fixture
+def parejas():
+    # distancias enteras para que haya muchos empates de prioridad entre archivos
+    rng = np.random.default_rng(2)
+    pasajeros, conductores = np.nonzero(rng.random((N_PASAJEROS, N_CONDUCTORES)) < 0.6)
+    distancias = rng.integers(0, 15, len(pasajeros)).astype(np.float64)
+    nodos_s, nodos_t = rng.integers(0, 1000, (2, len(pasajeros)))
+    return pasajeros, conductores, distancias, nodos_s, nodos_t
+
+@pytest.mark.parametrize("top_k", [None, 4])
+def test_lista_en_disco_igual_a_memoria(parejas, tmp_path, monkeypatch, top_k):
+    # bloques pequeños: varios archivos ordenados y varias lecturas por archivo
+    monkeypatch.setattr(almacen_candidatos, "ELEMENTOS_POR_BLOQUE", 97)
+    monkeypatch.setattr(ListaCandidatos, "TAM_BLOQUE", 8)
+    ids_pasajeros, ids_conductores = list(range(N_PASAJEROS)), list(range(100, 100 + N_CONDUCTORES))
+    escritor = EscritorCandidatos(str(tmp_path), ids_pasajeros, ids_conductores)
+    # los bloques llegan desordenados, como del pool de procesos
+    orden = np.random.default_rng(3).permutation(len(parejas[0]))
+    for bloque in np.array_split(orden, 5):
+        escritor.agregar_bloque(*(columna[bloque] for columna in parejas))
+    q_disco, candidatos_disco = escritor.cerrar(top_k)
+    assert len(q_disco._rutas) > 1
+
+    candidatos = CandidatosDispersos.desde_parejas(*parejas, ids_pasajeros, ids_conductores, top_k)
+    esperado = ListaCandidatos.desde_candidatos(candidatos).registros
+    bloques = list(q_disco.bloques())
+    assert all(0 < len(bloque) <= ListaCandidatos.TAM_BLOQUE for bloque in bloques)
+    np.testing.assert_array_equal(np.concatenate(bloques), esperado)
+    assert list(q_disco) == esperado.tolist()
+    assert len(q_disco) == len(esperado)
+    for nombre, arreglo in candidatos.arreglos().items():
+        np.testing.assert_array_equal(candidatos_disco.arreglos()[nombre], arreglo)
+    assert list(cargar_almacen(str(tmp_path))[0]) == esperado.tolist()
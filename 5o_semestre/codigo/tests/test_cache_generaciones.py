@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from algoritmos.alg_genetico import algoritmo_genetico
+from algoritmos.alg_genetico_islas import algoritmo_genetico_islas
+from algoritmos.cache_fitness import TAM_CACHE
+from fabricas import distancias_aleatorias, fabrica_sin_grafo
+
+N_GENERACIONES = 12
+
+@pytest.fixture
+def problema():
+    # pocas personas y vehiculos para que se repitan hijos y el cache tenga aciertos
+    rng = np.random.default_rng(2)
+    fabrica = fabrica_sin_grafo(6, [3, 3, 2], rng)
+    return fabrica, distancias_aleatorias(fabrica, rng)
+
+def _comprobar_generaciones(conteo, n_poblacion):
+    generaciones = conteo['generaciones']
+    assert len(generaciones) == N_GENERACIONES
+    # cada generacion consulta un hijo por cromosoma; la poblacion inicial no cuenta
+    assert all(consultas == n_poblacion and 0 <= aciertos <= consultas for consultas, aciertos in generaciones)
+    assert sum(consultas for consultas, _ in generaciones) == conteo['consultas'] - n_poblacion
+
+def test_conteo_por_generacion(problema):
+    contadores = {}
+    algoritmo_genetico(*problema, 20, N_GENERACIONES, 0.3, semilla=1, tam_cache=TAM_CACHE, contadores=contadores)
+    _comprobar_generaciones(contadores, 20)
+    assert sum(aciertos for _, aciertos in contadores['generaciones']) > 0
+
+def test_sin_cache_conteos_en_cero(problema):
+    contadores = {}
+    algoritmo_genetico(*problema, 20, N_GENERACIONES, 0.3, semilla=1, contadores=contadores)
+    assert contadores['generaciones'] == [(0, 0)] * N_GENERACIONES
+
+@pytest.mark.parametrize("paralelo", [False, True])
+def test_conteo_por_generacion_en_islas(problema, paralelo):
+    contadores = {}
+    algoritmo_genetico_islas(*problema, 24, N_GENERACIONES, 0.3, n_islas=2, intervalo_migracion=5, semilla=1,
+                             paralelo=paralelo, tam_cache=TAM_CACHE, contadores=contadores)
+    for conteo in contadores['islas']:
+        _comprobar_generaciones(conteo, 12)
+    assert contadores['generaciones'] == [tuple(map(sum, zip(*generacion)))
+                                          for generacion in zip(*(conteo['generaciones'] for conteo in contadores['islas']))]
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from algoritmos.distances import (a_cartesianas, cuerda_a_metros, haversine_distance, haversine_distances,
+                                  haversine_matrix, min_por_segmento)
+
+# metros; las versiones vectorizadas solo cambian el orden de las operaciones
+TOLERANCIA = 1e-6
+
+@pytest.fixture
+def puntos():
+    # alrededor de la CDMX, mas unos cuantos puntos lejanos y antipodas
+    rng = np.random.default_rng(3)
+    lat = np.concatenate((rng.uniform(19.2, 19.6, 20), [0.0, -19.4, 89.9]))
+    lon = np.concatenate((rng.uniform(-99.3, -98.9, 20), [0.0, 80.9, 10.0]))
+    return lat, lon
+
+def _escalar(lat1, lon1, lat2, lon2):
+    return np.array([[haversine_distance(a, b, c, d) for c, d in zip(lat2, lon2)] for a, b in zip(lat1, lon1)])
+
+def test_haversine_matrix_igual_a_escalar(puntos):
+    lat, lon = puntos
+    np.testing.assert_allclose(haversine_matrix(lat, lon, lat[:7], lon[:7]), _escalar(lat, lon, lat[:7], lon[:7]),
+                               atol=TOLERANCIA)
+
+def test_haversine_distances_broadcasting(puntos):
+    lat, lon = puntos
+    esperado = _escalar(lat, lon, lat, lon)
+    # elemento a elemento
+    np.testing.assert_allclose(haversine_distances(lat, lon, lat[::-1], lon[::-1]),
+                               np.diag(esperado[:, ::-1]), atol=TOLERANCIA)
+    # uno a muchos
+    np.testing.assert_allclose(haversine_distances(lat[0], lon[0], lat, lon), esperado[0], atol=TOLERANCIA)
+    assert np.ndim(haversine_distances(lat[0], lon[0], lat[1], lon[1])) == 0
+
+def test_cuerda_a_metros_igual_a_escalar(puntos):
+    lat, lon = puntos
+    xyz = a_cartesianas(lat, lon)
+    np.testing.assert_allclose(np.linalg.norm(xyz, axis=1), 1.0)
+    cuerdas = np.linalg.norm(xyz[:, None, :] - xyz[None, :, :], axis=2)
+    # cerca de las antipodas arcsin pierde precision, de ahi la tolerancia relativa
+    np.testing.assert_allclose(cuerda_a_metros(cuerdas), _escalar(lat, lon, lat, lon), rtol=1e-9, atol=TOLERANCIA)
+
+def test_min_por_segmento():
+    rng = np.random.default_rng(5)
+    valores = rng.integers(0, 4, (6, 10)).astype(float)
+    inicios = np.array([0, 3, 4, 8])
+    mins, argmins = min_por_segmento(valores, inicios)
+    for j, (inicio, fin) in enumerate(zip(inicios, np.append(inicios[1:], valores.shape[1]))):
+        np.testing.assert_array_equal(mins[:, j], valores[:, inicio:fin].min(axis=1))
+        # primer minimo del segmento
+        np.testing.assert_array_equal(argmins[:, j], inicio + valores[:, inicio:fin].argmin(axis=1))
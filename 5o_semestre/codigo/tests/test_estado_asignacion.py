@@ -0,0 +1,32 @@
+import numpy as np
+
+from algoritmos.estado_asignacion import EstadoAsignacion, resultados_asignacion
+from fabricas import fabrica_sin_grafo
+
+def _estado():
+    fabrica = fabrica_sin_grafo(5, [2, 3], np.random.default_rng(3))
+    estado = EstadoAsignacion(fabrica)
+    estado.asignar(3, 1, 120.0, 10, 11)
+    estado.asignar(0, 0, 80.0, 12, 13)
+    return fabrica, estado
+
+def _ids(fabrica):
+    return ([v.get_attribute("id") for v in fabrica.veh_not_sharing],
+            [v.get_attribute("id") for v in fabrica.veh_sharing])
+
+def test_resultados_no_modifican_el_estado():
+    fabrica, estado = _estado()
+    primero = resultados_asignacion(estado, *_ids(fabrica))
+    segundo = resultados_asignacion(estado, *_ids(fabrica))
+    assert estado.sin_vehiculo == []
+    assert primero[0] == segundo[0] == estado.total_caminata()
+    assert [fila[4] for fila in primero[1]] == [("not3", "sh1"), ("not0", "sh0")]
+    assert [fila[2] for fila in primero[1]] == [(10, 11), (12, 13)]
+
+def test_marcar_sin_asignar_es_idempotente():
+    fabrica, estado = _estado()
+    estado.marcar_sin_asignar()
+    estado.marcar_sin_asignar()
+    estado.marcar_sin_vehiculo(2)
+    assert estado.sin_vehiculo == [1, 2, 4]
+    assert len(estado.materializar().veh_not_get) == 3
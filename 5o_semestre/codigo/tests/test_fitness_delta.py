@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from algoritmos.alg_genetico import (TOLERANCIA_FITNESS, _costos_y_grupo, _cruza_orden_mantener_cantidades,
+                                     _delta_intercambio, _fitness_cruza, _fitness_tot, _generacion,
+                                     _generar_poblacion, _mutacion)
+from fabricas import distancias_aleatorias, fabrica_sin_grafo
+
+N_POBLACION = 30
+
+# menos lugares que personas (genes SIN_ASIGNAR) y mas lugares que personas (genes sobrantes)
+@pytest.fixture(params=[(15, [3, 4, 2, 3]), (8, [5, 4, 3])], ids=["faltan_lugares", "sobran_lugares"])
+def problema(request):
+    rng = np.random.default_rng(7)
+    n_pasajeros, capacidades = request.param
+    fabrica = fabrica_sin_grafo(n_pasajeros, capacidades, rng)
+    costos, grupo = _costos_y_grupo(fabrica, distancias_aleatorias(fabrica, rng))
+    poblacion = _generar_poblacion(grupo, N_POBLACION, rng)
+    return costos, poblacion, _fitness_tot(poblacion, costos), rng
+
+def _padres(poblacion, fitness, rng):
+    ganadores = rng.integers(0, len(poblacion), N_POBLACION)
+    return (poblacion[ganadores[0::2]], fitness[ganadores[0::2]],
+            poblacion[ganadores[1::2]], fitness[ganadores[1::2]])
+
+def test_fitness_cruza_igual_a_completo(problema):
+    costos, poblacion, fitness, rng = problema
+    padres1, fitness1, padres2, fitness2 = _padres(poblacion, fitness, rng)
+    hijos1, hijos2 = _cruza_orden_mantener_cantidades(padres1, padres2, costos.shape[1], rng)
+    np.testing.assert_allclose(_fitness_cruza(hijos1, padres1, fitness1, padres2, fitness2, costos),
+                               _fitness_tot(hijos1, costos), rtol=TOLERANCIA_FITNESS)
+    np.testing.assert_allclose(_fitness_cruza(hijos2, padres2, fitness2, padres1, fitness1, costos),
+                               _fitness_tot(hijos2, costos), rtol=TOLERANCIA_FITNESS)
+
+@pytest.mark.parametrize("p_m", [0, 0.3, 1])
+def test_delta_intercambio_igual_a_completo(problema, p_m):
+    costos, poblacion, fitness, rng = problema
+    padres1, fitness1, padres2, fitness2 = _padres(poblacion, fitness, rng)
+    hijos1, hijos2 = _cruza_orden_mantener_cantidades(padres1, padres2, costos.shape[1], rng)
+    fitness_hijos = np.concatenate((_fitness_cruza(hijos1, padres1, fitness1, padres2, fitness2, costos),
+                                    _fitness_cruza(hijos2, padres2, fitness2, padres1, fitness1, costos)))
+    hijos, mutan, idx1, idx2 = _mutacion(np.concatenate((hijos1, hijos2)), p_m, rng)
+    if p_m == 0:
+        assert len(mutan) == 0
+    if p_m == 1:
+        assert len(mutan) == len(hijos)
+    fitness_hijos[mutan] += _delta_intercambio(hijos[mutan], idx1, idx2, costos)
+    np.testing.assert_allclose(fitness_hijos, _fitness_tot(hijos, costos), rtol=TOLERANCIA_FITNESS)
+
+@pytest.mark.parametrize("p_m", [0, 0.3, 1])
+def test_generaciones_con_fitness_delta(problema, p_m):
+    costos, poblacion, fitness, rng = problema
+    for _ in range(20):
+        poblacion, fitness = _generacion(poblacion, fitness, N_POBLACION, costos, p_m, rng, fitness_delta=True)
+    np.testing.assert_allclose(fitness, _fitness_tot(poblacion, costos), rtol=TOLERANCIA_FITNESS)
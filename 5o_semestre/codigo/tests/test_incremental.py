@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from algoritmos.all_people_distances import all_people_distances, candidatos_cercanos
+from algoritmos.candidatos import CandidatosDispersos
+from algoritmos.incremental import DistanciasIncrementales
+from vehicles.vehicles import VehicleType
+from fabricas import fabrica_en_grafo, ruta_aleatoria
+
+def _calcular(fabrica, radio_caminata, top_k):
+    if radio_caminata is None and top_k is None:
+        return all_people_distances(fabrica, n_procesos=1)
+    return candidatos_cercanos(fabrica, radio_caminata, top_k, n_procesos=1)
+
+def _comparar(incremental, fabrica, radio_caminata, top_k):
+    # contra el calculo completo sobre la fabrica actualizada
+    q, distancias = _calcular(fabrica, radio_caminata, top_k)
+    assert incremental.q.ids_pasajeros == q.ids_pasajeros and incremental.q.ids_conductores == q.ids_conductores
+    assert incremental.distancias.ids_pasajeros == distancias.ids_pasajeros
+    assert incremental.distancias.ids_conductores == distancias.ids_conductores
+    obtenido, esperado = incremental.q.registros, q.registros
+    assert np.all(np.diff(obtenido['prioridad']) >= 0)
+    llaves = lambda registros: np.sort(registros['pasajero'].astype(np.int64) * 100_000 + registros['conductor'])
+    np.testing.assert_array_equal(llaves(obtenido), llaves(esperado))
+    np.testing.assert_allclose(obtenido['prioridad'], esperado['prioridad'], rtol=1e-9)
+    if isinstance(distancias, CandidatosDispersos):
+        for nombre, arreglo in distancias.arreglos().items():
+            np.testing.assert_allclose(incremental.distancias.arreglos()[nombre], arreglo, rtol=1e-9)
+    else:
+        np.testing.assert_allclose(incremental.distancias.datos, distancias.datos, rtol=1e-6)
+
+@pytest.mark.parametrize("radio_caminata, top_k", [(None, None), (1500, None), (None, 2), (2500, 3)])
+def test_incremental_igual_a_recalcular(radio_caminata, top_k):
+    rng = np.random.default_rng(9)
+    fabrica, destinos = fabrica_en_grafo(40, [3, 4, 2, 5, 3, 2], rng)
+    q, distancias = _calcular(fabrica, radio_caminata, top_k)
+    incremental = DistanciasIncrementales(fabrica, q, distancias, radio_caminata, top_k)
+    tipo = VehicleType()
+    tipo.set_attribute("personCapacity", 4)
+    for paso in range(16):
+        operacion = paso % 4
+        if operacion < 2:
+            compartido = operacion == 1
+            incremental.agregar_vehiculo(f"nuevo{paso}", tipo, ruta_aleatoria(fabrica.G, rng, destinos, compartido),
+                                         compartido)
+        else:
+            vehiculos = fabrica.veh_not_sharing if operacion == 2 else fabrica.veh_sharing
+            incremental.quitar_vehiculo(vehiculos[int(rng.integers(len(vehiculos)))].get_attribute("id"))
+        _comparar(incremental, fabrica, radio_caminata, top_k)
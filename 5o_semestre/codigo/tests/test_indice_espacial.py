@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from algoritmos.distances import haversine_matrix
+from algoritmos.indice_espacial import IndiceRutas
+
+TOLERANCIA = 1e-6
+
+@pytest.fixture
+def rutas():
+    # rutas de distinta longitud (una de un solo nodo) alrededor de la CDMX
+    rng = np.random.default_rng(11)
+    longitudes = [5, 1, 12, 7, 3]
+    inicios = np.concatenate(([0], np.cumsum(longitudes)[:-1]))
+    n_nodos = sum(longitudes)
+    lat_r, lon_r = rng.uniform(19.2, 19.6, n_nodos), rng.uniform(-99.3, -98.9, n_nodos)
+    lat, lon = rng.uniform(19.1, 19.7, 40), rng.uniform(-99.4, -98.8, 40)
+    return IndiceRutas(lat_r, lon_r, inicios), lat_r, lon_r, inicios, lat, lon
+
+def _fuerza_bruta(lat_r, lon_r, inicios, lat, lon):
+    fines = np.append(inicios[1:], len(lat_r))
+    distancias = haversine_matrix(lat, lon, lat_r, lon_r)
+    return [(distancias[:, i:f].min(axis=1), i + distancias[:, i:f].argmin(axis=1)) for i, f in zip(inicios, fines)]
+
+def test_mas_cercano_igual_a_fuerza_bruta(rutas):
+    indice, lat_r, lon_r, inicios, lat, lon = rutas
+    assert indice.n_vehiculos == len(inicios)
+    for idx_veh, (min_esperado, pos_esperada) in enumerate(_fuerza_bruta(lat_r, lon_r, inicios, lat, lon)):
+        distancias, posiciones = indice.mas_cercano(idx_veh, lat, lon)
+        np.testing.assert_allclose(distancias, min_esperado, atol=TOLERANCIA)
+        np.testing.assert_array_equal(posiciones, pos_esperada)
+
+def test_cotas_inferiores_no_superan_la_distancia(rutas):
+    indice, lat_r, lon_r, inicios, lat, lon = rutas
+    minimos = np.column_stack([minimo for minimo, _ in _fuerza_bruta(lat_r, lon_r, inicios, lat, lon)])
+    cotas = indice.cotas_inferiores(lat, lon)
+    assert cotas.shape == minimos.shape
+    assert np.all(cotas <= minimos + TOLERANCIA)
+    # un punto sobre un nodo de la ruta tiene cota 0
+    assert np.allclose(indice.cotas_inferiores(lat_r[:1], lon_r[:1])[0, 0], 0.0)
+    np.testing.assert_array_equal(indice.cotas_inferiores(lat, lon, 1, 4), cotas[:, 1:4])
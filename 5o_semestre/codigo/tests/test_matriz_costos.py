@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import algoritmos.alg_genetico as alg_genetico
+from algoritmos.alg_genetico import _costos_y_grupo
+from algoritmos.candidatos import CandidatosDispersos, SIN_CANDIDATO
+from algoritmos.matriz_distancias import MatrizDistancias
+from fabricas import distancias_aleatorias, fabrica_sin_grafo
+
+def _problema():
+    rng = np.random.default_rng(11)
+    fabrica = fabrica_sin_grafo(12, [3, 2, 4, 3], rng)
+    return fabrica, distancias_aleatorias(fabrica, rng)
+
+def _esperada(fabrica, matriz):
+    # costo persona x vehiculo recorriendo la matriz densa persona por persona
+    path_len = np.array([v.get_attribute('route').ox_route.path_len for v in fabrica.veh_not_sharing])
+    costos = np.empty((len(path_len), matriz.n_conductores + 1))
+    for idx in range(len(path_len)):
+        costos[idx, :-1] = matriz.distancias_pasajero(idx)
+    costos[:, -1] = path_len
+    return np.where(costos == SIN_CANDIDATO, path_len[:, None], costos)
+
+def _dispersos(matriz, orden_pasajeros=None, orden_conductores=None):
+    # mismas parejas en CSR, opcionalmente con personas y vehiculos en otro orden
+    n_p, n_c = matriz.n_pasajeros, matriz.n_conductores
+    orden_pasajeros = np.arange(n_p) if orden_pasajeros is None else orden_pasajeros
+    orden_conductores = np.arange(n_c) if orden_conductores is None else orden_conductores
+    nuevo_p, nuevo_c = np.argsort(orden_pasajeros), np.argsort(orden_conductores)
+    pasajeros, conductores, distancias, nodos_s, nodos_t = matriz.parejas()
+    return CandidatosDispersos.desde_parejas(nuevo_p[pasajeros], nuevo_c[conductores], distancias.astype(np.float64),
+                                             nodos_s, nodos_t, [matriz.ids_pasajeros[i] for i in orden_pasajeros],
+                                             [matriz.ids_conductores[i] for i in orden_conductores])
+
+def test_densa_y_dispersa_iguales():
+    fabrica, matriz = _problema()
+    esperada = _esperada(fabrica, matriz)
+    np.testing.assert_array_equal(_costos_y_grupo(fabrica, matriz)[0], esperada)
+    np.testing.assert_array_equal(_costos_y_grupo(fabrica, _dispersos(matriz))[0], esperada)
+
+def test_columnas_por_id():
+    # personas y vehiculos en otro orden que la fabrica: filas y columnas siguen a los ids
+    fabrica, matriz = _problema()
+    rng = np.random.default_rng(5)
+    dispersos = _dispersos(matriz, rng.permutation(matriz.n_pasajeros), rng.permutation(matriz.n_conductores))
+    np.testing.assert_array_equal(_costos_y_grupo(fabrica, dispersos)[0], _esperada(fabrica, matriz))
+    transpuesta = MatrizDistancias(matriz.datos[::-1, ::-1].copy(), matriz.ids_conductores[::-1], matriz.ids_pasajeros[::-1])
+    np.testing.assert_array_equal(_costos_y_grupo(fabrica, transpuesta)[0], _esperada(fabrica, matriz))
+
+def test_limite_de_memoria(monkeypatch):
+    fabrica, matriz = _problema()
+    monkeypatch.setattr(alg_genetico, "MAX_ELEMENTOS_COSTOS", 12 * 5 - 1)
+    with pytest.raises(ValueError):
+        _costos_y_grupo(fabrica, matriz)
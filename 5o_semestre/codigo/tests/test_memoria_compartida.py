@@ -0,0 +1,30 @@
+import numpy as np
+
+from algoritmos.memoria_compartida import ArreglosCompartidos
+
+def test_memmaps_no_se_copian(tmp_path):
+    ruta = str(tmp_path / "datos.npy")
+    np.save(ruta, np.arange(12, dtype=np.float32).reshape(3, 4))
+    arreglos = {
+        'en_disco': np.load(ruta, mmap_mode='r'),
+        # como en CandidatosDispersos: np.asarray quita la subclase memmap
+        'vista': np.asarray(np.load(ruta, mmap_mode='r'))[1:],
+        # las vistas no contiguas y los arreglos en memoria se copian
+        'columna': np.load(ruta, mmap_mode='r')[:, 1],
+        'en_memoria': np.arange(5, dtype=np.int64),
+    }
+    with ArreglosCompartidos(arreglos) as compartidos:
+        origen, forma, dtype, offset = compartidos.specs['en_disco']
+        assert origen == ruta and forma == (3, 4) and offset is not None
+        assert compartidos.specs['vista'][3] == offset + 4 * 4
+        assert compartidos.specs['columna'][3] is None and compartidos.specs['en_memoria'][3] is None
+        assert compartidos.arreglos['en_disco'] is arreglos['en_disco']
+        bloques, adjuntos = ArreglosCompartidos.adjuntar(compartidos.specs)
+        # solo se abren bloques de memoria compartida para los arreglos copiados
+        assert len(bloques) == 2
+        for nombre, arreglo in arreglos.items():
+            np.testing.assert_array_equal(adjuntos[nombre], arreglo)
+            assert adjuntos[nombre].dtype == arreglo.dtype and not adjuntos[nombre].flags.writeable
+        del adjuntos
+        for bloque in bloques:
+            bloque.close()
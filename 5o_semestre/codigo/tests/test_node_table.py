@@ -0,0 +1,61 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+ox = pytest.importorskip("osmnx")
+
+import map.map
+from map.map import Map
+from map.node_table import NodeTable
+from algoritmos.distances import haversine_distance
+
+# Nodos (id OSM: longitud, latitud) de un grafo pequeño en la CDMX; ids no ordenados y uno > 2**31
+NODOS = {101: (-99.19, 19.35), 57: (-99.18, 19.35), 3_000_000_000: (-99.18, 19.36), 8: (-99.19, 19.36)}
+
+def _grafo():
+    G = nx.MultiDiGraph(crs="epsg:4326")
+    for osmid, (x, y) in NODOS.items():
+        G.add_node(osmid, x=x, y=y)
+    ids = list(NODOS)
+    for u, v in zip(ids, ids[1:] + ids[:1]):
+        G.add_edge(u, v, length=1000.0)
+        G.add_edge(v, u, length=1000.0)
+    return G
+
+def test_coordenadas_y_filas():
+    G = _grafo()
+    tabla = NodeTable(G)
+    assert len(tabla) == len(NODOS)
+    filas = tabla.rows(list(NODOS))
+    assert tabla.osmid[filas].tolist() == list(NODOS)
+    assert np.array_equal(tabla.lon[filas], [x for x, _ in NODOS.values()])
+    assert np.array_equal(tabla.lat[filas], [y for _, y in NODOS.values()])
+    assert all(tabla.index[osmid] == fila for osmid, fila in zip(NODOS, filas.tolist()))
+    with pytest.raises(KeyError):
+        tabla.rows([101, 12345])
+
+def test_proyeccion_en_metros():
+    tabla = NodeTable(_grafo())
+    assert tabla.crs.is_projected
+    a, b = tabla.rows([101, 57])
+    proyectada = np.hypot(tabla.x[a] - tabla.x[b], tabla.y[a] - tabla.y[b])
+    esferica = haversine_distance(tabla.lat[a], tabla.lon[a], tabla.lat[b], tabla.lon[b])
+    assert proyectada == pytest.approx(esferica, rel=5e-3)
+
+def test_map_construye_tabla(tmp_path):
+    ruta = tmp_path / "grafo.graphml"
+    ox.save_graphml(_grafo(), ruta)
+    mapa = Map(str(ruta), "ox_graphml")
+    assert isinstance(mapa.node_table, NodeTable)
+    assert sorted(mapa.node_table.osmid.tolist()) == sorted(NODOS)
+
+def test_map_propaga_error_de_tabla(tmp_path, monkeypatch):
+    ruta = tmp_path / "grafo.graphml"
+    ox.save_graphml(_grafo(), ruta)
+
+    def falla(G):
+        raise ValueError("tabla")
+
+    monkeypatch.setattr(map.map, "NodeTable", falla)
+    with pytest.raises(ValueError, match="tabla"):
+        Map(str(ruta), "ox_graphml")
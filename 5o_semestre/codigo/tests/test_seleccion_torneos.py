@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from algoritmos.alg_genetico import _participantes_torneos, _seleccion_torneos
+
+@pytest.mark.parametrize("n_poblacion, k", [(3, 3), (5, 3), (50, 3), (8, 8)])
+def test_participantes_distintos(n_poblacion, k):
+    participantes = _participantes_torneos(n_poblacion, 2000, k, np.random.default_rng(1))
+    assert participantes.shape == (2000, k)
+    assert participantes.min() >= 0 and participantes.max() < n_poblacion
+    ordenados = np.sort(participantes, axis=1)
+    assert (ordenados[:, 1:] != ordenados[:, :-1]).all()
+
+def test_participantes_uniformes():
+    # cada cromosoma sale en k / n_poblacion de los torneos
+    participantes = _participantes_torneos(10, 20000, 3, np.random.default_rng(2))
+    np.testing.assert_allclose(np.bincount(participantes.ravel(), minlength=10) / 20000, 0.3, atol=0.02)
+
+def test_ganador_es_el_mejor_de_su_torneo():
+    # con 3 cromosomas y k = 3 todos compiten siempre: gana el de menor fitness
+    ganadores = _seleccion_torneos(np.array([5.0, 1.0, 3.0]), 100, np.random.default_rng(3))
+    assert (ganadores == 1).all()
+
+def test_torneo_mas_grande_que_la_poblacion():
+    with pytest.raises(ValueError):
+        _participantes_torneos(2, 10, 3, np.random.default_rng(4))
@@ -153,6 +153,18 @@ class Vehicle(DynamicAttributes):
         """
         return self._sharing
 
+    @sharing.setter
+    def sharing(self, value):
+        """
+        Establece si el vehículo es compartido.
+
+        Parámetros:
+        -----------
+        value : bool
+            True si el vehículo es compartido, False en caso contrario.
+        """
+        self._sharing = value
+
     @property
     def vehicles_sharing(self):
         """
@@ -269,7 +281,7 @@ class VehicleFactory:
         
         
     
-    def _create_vehicle(self, id, veh_type, route, depart=0):
+    def _create_vehicle(self, id, veh_type, route, depart=0, sharing=None):
         """
         Crea un vehículo y lo añade a la lista de vehículos.
 
@@ -283,8 +295,18 @@ class VehicleFactory:
             Ruta del vehículo creado en la fabrica Sumo.
         depart : int, opcional
             Tiempo de salida del vehículo. Por defecto es 0.
+        sharing : bool, opcional
+            Si se indica, el vehículo es compartido o no sin sortearlo con p_sharing y nunca
+            se ignora. Por defecto se sortea según sharing_type.
+
+        Devuelve:
+        ---------
+        Vehicle
+            Vehículo creado.
         """
-        vehicle = Vehicle(self._p_sharing)
+        vehicle = Vehicle(self._p_sharing if sharing is None else None)
+        if sharing is not None:
+            vehicle.sharing = sharing
         vehicle.set_attribute("id", id)
         vehicle.set_attribute("type", veh_type)
         vehicle.set_attribute("route", route)
@@ -293,8 +315,8 @@ class VehicleFactory:
         vehicle.user_dist_walk = route.ox_route._orig_dist
         self._vehicles.append(vehicle)
         self._dict_vehicles[id] = vehicle
-        if self._sharing_type == 'random':
-            if route in self._elements_to_ignore:
+        if self._sharing_type == 'random' or sharing is not None:
+            if sharing is None and route in self._elements_to_ignore:
                 self._veh_ignore.append(vehicle)
             else:
                 if vehicle.sharing:
@@ -304,6 +326,7 @@ class VehicleFactory:
                     self._veh_sharing.append(vehicle)
                 else:
                     self._veh_not_sharing.append(vehicle)
+        return vehicle
 
     
     def _exponential_distribution(self, routes):
@@ -363,6 +386,64 @@ class VehicleFactory:
         else:
             self._none_distribution(routes)
 
+    def add_vehicle(self, id, veh_type, route, sharing, depart=0):
+        """
+        Añade un vehículo después de crear la población (p.ej. una persona que llega
+        durante la simulación). Se agrega al final de veh_sharing o veh_not_sharing.
+
+        Parámetros:
+        -----------
+        id : str
+            Identificador del vehículo.
+        veh_type : VehicleType
+            Tipo del vehículo.
+        route : Route
+            Ruta del vehículo creado en la fabrica Sumo.
+        sharing : bool
+            True si el vehículo es compartido.
+        depart : int, opcional
+            Tiempo de salida del vehículo. Por defecto es 0.
+
+        Devuelve:
+        ---------
+        Vehicle
+            Vehículo creado.
+
+        Lanza:
+        ------
+        ValueError
+            Si ya existe un vehículo con el mismo id.
+        """
+        if id in self._dict_vehicles:
+            raise ValueError(f"Ya existe un vehículo con id {id}.")
+        return self._create_vehicle(id, veh_type, route, depart, sharing)
+
+    def remove_vehicle(self, id):
+        """
+        Quita un vehículo de la fábrica (p.ej. una persona que cancela su viaje).
+
+        Parámetros:
+        -----------
+        id : str
+            Identificador del vehículo.
+
+        Devuelve:
+        ---------
+        Vehicle
+            Vehículo quitado.
+        """
+        vehicle = self._dict_vehicles.pop(id)
+        self._vehicles.remove(vehicle)
+        if vehicle in self._veh_sharing:
+            veh_type = vehicle.get_attribute("type")
+            self._total_vehicles_capacity -= veh_type.get_attribute("personCapacity") - 1
+            self._veh_sharing.remove(vehicle)
+        elif vehicle in self._veh_not_sharing:
+            self._veh_not_sharing.remove(vehicle)
+        elif vehicle in self._veh_ignore:
+            self._veh_ignore.remove(vehicle)
+        return vehicle
+
     def get_vehicles_length(self):
         """
         Obtiene la cantidad de vehículos creados.